@@ -0,0 +1,14 @@
+"""
+# ---- script header ----
+script name: __init__.py
+purpose of script: makes the benchmarks directory an importable package (synthetic data and timing functions for the benchmark scripts)
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+# ---- notes ----
+notes:
+same layout as the functions package, one function per module, for example
+from benchmarks.make_synthetic_sco_ndfd_data import make_synthetic_sco_ndfd_data
+
+"""
@@ -0,0 +1,223 @@
+# -*- coding: utf-8 -*-
+"""
+# ---- script header ----
+script name: benchmark_fetch_script.py
+purpose of script: This script load tests the ndfd fetch (get_sco_ndfd_cycle_data() and the qpf and pop12 data requests) against a local stand-in for the sco
+thredds server, it reports throughput and tail latency for each number of concurrent fetches so fetch changes can be tuned without using the sco server.
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+
+# ---- notes ----
+notes:
+the server (start_sco_ndfd_test_server.py) serves a synthetic dataset (make_synthetic_sco_ndfd_data.py) under the sco url layout
+(YYYYMM/YYYYMMDD/YYYYMMDDHHds.midatlan.oper.bin) with the latency, bandwidth, missing cycles, and failures set below
+each fetch is one forecast cycle: the url check, opening the dataset, and downloading the first 72 hrs of qpf and pop12 (like tidy_sco_ndfd_data())
+latency percentiles (p50, p95, and p99) are for fetches that worked, missing (404) and failed fetches (server errors and responses that are cut off) are counted
+each worker thread has its own requests session (connections are reused within a thread like in ndfd_get_forecast_data_script.py)
+results are saved to benchmark_output_path as fetch_results_<datetime>.json
+run from anywhere, e.g. python benchmarks/benchmark_fetch_script.py
+
+"""
+
+# %% load libraries
+
+import pandas # for data mgmt
+import numpy # for data mgmt
+import datetime as dt # for datetime mgmt
+import concurrent.futures # for concurrent fetches
+import threading # for one session per thread
+import contextlib # for hiding fetch status
+import io # for hiding fetch status
+import requests # for sessions
+import json # for saving results
+import os # for file mgmt
+import sys # for importing custom functions
+import time # for timing and result file names
+import platform # for run info
+import subprocess # for the git commit
+
+
+# %% set paths here
+
+# base path to analysis (the parent of this benchmarks directory)
+analysis_base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/"
+
+# base path to data
+data_base_path = analysis_base_path + "data/"
+
+
+# %% use set paths
+
+# path to benchmark results
+benchmark_output_path = data_base_path + "tabular/outputs/benchmarks/"
+
+
+# %% set benchmark options here
+
+# synthetic grid size ("nc", "midatlan", and "conus", see make_synthetic_sco_ndfd_data.py)
+grid_size = "midatlan"
+
+# number of forecast cycles to fetch (00 and 12 UTC cycles going back from the last cycle) at each number of concurrent fetches
+num_cycles = 20
+last_cycle_datetime_uct_str = "2026-10-18 00:00"
+
+# numbers of concurrent fetches
+concurrency_levels = [1, 2, 4, 8]
+
+# server latency (secs) and random extra latency (secs) for each request
+latency_secs = 0.05
+latency_jitter_secs = 0.05
+
+# server speed for each response (MB per second, None for no limit)
+bandwidth_mb_per_sec = 20
+
+# fraction of cycles that are missing (404), fraction of requests with a server error (503), and fraction of data responses that are cut off
+missing_frac = 0.1
+error_frac = 0.01
+truncate_frac = 0.01
+
+# optional bounding box [xmin, ymin, xmax, ymax] to request in the ndfd grid projection and units (km) (None for the full grid)
+ndfd_bbox_km = None
+
+
+# %% load custom functions
+
+# custom functions are imported from the functions and benchmarks packages in analysis_base_path
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
+
+from functions.get_sco_ndfd_cycle_data import get_sco_ndfd_cycle_data
+from benchmarks.start_sco_ndfd_test_server import start_sco_ndfd_test_server
+
+
+# %% define variables, cycles, and fetches
+
+# sco ndfd variable names and number of subperiods in 72 hrs (6 hr qpf and 12 hr pop12 subperiods)
+ndfd_var_num_times = {"Total_precipitation_surface_6_Hour_Accumulation": 12,
+                      "Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254": 6}
+
+# forecast cycles to fetch
+last_cycle_datetime = dt.datetime.strptime(last_cycle_datetime_uct_str, "%Y-%m-%d %H:%M")
+cycle_datetime_strs = [(last_cycle_datetime - dt.timedelta(hours = 12 * cycle_num)).strftime("%Y-%m-%d %H:%M") for cycle_num in range(num_cycles)]
+
+# one session per worker thread
+thread_data = threading.local()
+
+def fetch_cycle(base_server_url, datetime_uct_str):
+    """
+    Description: Fetches one forecast cycle (url check, opening the dataset, and the 72 hr qpf and pop12 data) and returns its status, time, and size
+    """
+    if not hasattr(thread_data, "session"):
+        thread_data.session = requests.Session()
+
+    fetch_result = {'datetime_uct_str': datetime_uct_str, 'status': "ok", 'secs': None, 'num_bytes': 0, 'error': None}
+    fetch_start = time.perf_counter()
+    try:
+        cycle_data = get_sco_ndfd_cycle_data(base_server_url = base_server_url, datetime_uct_str = datetime_uct_str, ndfd_var_names = list(ndfd_var_num_times.keys()),
+                                             ndfd_bbox_km = ndfd_bbox_km, session = thread_data.session)
+        if (cycle_data['ndfd_data'] is None):
+            fetch_result['status'] = "missing" if (cycle_data['fetch_info']['status_code'] == 404) else "error"
+            fetch_result['error'] = "status " + str(cycle_data['fetch_info']['status_code'])
+        else:
+            var_y_slice, var_x_slice = cycle_data['ndfd_subset_index'] if (cycle_data['ndfd_subset_index'] is not None) else (slice(0, None), slice(0, None))
+            for ndfd_var_name, ndfd_var_num_time in ndfd_var_num_times.items():
+                var_raw_data = numpy.asarray(cycle_data['ndfd_data'][ndfd_var_name].data[0][0:ndfd_var_num_time, var_y_slice, var_x_slice])
+                fetch_result['num_bytes'] += var_raw_data.nbytes
+    except Exception as error:
+        fetch_result['status'] = "error"
+        fetch_result['error'] = type(error).__name__ + ": " + str(error)[0:200]
+    fetch_result['secs'] = time.perf_counter() - fetch_start
+
+    return fetch_result
+
+
+# %% start server
+
+server_options = {'grid_size': grid_size, 'latency_secs': latency_secs, 'latency_jitter_secs': latency_jitter_secs, 'bandwidth_mb_per_sec': bandwidth_mb_per_sec,
+                  'missing_frac': missing_frac, 'error_frac': error_frac, 'truncate_frac': truncate_frac}
+ndfd_test_server = start_sco_ndfd_test_server(**server_options)
+
+# print status
+print("started test server at " + ndfd_test_server.base_server_url)
+
+
+# %% run fetches
+
+fetch_results = []
+fetch_summaries = []
+
+for concurrency_level in concurrency_levels:
+    # new sessions for each concurrency level
+    thread_data = threading.local()
+    num_requests_start = len(ndfd_test_server.request_log)
+
+    # fetch all cycles (printed status from the fetch functions is hidden)
+    run_start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with concurrent.futures.ThreadPoolExecutor(max_workers = concurrency_level) as executor:
+            level_results = list(executor.map(lambda cycle_str: fetch_cycle(ndfd_test_server.base_server_url, cycle_str), cycle_datetime_strs))
+    run_secs = time.perf_counter() - run_start
+
+    # summarize
+    level_results_pd = pandas.DataFrame(level_results)
+    ok_secs_np = level_results_pd.loc[level_results_pd['status'] == "ok", 'secs'].to_numpy()
+    level_summary = {'concurrency': concurrency_level,
+                     'num_cycles': len(level_results_pd),
+                     'num_ok': int((level_results_pd['status'] == "ok").sum()),
+                     'num_missing': int((level_results_pd['status'] == "missing").sum()),
+                     'num_errors': int((level_results_pd['status'] == "error").sum()),
+                     'num_requests': len(ndfd_test_server.request_log) - num_requests_start,
+                     'run_secs': run_secs,
+                     'cycles_per_sec': len(ok_secs_np) / run_secs,
+                     'mb_per_sec': level_results_pd['num_bytes'].sum() / 1e6 / run_secs,
+                     'p50_secs': float(numpy.percentile(ok_secs_np, 50)) if (len(ok_secs_np) > 0) else None,
+                     'p95_secs': float(numpy.percentile(ok_secs_np, 95)) if (len(ok_secs_np) > 0) else None,
+                     'p99_secs': float(numpy.percentile(ok_secs_np, 99)) if (len(ok_secs_np) > 0) else None,
+                     'max_secs': float(ok_secs_np.max()) if (len(ok_secs_np) > 0) else None}
+    fetch_summaries.append(level_summary)
+    fetch_results.extend([{'concurrency': concurrency_level, **level_result} for level_result in level_results])
+
+    # print status
+    print("fetched " + str(level_summary['num_ok']) + " of " + str(num_cycles) + " cycles with " + str(concurrency_level) + " concurrent fetches in " +
+          str(round(run_secs, 2)) + " s (p95: " + str(round(level_summary['p95_secs'], 3) if (level_summary['p95_secs'] is not None) else None) + " s)")
+
+
+# %% stop server
+
+ndfd_test_server.shutdown()
+ndfd_test_server.server_close()
+
+
+# %% save results
+
+# run info (to tell results apart)
+git_commit = subprocess.run(["git", "-C", analysis_base_path, "rev-parse", "--short", "HEAD"], capture_output = True, text = True).stdout.strip()
+run_info = {'datetime_uct': pandas.Timestamp.now(tz = "UTC").strftime("%Y-%m-%d %H:%M:%S"),
+            'git_commit': git_commit,
+            'python_version': platform.python_version(),
+            'requests_version': requests.__version__,
+            'num_cycles': num_cycles,
+            'ndfd_bbox_km': ndfd_bbox_km,
+            **server_options}
+
+os.makedirs(benchmark_output_path, exist_ok = True)
+fetch_output_file = benchmark_output_path + "fetch_results_" + time.strftime("%Y%m%d%H%M%S") + ".json"
+with open(fetch_output_file, "w") as results_file:
+    json.dump({'run_info': run_info, 'summaries': fetch_summaries, 'results': fetch_results}, results_file, indent = 1)
+
+# print status
+print("saved results to " + fetch_output_file)
+
+
+# %% print summary
+
+fetch_summaries_pd = pandas.DataFrame(fetch_summaries)
+print(fetch_summaries_pd.round({'run_secs': 2, 'cycles_per_sec': 2, 'mb_per_sec': 1, 'p50_secs': 3, 'p95_secs': 3, 'p99_secs': 3, 'max_secs': 3}).to_string(index = False))
+
+# most common errors
+fetch_errors_pd = pandas.DataFrame(fetch_results)
+fetch_errors_pd = fetch_errors_pd[fetch_errors_pd['status'] == "error"]
+if (len(fetch_errors_pd) > 0):
+    print(fetch_errors_pd['error'].str.split(":").str[0].value_counts().to_string())
@@ -0,0 +1,310 @@
+# -*- coding: utf-8 -*-
+"""
+# ---- script header ----
+script name: benchmark_hot_paths_script.py
+purpose of script: This script times the python hot paths (tidy, grid, zonal stats, lease calcs, and database update) on synthetic NDFD datasets and lease tables,
+saves the results, and compares them to a baseline run so slower or more memory hungry changes show up.
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+
+# ---- notes ----
+notes:
+no sco server or cloud sql connection is needed, the ndfd datasets are synthetic pydap datasets (make_synthetic_sco_ndfd_data.py) and the database
+is an in memory sqlite stand-in (make_synthetic_shellcast_db.py)
+each function and stage is timed num_repeats times (median and fastest are saved, the fastest is compared to the baseline) and run once more with tracemalloc for peak memory
+caches are not used (cmu weights and lease index are calculated every run), so zonal times are for the first run after the cmus or leases change
+insert_ncdmf_leases() replaced make_lease_sql_query() so it's the lease insert that's timed
+results are saved to benchmark_output_path as benchmark_results_<datetime>.json, the first run (or a run with update_baseline = True) is saved as the baseline
+run from anywhere, e.g. python benchmarks/benchmark_hot_paths_script.py
+
+"""
+
+# %% load libraries
+
+import pandas # for data mgmt
+import numpy # for data mgmt
+import functools # for benchmark arguments
+import json # for saving results
+import os # for file mgmt
+import sys # for importing custom functions
+import time # for result file names
+import platform # for run info
+import subprocess # for the git commit
+
+
+# %% set paths here
+
+# base path to analysis (the parent of this benchmarks directory)
+analysis_base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/"
+
+# base path to data
+data_base_path = analysis_base_path + "data/"
+
+
+# %% use set paths
+
+# path to benchmark results
+benchmark_output_path = data_base_path + "tabular/outputs/benchmarks/"
+
+# baseline results to compare to
+benchmark_baseline_file = benchmark_output_path + "benchmark_baseline.json"
+
+
+# %% set benchmark options here
+
+# synthetic grid sizes ("nc", "midatlan", and "conus", see make_synthetic_sco_ndfd_data.py), conus needs a few GB of memory
+grid_sizes = ["nc", "midatlan"]
+
+# last subperiod (hrs) and fraction of missing grid cells in the synthetic datasets
+max_time_hrs = 72
+nan_frac = 0.3
+
+# number of synthetic leases for lease calcs and database benchmarks (on the lease_grid_size grid)
+lease_sizes = [100, 1000, 10000, 100000]
+lease_grid_size = "nc"
+
+# number of synthetic cmus
+num_cmus = 200
+
+# number of timed runs per benchmark
+num_repeats = 5
+
+# a result is a regression when it's more than this fraction slower or bigger than the baseline
+time_tol = 0.25
+memory_tol = 0.25
+
+# save this run as the baseline (True or False)
+update_baseline = False
+
+# exit with an error when there are regressions (True or False, for running from a script)
+fail_on_regression = False
+
+
+# %% load custom functions
+
+# custom functions are imported from the functions and benchmarks packages in analysis_base_path
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
+
+from functions.aggregate_sco_ndfd_var_periods import aggregate_sco_ndfd_var_periods
+from functions.get_sco_ndfd_coords import get_sco_ndfd_coords
+from functions.tidy_sco_ndfd_data import tidy_sco_ndfd_data
+from functions.make_sco_ndfd_grid import make_sco_ndfd_grid
+from functions.get_sco_ndfd_cmu_weights import get_sco_ndfd_cmu_weights
+from functions.calc_sco_ndfd_cmu_means import calc_sco_ndfd_cmu_means
+from functions.calc_sco_ndfd_cmu_calcs import calc_sco_ndfd_cmu_calcs
+from functions.calc_sco_ndfd_sga_calcs import calc_sco_ndfd_sga_calcs
+from functions.get_sco_ndfd_lease_index import get_sco_ndfd_lease_index
+from functions.calc_sco_ndfd_lease_calcs import calc_sco_ndfd_lease_calcs
+from functions.insert_ncdmf_leases import insert_ncdmf_leases
+from functions.get_new_ncdmf_leases import get_new_ncdmf_leases
+from functions.upsert_closure_probabilities import upsert_closure_probabilities
+from functions.update_shellcast_db import update_shellcast_db
+from benchmarks.make_synthetic_sco_ndfd_data import make_synthetic_sco_ndfd_data
+from benchmarks.make_synthetic_cmu_bounds import make_synthetic_cmu_bounds
+from benchmarks.make_synthetic_lease_data import make_synthetic_lease_data
+from benchmarks.make_synthetic_shellcast_db import make_synthetic_shellcast_db
+from benchmarks.run_benchmark import run_benchmark
+from benchmarks.compare_benchmark_results import compare_benchmark_results
+
+
+# %% define projections, stages, and results
+
+# define proj4 string for ndfd data
+ndfd_proj4 = "+proj=lcc +lat_1=25 +lat_2=25 +lat_0=25 +lon_0=-95 +x_0=0 +y_0=0 +a=6371000 +b=6371000 +units=m +no_defs"
+
+# forecast cycle of the synthetic datasets
+ndfd_datetime_uct_str = "2026-10-18 00:00"
+
+# sco ndfd variable names
+ndfd_var_names = {"qpf": "Total_precipitation_surface_6_Hour_Accumulation",
+                  "pop12": "Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254"}
+
+# benchmark results
+benchmark_results = []
+
+def add_benchmark_result(benchmark_name, benchmark_kind, benchmark_case, benchmark_info):
+    """
+    Description: Adds a run_benchmark() result to benchmark_results and prints it
+    """
+    benchmark_results.append({'benchmark': benchmark_name, 'kind': benchmark_kind, 'case': benchmark_case, **benchmark_info})
+    print(benchmark_kind + " " + benchmark_name + " (" + benchmark_case + "): " + str(round(benchmark_info['median_secs'], 4)) + " s, " +
+          str(round(benchmark_info['peak_mb'], 1)) + " MB peak")
+
+# stages (same steps as shellcast_daily_analysis.py)
+def run_tidy_stage(ndfd_data):
+    ndfd_coords = get_sco_ndfd_coords(ndfd_data)
+    return {ndfd_var: tidy_sco_ndfd_data(ndfd_data, ndfd_datetime_uct_str, ndfd_var, ndfd_coords = ndfd_coords)[0] for ndfd_var in ("qpf", "pop12")}
+
+def run_grid_stage(ndfd_tidy_data):
+    return {ndfd_var: make_sco_ndfd_grid(ndfd_tidy_data[ndfd_var], ndfd_var) for ndfd_var in ("qpf", "pop12")}
+
+def run_zonal_stage(ndfd_grids, cmu_bounds, rainfall_thresh_data, sga_names, lease_data):
+    ndfd_pop12_grid, ndfd_valid_period_hrs, ndfd_grid_coords = ndfd_grids['pop12']
+    cmu_weights = get_sco_ndfd_cmu_weights(cmu_bounds, ndfd_grid_coords, ndfd_proj4)
+    ndfd_cmu_calcs_data = calc_sco_ndfd_cmu_calcs(cmu_names = cmu_weights['cmu_names'],
+                                                  cmu_rain_in = cmu_bounds['rain_in'].to_numpy(),
+                                                  valid_period_hrs = ndfd_valid_period_hrs,
+                                                  cmu_pop12_perc = calc_sco_ndfd_cmu_means(cmu_weights, ndfd_pop12_grid),
+                                                  cmu_qpf_in = calc_sco_ndfd_cmu_means(cmu_weights, ndfd_grids['qpf'][0]) / 25.4,
+                                                  datetime_uct_str = ndfd_datetime_uct_str[0:10])
+    ndfd_sga_calcs_data = calc_sco_ndfd_sga_calcs(ndfd_cmu_calcs_data, rainfall_thresh_data[['HA_CLASS', 'grow_area']], sga_names)
+    lease_index = get_sco_ndfd_lease_index(lease_data, cmu_bounds, ndfd_grid_coords, ndfd_proj4)
+    ndfd_lease_calcs_data = calc_sco_ndfd_lease_calcs(lease_index, ndfd_cmu_calcs_data)
+    return ndfd_cmu_calcs_data, ndfd_sga_calcs_data, ndfd_lease_calcs_data
+
+# database connections for database benchmarks (a new in memory database for every run)
+def open_synthetic_db(lease_data, existing_lease_frac, user_lease_frac):
+    db_conn = make_synthetic_shellcast_db("sqlite://", lease_data, existing_lease_frac = existing_lease_frac, user_lease_frac = user_lease_frac).connect()
+    db_conn.begin()
+    return db_conn
+
+def close_synthetic_db(db_conn, *benchmark_args):
+    db_conn.rollback()
+    db_conn.close()
+    db_conn.engine.dispose()
+
+
+# %% grid benchmarks (tidy, grid, and zonal stats)
+
+for grid_size in grid_sizes:
+    benchmark_case = "grid=" + grid_size
+
+    # synthetic dataset, cmus, and leases
+    ndfd_data = make_synthetic_sco_ndfd_data(grid_size, max_time_hrs = max_time_hrs, nan_frac = nan_frac)
+    ndfd_coords = get_sco_ndfd_coords(ndfd_data)
+    cmu_bounds, rainfall_thresh_data, sga_names = make_synthetic_cmu_bounds(ndfd_coords, ndfd_proj4, num_cmus = num_cmus)
+    lease_data = make_synthetic_lease_data(1000, cmu_bounds, rainfall_thresh_data)
+
+    # aggregate the 1-, 2-, and 3-day (24, 48, and 72 hr) periods from subperiods that are already read (same as tidy_sco_ndfd_data())
+    for ndfd_var in ("qpf", "pop12"):
+        var_data = ndfd_data[ndfd_var_names[ndfd_var]]
+        var_times = numpy.array(var_data[var_data.dimensions[0]][:])
+        var_period_index = numpy.where(var_times <= 72)[0]
+        var_period_raw_data = numpy.asarray(var_data.array[var_period_index[0]:(var_period_index[-1] + 1), :, :])
+        add_benchmark_result("aggregate_sco_ndfd_var_periods_" + ndfd_var, "function", benchmark_case,
+                             run_benchmark(functools.partial(aggregate_sco_ndfd_var_periods, var_period_raw_data, var_times[var_period_index], [24, 48, 72], ndfd_var), num_repeats = num_repeats))
+
+    # tidy
+    for ndfd_var in ("qpf", "pop12"):
+        add_benchmark_result("tidy_sco_ndfd_data_" + ndfd_var, "function", benchmark_case,
+                             run_benchmark(functools.partial(tidy_sco_ndfd_data, ndfd_data, ndfd_datetime_uct_str, ndfd_var, ndfd_coords = ndfd_coords), num_repeats = num_repeats))
+    add_benchmark_result("tidy", "stage", benchmark_case, run_benchmark(functools.partial(run_tidy_stage, ndfd_data), num_repeats = num_repeats))
+
+    # grid
+    ndfd_tidy_data = run_tidy_stage(ndfd_data)
+    add_benchmark_result("make_sco_ndfd_grid_pop12", "function", benchmark_case,
+                         run_benchmark(functools.partial(make_sco_ndfd_grid, ndfd_tidy_data['pop12'], "pop12"), num_repeats = num_repeats))
+    add_benchmark_result("grid", "stage", benchmark_case, run_benchmark(functools.partial(run_grid_stage, ndfd_tidy_data), num_repeats = num_repeats))
+
+    # zonal stats
+    ndfd_grids = run_grid_stage(ndfd_tidy_data)
+    add_benchmark_result("get_sco_ndfd_cmu_weights", "function", benchmark_case,
+                         run_benchmark(functools.partial(get_sco_ndfd_cmu_weights, cmu_bounds, ndfd_grids['pop12'][2], ndfd_proj4), num_repeats = num_repeats))
+    cmu_weights = get_sco_ndfd_cmu_weights(cmu_bounds, ndfd_grids['pop12'][2], ndfd_proj4)
+    add_benchmark_result("calc_sco_ndfd_cmu_means_pop12", "function", benchmark_case,
+                         run_benchmark(functools.partial(calc_sco_ndfd_cmu_means, cmu_weights, ndfd_grids['pop12'][0]), num_repeats = num_repeats))
+    add_benchmark_result("zonal", "stage", benchmark_case,
+                         run_benchmark(functools.partial(run_zonal_stage, ndfd_grids, cmu_bounds, rainfall_thresh_data, sga_names, lease_data), num_repeats = num_repeats))
+
+
+# %% lease benchmarks (lease calcs and database update)
+
+# cmu calcs on the lease grid
+ndfd_data = make_synthetic_sco_ndfd_data(lease_grid_size, max_time_hrs = max_time_hrs, nan_frac = nan_frac)
+cmu_bounds, rainfall_thresh_data, sga_names = make_synthetic_cmu_bounds(get_sco_ndfd_coords(ndfd_data), ndfd_proj4, num_cmus = num_cmus)
+ndfd_grids = run_grid_stage(run_tidy_stage(ndfd_data))
+ndfd_grid_coords = ndfd_grids['pop12'][2]
+
+for num_leases in lease_sizes:
+    benchmark_case = "leases=" + str(num_leases)
+    lease_data = make_synthetic_lease_data(num_leases, cmu_bounds, rainfall_thresh_data)
+    ndfd_cmu_calcs_data, ndfd_sga_calcs_data, ndfd_lease_calcs_data = run_zonal_stage(ndfd_grids, cmu_bounds, rainfall_thresh_data, sga_names, lease_data)
+
+    # lease calcs
+    add_benchmark_result("get_sco_ndfd_lease_index", "function", benchmark_case,
+                         run_benchmark(functools.partial(get_sco_ndfd_lease_index, lease_data, cmu_bounds, ndfd_grid_coords, ndfd_proj4), num_repeats = num_repeats))
+    lease_index = get_sco_ndfd_lease_index(lease_data, cmu_bounds, ndfd_grid_coords, ndfd_proj4)
+    add_benchmark_result("calc_sco_ndfd_lease_calcs", "function", benchmark_case,
+                         run_benchmark(functools.partial(calc_sco_ndfd_lease_calcs, lease_index, ndfd_cmu_calcs_data), num_repeats = num_repeats))
+
+    # lease inserts into an empty ncdmf_leases table (replaces make_lease_sql_query())
+    add_benchmark_result("insert_ncdmf_leases", "function", benchmark_case,
+                         run_benchmark(lambda db_conn: insert_ncdmf_leases(db_conn, lease_data),
+                                       setup_func = lambda: (open_synthetic_db(lease_data.iloc[0:0], 0., 0.),),
+                                       teardown_func = close_synthetic_db, num_repeats = num_repeats))
+
+    # new lease anti-join (10% of leases are new)
+    add_benchmark_result("get_new_ncdmf_leases", "function", benchmark_case,
+                         run_benchmark(lambda db_conn: get_new_ncdmf_leases(db_conn, lease_data),
+                                       setup_func = lambda: (open_synthetic_db(lease_data, 0.9, 0.),),
+                                       teardown_func = close_synthetic_db, num_repeats = num_repeats))
+
+    # closure probability upserts for every lease
+    closure_prob_data = pandas.DataFrame({'lease_id': numpy.arange(1, len(ndfd_lease_calcs_data) + 1),
+                                          'forecast_date': ndfd_lease_calcs_data['day'].astype(str),
+                                          'prob_1d_perc': ndfd_lease_calcs_data['prob_1d_perc'],
+                                          'prob_2d_perc': ndfd_lease_calcs_data['prob_2d_perc'],
+                                          'prob_3d_perc': ndfd_lease_calcs_data['prob_3d_perc']})
+    add_benchmark_result("upsert_closure_probabilities", "function", benchmark_case,
+                         run_benchmark(lambda db_conn: upsert_closure_probabilities(db_conn, closure_prob_data),
+                                       setup_func = lambda: (open_synthetic_db(lease_data.iloc[0:0], 0., 0.),),
+                                       teardown_func = close_synthetic_db, num_repeats = num_repeats))
+
+    # database update stage (10% new leases and 20% user leases)
+    add_benchmark_result("db", "stage", benchmark_case,
+                         run_benchmark(lambda db_conn: update_shellcast_db(db_conn, ndfd_sga_calcs_data, lease_data, ndfd_lease_calcs_data),
+                                       setup_func = lambda: (open_synthetic_db(lease_data, 0.9, 0.2),),
+                                       teardown_func = close_synthetic_db, num_repeats = num_repeats))
+
+
+# %% save results
+
+git_commit_run = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd = analysis_base_path, capture_output = True, text = True)
+run_info = {'datetime_uct': pandas.Timestamp.now(tz = "UTC").strftime("%Y-%m-%d %H:%M:%S"),
+            'git_commit': git_commit_run.stdout.strip() if (git_commit_run.returncode == 0) else None,
+            'python': platform.python_version(),
+            'numpy': numpy.__version__,
+            'pandas': pandas.__version__,
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'grid_sizes': grid_sizes,
+            'max_time_hrs': max_time_hrs,
+            'nan_frac': nan_frac,
+            'lease_sizes': lease_sizes,
+            'lease_grid_size': lease_grid_size,
+            'num_cmus': num_cmus,
+            'num_repeats': num_repeats}
+
+os.makedirs(benchmark_output_path, exist_ok = True)
+benchmark_output_file = benchmark_output_path + "benchmark_results_" + time.strftime("%Y%m%d%H%M%S") + ".json"
+with open(benchmark_output_file, "w") as results_file:
+    json.dump({'run_info': run_info, 'results': benchmark_results}, results_file, indent = 1)
+
+# print status
+print("saved results to " + benchmark_output_file)
+
+
+# %% compare to baseline
+
+if os.path.exists(benchmark_baseline_file) and not update_baseline:
+    with open(benchmark_baseline_file) as baseline_file:
+        baseline_data = json.load(baseline_file)
+
+    comparison_pd = compare_benchmark_results(benchmark_results, baseline_data['results'], time_tol = time_tol, memory_tol = memory_tol)
+    print("compared to baseline from " + str(baseline_data['run_info']['datetime_uct']) + " (commit " + str(baseline_data['run_info']['git_commit']) + ")")
+    print(comparison_pd.round({'baseline_secs': 4, 'min_secs': 4, 'secs_ratio': 2, 'baseline_peak_mb': 1, 'peak_mb': 1, 'peak_mb_ratio': 2}).to_string(index = False))
+
+    num_regressions = comparison_pd['status'].str.contains("regression").sum()
+    print(str(num_regressions) + " regressions")
+    if fail_on_regression and (num_regressions > 0):
+        sys.exit(1)
+
+else:
+    with open(benchmark_baseline_file, "w") as baseline_file:
+        json.dump({'run_info': run_info, 'results': benchmark_results}, baseline_file, indent = 1)
+
+    # print status
+    print("saved results as the baseline")
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+# ---- script header ----
+script name: benchmark_startup_script.py
+purpose of script: This script times the cold start (libraries and custom functions) of each python entry point with the functions package imports
+("lazy", only what the script imports before it starts working) and with every library and function the script can use loaded up front ("eager",
+like the old exec(open(...)) loading).
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+
+# ---- notes ----
+notes:
+each run is a new python process so nothing is already imported, the time is measured in the process so python's own start up isn't included
+only the cells up to and including "# %% load custom functions" are run (no data or server needed),
+"from config import" lines are skipped so config.py isn't needed
+run from anywhere, e.g. python benchmarks/benchmark_startup_script.py
+
+"""
+
+# %% load libraries
+
+import pandas # for data mgmt
+import subprocess # for new python processes
+import json # for reading process results
+import sys # for the python executable
+import os # for file mgmt
+import re # for editing script text
+
+
+# %% set paths and options here
+
+# base path to analysis (the parent of this benchmarks directory)
+analysis_base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + "/"
+
+# entry points to time
+entry_point_scripts = ["ndfd_get_forecast_data_script.py",
+                       "ndfd_backfill_forecast_data_script.py",
+                       "ndfd_analyze_forecast_data_script.py",
+                       "gcp_update_mysqldb_script.py",
+                       "shellcast_daily_analysis.py"]
+
+# libraries to report as loaded (or not) after start up
+heavy_modules = ["pandas", "pydap.client", "scipy.sparse", "shapely", "geopandas", "rasterio", "sqlalchemy", "pymysql"]
+
+# number of new processes per entry point and mode (the median is reported)
+num_repeats = 11
+
+
+# %% startup code for one entry point
+
+def get_startup_code(script_name, mode):
+    """
+    Description: Returns the python code that starts up an entry point (its cells up to and including "# %% load custom functions"),
+                 in "eager" mode every function module in the script (and pydap if the server functions are loaded) is also imported
+    Parameters:
+        script_name (str): The entry point file name (e.g., "shellcast_daily_analysis.py")
+        mode (str): "lazy" or "eager"
+    Returns:
+        startup_str (str): Python code for the start up
+    """
+    script_str = open(analysis_base_path + script_name).read()
+
+    # keep cells up to and including the custom functions cell
+    cell_strs = re.split(r"(?m)^(?=# %%)", script_str)
+    startup_cell_strs = []
+    for cell_str in cell_strs:
+        startup_cell_strs.append(cell_str)
+        if cell_str.startswith("# %% load custom functions"):
+            break
+    startup_str = "".join(startup_cell_strs)
+
+    # use this copy of the functions package and skip config.py
+    startup_str = re.sub(r'(?m)^analysis_base_path = .*$', "analysis_base_path = " + repr(analysis_base_path), startup_str)
+    startup_str = re.sub(r'(?m)^from config import .*$', "pass", startup_str)
+
+    if (mode == "eager"):
+        function_names = sorted(set(re.findall(r"from functions\.(\w+) import", script_str)))
+        startup_str += "\n" + "\n".join(["import functions." + function_name for function_name in function_names])
+        startup_str += "\nif 'functions.get_sco_ndfd_data' in sys.modules:\n    import pydap.client\n"
+
+    return startup_str
+
+
+# %% time each entry point
+
+# run script for timing one start up in a new process
+timer_code = """
+import sys, time, json, io, contextlib
+startup_code = sys.stdin.read()
+start_time = time.perf_counter()
+with contextlib.redirect_stdout(io.StringIO()):
+    exec(compile(startup_code, "startup", "exec"), {'__name__': '__main__'})
+startup_secs = time.perf_counter() - start_time
+print(json.dumps({'secs': startup_secs, 'modules': [module for module in %r if module in sys.modules]}))
+""" % (heavy_modules,)
+
+def time_startup(startup_code):
+    """
+    Description: Returns the start up time (in seconds) and the heavy modules loaded for startup_code in a new python process
+    Parameters:
+        startup_code (str): Python code from get_startup_code()
+    Returns:
+        startup_secs (float): The start up time in seconds (python's own start up isn't included)
+        startup_modules (list): The heavy_modules that were loaded
+    """
+    timer_run = subprocess.run([sys.executable, "-c", timer_code], input = startup_code, capture_output = True, text = True, cwd = analysis_base_path)
+    if (timer_run.returncode != 0):
+        raise RuntimeError("start up failed:\n" + timer_run.stderr)
+    timer_result = json.loads(timer_run.stdout.strip().splitlines()[-1])
+    return timer_result['secs'], timer_result['modules']
+
+startup_results = []
+for script_name in entry_point_scripts:
+    startup_codes = {mode: get_startup_code(script_name, mode) for mode in ("eager", "lazy")}
+
+    # one run each that isn't timed so bytecode is already compiled (like a daily run)
+    for mode in startup_codes:
+        time_startup(startup_codes[mode])
+
+    # alternate modes so changes in machine load affect both
+    startup_secs = {mode: [] for mode in startup_codes}
+    startup_modules = {}
+    for i in range(num_repeats):
+        for mode in startup_codes:
+            run_secs, startup_modules[mode] = time_startup(startup_codes[mode])
+            startup_secs[mode].append(run_secs)
+
+    for mode in startup_codes:
+        startup_results.append({'script': script_name,
+                                'mode': mode,
+                                'median_secs': pandas.Series(startup_secs[mode]).median(),
+                                'min_secs': min(startup_secs[mode]),
+                                'modules_loaded': ", ".join(startup_modules[mode])})
+
+    # print status
+    print("timed " + script_name)
+
+
+# %% print results
+
+startup_results_pd = pandas.DataFrame(startup_results)
+startup_speedup_pd = startup_results_pd.pivot(index = "script", columns = "mode", values = "median_secs")
+startup_speedup_pd['speedup'] = startup_speedup_pd['eager'] / startup_speedup_pd['lazy']
+
+print(startup_results_pd.round({'median_secs': 3, 'min_secs': 3}).to_string(index = False))
+print(startup_speedup_pd.round(3).to_string())
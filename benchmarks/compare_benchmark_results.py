@@ -0,0 +1,53 @@
+"""
+# ---- script header ----
+script name: compare_benchmark_results.py
+purpose of script: compares benchmark results to baseline results and flags time and memory regressions
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas
+required functions: run_benchmark.py
+
+"""
+import pandas
+
+def compare_benchmark_results(benchmark_results, baseline_results, time_tol = 0.25, memory_tol = 0.25, noise_secs = 0.01, noise_mb = 1.):
+    """
+    Description: Compares benchmark results to baseline results (matched by benchmark and case) and flags results that are slower or use more memory than the baseline,
+                 times are compared with the fastest run (min_secs) because it changes the least with other load on the computer
+    Parameters:
+        benchmark_results (list): A list of result dictionaries with benchmark, case, min_secs, and peak_mb (see benchmark_hot_paths_script.py)
+        baseline_results (list): A list of result dictionaries from an earlier run
+        time_tol (float): A result is a time regression when min_secs is more than (1 + time_tol) times the baseline (default is 0.25)
+        memory_tol (float): A result is a memory regression when peak_mb is more than (1 + memory_tol) times the baseline (default is 0.25)
+        noise_secs (float): Time changes are ignored when they're less than this many seconds (timer noise) (default is 0.01)
+        noise_mb (float): Memory changes are ignored when they're less than this many MB (default is 1)
+    Returns:
+        comparison_pd (data frame): A pandas dataframe with benchmark, case, baseline_secs, min_secs, secs_ratio, baseline_peak_mb, peak_mb, peak_mb_ratio,
+                                    and status ("ok", "faster", "time regression", "memory regression", "time and memory regression", or "new" when it's not in the baseline)
+    Required:
+        import pandas
+    """
+    result_cols = ['benchmark', 'case', 'min_secs', 'peak_mb']
+    benchmark_pd = pandas.DataFrame(benchmark_results, columns = result_cols)
+    baseline_pd = pandas.DataFrame(baseline_results, columns = result_cols).rename(columns = {'min_secs': 'baseline_secs', 'peak_mb': 'baseline_peak_mb'})
+    comparison_pd = benchmark_pd.merge(baseline_pd, how = "left", on = ['benchmark', 'case'])
+
+    comparison_pd['secs_ratio'] = comparison_pd['min_secs'] / comparison_pd['baseline_secs']
+    comparison_pd['peak_mb_ratio'] = comparison_pd['peak_mb'] / comparison_pd['baseline_peak_mb']
+
+    # flag changes (changes under noise_secs or noise_mb are too small to tell from noise)
+    timed = (comparison_pd['min_secs'] - comparison_pd['baseline_secs']).abs() >= noise_secs
+    time_regression = timed & (comparison_pd['secs_ratio'] > (1 + time_tol))
+    memory_regression = ((comparison_pd['peak_mb'] - comparison_pd['baseline_peak_mb']) >= noise_mb) & (comparison_pd['peak_mb_ratio'] > (1 + memory_tol))
+    faster = timed & (comparison_pd['secs_ratio'] < 1 / (1 + time_tol))
+
+    comparison_pd['status'] = "ok"
+    comparison_pd.loc[faster, 'status'] = "faster"
+    comparison_pd.loc[time_regression, 'status'] = "time regression"
+    comparison_pd.loc[memory_regression, 'status'] = "memory regression"
+    comparison_pd.loc[time_regression & memory_regression, 'status'] = "time and memory regression"
+    comparison_pd.loc[comparison_pd['baseline_secs'].isna(), 'status'] = "new"
+
+    return comparison_pd[['benchmark', 'case', 'baseline_secs', 'min_secs', 'secs_ratio', 'baseline_peak_mb', 'peak_mb', 'peak_mb_ratio', 'status']]
@@ -0,0 +1,56 @@
+"""
+# ---- script header ----
+script name: make_synthetic_cmu_bounds.py
+purpose of script: returns synthetic cmu bounds (round polygons) on a sco ndfd grid with matching rainfall thresholds and sga names
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas, shapely, geopandas
+required functions: none
+
+"""
+import numpy
+import pandas
+import shapely
+import geopandas
+
+def make_synthetic_cmu_bounds(ndfd_coords, ndfd_proj4, num_cmus = 100, num_sgas = 40, cmu_radius_km = (1.5, 9.), seed = 0):
+    """
+    Description: Returns synthetic cmu bounds (round polygons in the middle half of the grid, N. America Albers) with rainfall thresholds,
+                 and the matching rainfall threshold table and sga names for calc_sco_ndfd_sga_calcs()
+    Parameters:
+        ndfd_coords (tuple): A (x_coords_np, y_coords_np) tuple in km from get_sco_ndfd_coords()
+        ndfd_proj4 (str): The proj4 string of the SCO NDFD grid (lambert conformal conic, m)
+        num_cmus (int): The number of cmus (default is 100)
+        num_sgas (int): The number of sgas the cmus are split between (default is 40)
+        cmu_radius_km (tuple): The (min, max) cmu radius in km (default is (1.5, 9.))
+        seed (int): The random number seed (default is 0)
+    Returns:
+        cmu_bounds (geodataframe): A geopandas geodataframe with HA_CLASS, rain_in, and geometry columns (like cmu_bounds_albers.shp)
+        rainfall_thresh_data (data frame): A pandas dataframe with HA_CLASS, grow_area, and rain_in columns (like rainfall_thresholds.csv)
+        sga_names (numpy array): The sga names (like the grow_area column of sga_bounds_simple_albers.shp)
+    Required:
+        import numpy, import pandas, import shapely, import geopandas
+    """
+    rng = numpy.random.default_rng(seed)
+    x_coords_np, y_coords_np = (numpy.asarray(ndfd_coords[0], dtype = float), numpy.asarray(ndfd_coords[1], dtype = float))
+
+    # cmu centers and radii in the middle half of the grid (ndfd projection, m)
+    x_quarter_km, y_quarter_km = ((x_coords_np.max() - x_coords_np.min()) / 4., (y_coords_np.max() - y_coords_np.min()) / 4.)
+    cmu_x_m = rng.uniform(x_coords_np.min() + x_quarter_km, x_coords_np.max() - x_quarter_km, num_cmus) * 1000.
+    cmu_y_m = rng.uniform(y_coords_np.min() + y_quarter_km, y_coords_np.max() - y_quarter_km, num_cmus) * 1000.
+    cmu_radius_m = rng.uniform(cmu_radius_km[0], cmu_radius_km[1], num_cmus) * 1000.
+    cmu_geoms = shapely.buffer(shapely.points(cmu_x_m, cmu_y_m), cmu_radius_m, quad_segs = 8)
+
+    # cmu names, sgas, and thresholds (same rainfall thresholds as the ncdmf cmus)
+    cmu_names = numpy.array(["C" + str(i).zfill(4) for i in range(num_cmus)])
+    sga_names = numpy.array(["S" + str(i).zfill(3) for i in range(num_sgas)])
+    cmu_sga_names = sga_names[numpy.arange(num_cmus) % num_sgas]
+    cmu_rain_in = rng.choice([1.5, 2., 2.5, 3., 4.], num_cmus)
+
+    na_albers_proj4 = "+proj=aea +lat_1=20 +lat_2=60 +lat_0=40 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs"
+    cmu_bounds = geopandas.GeoDataFrame({'HA_CLASS': cmu_names, 'rain_in': cmu_rain_in}, geometry = cmu_geoms, crs = ndfd_proj4).to_crs(na_albers_proj4)
+    rainfall_thresh_data = pandas.DataFrame({'HA_CLASS': cmu_names, 'grow_area': cmu_sga_names, 'rain_in': cmu_rain_in})
+
+    return cmu_bounds, rainfall_thresh_data, sga_names
@@ -0,0 +1,58 @@
+"""
+# ---- script header ----
+script name: make_synthetic_lease_data.py
+purpose of script: returns a synthetic ncdmf lease centroid table (like lease_centroids_db_wgs84.csv) with leases in and around synthetic cmu bounds
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas, shapely, geopandas
+required functions: make_synthetic_cmu_bounds.py
+
+"""
+import numpy
+import pandas
+import shapely
+import geopandas
+
+def make_synthetic_lease_data(num_leases, cmu_bounds, rainfall_thresh_data, in_cmu_frac = 0.9, seed = 0):
+    """
+    Description: Returns a synthetic lease centroid table, in_cmu_frac of the leases are inside a cmu and the rest are anywhere in the cmu bounds extent
+    Parameters:
+        num_leases (int): The number of leases (e.g., 100 to 100000)
+        cmu_bounds (geodataframe): A geopandas geodataframe of cmu polygons from make_synthetic_cmu_bounds()
+        rainfall_thresh_data (data frame): A pandas dataframe with HA_CLASS, grow_area, and rain_in columns from make_synthetic_cmu_bounds()
+        in_cmu_frac (float): The fraction of leases inside a cmu (default is 0.9)
+        seed (int): The random number seed (default is 0)
+    Returns:
+        lease_data (data frame): A pandas dataframe with ncdmf_lease_id, grow_area_name, rainfall_thresh_in, longitude, and latitude (wgs84) columns
+    Required:
+        import numpy, import pandas, import shapely, import geopandas, must load and run make_synthetic_cmu_bounds() function before this
+    """
+    rng = numpy.random.default_rng(seed)
+
+    # leases in a cmu, a random point in the cmu bounding box that's inside the cmu (cmus are round so most points are)
+    lease_cmu_rows = rng.integers(0, len(cmu_bounds), num_leases)
+    cmu_extents = shapely.bounds(cmu_bounds.geometry.to_numpy())[lease_cmu_rows]
+    lease_x = rng.uniform(cmu_extents[:, 0], cmu_extents[:, 2])
+    lease_y = rng.uniform(cmu_extents[:, 1], cmu_extents[:, 3])
+    cmu_centroids = shapely.get_coordinates(cmu_bounds.geometry.centroid.to_numpy())[lease_cmu_rows]
+    outside_cmu = ~shapely.contains_xy(cmu_bounds.geometry.to_numpy()[lease_cmu_rows], lease_x, lease_y)
+    lease_x[outside_cmu], lease_y[outside_cmu] = (cmu_centroids[outside_cmu, 0], cmu_centroids[outside_cmu, 1])
+
+    # leases anywhere in the cmu bounds extent (may not be in a cmu)
+    anywhere = rng.random(num_leases) >= in_cmu_frac
+    total_extent = cmu_bounds.total_bounds
+    lease_x[anywhere] = rng.uniform(total_extent[0], total_extent[2], anywhere.sum())
+    lease_y[anywhere] = rng.uniform(total_extent[1], total_extent[3], anywhere.sum())
+
+    lease_points = geopandas.GeoSeries(geopandas.points_from_xy(lease_x, lease_y), crs = cmu_bounds.crs).to_crs("EPSG:4326")
+    lease_lookup = rainfall_thresh_data.set_index('HA_CLASS').loc[cmu_bounds['HA_CLASS'].to_numpy()[lease_cmu_rows]]
+
+    lease_data = pandas.DataFrame({'ncdmf_lease_id': ["L" + str(i).zfill(6) for i in range(num_leases)],
+                                   'grow_area_name': lease_lookup['grow_area'].to_numpy(),
+                                   'rainfall_thresh_in': lease_lookup['rain_in'].to_numpy(),
+                                   'longitude': lease_points.x.to_numpy(),
+                                   'latitude': lease_points.y.to_numpy()})
+
+    return lease_data
@@ -0,0 +1,79 @@
+"""
+# ---- script header ----
+script name: make_synthetic_sco_ndfd_data.py
+purpose of script: returns a synthetic nc sco ndfd dataset (qpf and pop12) with the same layout as the pydap dataset from the sco server
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pyproj, pydap
+required functions: none
+
+"""
+import numpy
+import pyproj
+from pydap.model import DatasetType, GridType, BaseType
+
+# approximate grid sizes (y rows, x columns) and grid centers (longitude, latitude) of the 2.5 km ndfd grids
+sco_ndfd_grid_sizes = {"nc": (160, 260, -78.8, 35.3),
+                       "midatlan": (500, 600, -77.5, 37.8),
+                       "conus": (1377, 2145, -96.5, 38.5)}
+
+def make_synthetic_sco_ndfd_data(grid_size = "midatlan", max_time_hrs = 72, nan_frac = 0.3, nan_scatter_frac = 0.001, seed = 0):
+    """
+    Description: Returns a synthetic SCO NDFD dataset with qpf (6 hr subperiods) and pop12 (12 hr subperiods) grids on the NDFD lambert conformal conic grid,
+                 it can be used in place of get_sco_ndfd_data() outputs (e.g., with tidy_sco_ndfd_data())
+    Parameters:
+        grid_size (str or tuple): "nc", "midatlan", or "conus" (see sco_ndfd_grid_sizes) or a (num_y, num_x, center_lon, center_lat) tuple (default is "midatlan")
+        max_time_hrs (float): The last subperiod in hours, 72 for the 3-day forecast and up to 168 for the full forecast (default is 72)
+        nan_frac (float): The fraction of the grid that's missing in every subperiod (the eastern side of the grid, like the ocean) (default is 0.3)
+        nan_scatter_frac (float): The fraction of the other grid cells that are missing in each subperiod (default is 0.001)
+        seed (int): The random number seed (default is 0)
+    Returns:
+        ndfd_data (pydap Dataset): A pydap dataset with x, y, Total_precipitation_surface_6_Hour_Accumulation, and
+                                   Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254 variables
+    Required:
+        import numpy, import pyproj, from pydap.model import DatasetType, GridType, BaseType
+    """
+    # grid size and center
+    if isinstance(grid_size, str):
+        grid_size = sco_ndfd_grid_sizes[grid_size]
+    num_y, num_x, center_lon, center_lat = grid_size
+    rng = numpy.random.default_rng(seed)
+
+    # grid coordinates in km (ndfd projection, 2.539703 km cells)
+    ndfd_proj4 = "+proj=lcc +lat_1=25 +lat_2=25 +lat_0=25 +lon_0=-95 +x_0=0 +y_0=0 +a=6371000 +b=6371000 +units=m +no_defs"
+    center_x_m, center_y_m = pyproj.Transformer.from_crs("EPSG:4326", ndfd_proj4, always_xy = True).transform(center_lon, center_lat)
+    cell_d_km = 2.539703
+    x_coords_np = (center_x_m / 1000. + (numpy.arange(num_x) - num_x / 2.) * cell_d_km).astype("float32")
+    y_coords_np = (center_y_m / 1000. + (numpy.arange(num_y) - num_y / 2.) * cell_d_km).astype("float32")
+
+    # missing cells (east of a wavy "coast" line) in every subperiod
+    coast_x = num_x * (1 - nan_frac) + 0.05 * num_x * numpy.sin(numpy.linspace(0, 3 * numpy.pi, num_y))
+    nan_mask = numpy.arange(num_x)[numpy.newaxis, :] >= coast_x[:, numpy.newaxis]
+
+    ndfd_data = DatasetType("ds")
+    ndfd_data['x'] = BaseType('x', x_coords_np, dimensions = ('x',))
+    ndfd_data['y'] = BaseType('y', y_coords_np, dimensions = ('y',))
+
+    for var_name, time_name, subperiod_hrs in (("Total_precipitation_surface_6_Hour_Accumulation", "time1", 6.),
+                                               ("Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254", "time2", 12.)):
+        var_times = numpy.arange(subperiod_hrs, max_time_hrs + subperiod_hrs, subperiod_hrs)
+
+        # qpf (kg/m2) is mostly zero with a long tail and pop12 (%) is in 0 to 100
+        if (subperiod_hrs == 6.):
+            var_values = rng.gamma(0.5, 4., (len(var_times), num_y, num_x)).astype("float32")
+            var_values[rng.random(var_values.shape) < 0.6] = 0.
+        else:
+            var_values = numpy.round(rng.random((len(var_times), num_y, num_x)) * 100.).astype("float32")
+        var_values[:, nan_mask] = numpy.nan
+        var_values[rng.random(var_values.shape) < nan_scatter_frac] = numpy.nan
+
+        var_grid = GridType(var_name)
+        var_grid[var_name] = BaseType(var_name, var_values, dimensions = (time_name, 'y', 'x'))
+        var_grid[time_name] = BaseType(time_name, var_times)
+        var_grid['y'] = BaseType('y', y_coords_np)
+        var_grid['x'] = BaseType('x', x_coords_np)
+        ndfd_data[var_name] = var_grid
+
+    return ndfd_data
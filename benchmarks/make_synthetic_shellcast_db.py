@@ -0,0 +1,64 @@
+"""
+# ---- script header ----
+script name: make_synthetic_shellcast_db.py
+purpose of script: makes a local sqlite stand-in for the shellcast mysql database with synthetic ncdmf leases and user leases
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, sqlalchemy
+required functions: make_shellcast_db_engine.py, insert_ncdmf_leases.py
+
+"""
+import numpy
+import sqlalchemy
+
+from functions.make_shellcast_db_engine import make_shellcast_db_engine
+from functions.insert_ncdmf_leases import insert_ncdmf_leases
+
+# tables used by update_shellcast_db() (sqlite versions of the mysql tables)
+shellcast_db_tables_sql = ["CREATE TABLE `sga_min_max` (`id` INTEGER PRIMARY KEY, `grow_area_name` TEXT, `min_1d_prob` REAL, `max_1d_prob` REAL, "
+                           "`min_2d_prob` REAL, `max_2d_prob` REAL, `min_3d_prob` REAL, `max_3d_prob` REAL)",
+                           "CREATE TABLE `ncdmf_leases` (`id` INTEGER PRIMARY KEY, `ncdmf_lease_id` TEXT UNIQUE, `grow_area_name` TEXT, `rainfall_thresh_in` REAL, `geometry` TEXT)",
+                           "CREATE TABLE `user_leases` (`id` INTEGER PRIMARY KEY, `ncdmf_lease_id` TEXT)",
+                           "CREATE TABLE `closure_probabilities` (`id` INTEGER PRIMARY KEY, `lease_id` INTEGER, `forecast_date` DATE, `prob_1d_perc` REAL, "
+                           "`prob_2d_perc` REAL, `prob_3d_perc` REAL, UNIQUE (`lease_id`, `forecast_date`))"]
+
+def make_synthetic_shellcast_db(db_url, lease_data, existing_lease_frac = 0.9, user_lease_frac = 0.2, seed = 0):
+    """
+    Description: Makes the ShellCast database tables in a new sqlite database, adds existing_lease_frac of the leases to ncdmf_leases (so the rest are new
+                 to update_shellcast_db()) and user_lease_frac of the leases to user_leases, and returns an engine for it
+    Parameters:
+        db_url (str): A sqlite sqlalchemy database url (e.g., "sqlite://" for in memory or "sqlite:////tmp/shellcast_benchmark.db"), the file shouldn't exist yet
+        lease_data (data frame): A pandas dataframe from make_synthetic_lease_data()
+        existing_lease_frac (float): The fraction of leases already in ncdmf_leases (default is 0.9)
+        user_lease_frac (float): The fraction of leases in user_leases (default is 0.2)
+        seed (int): The random number seed (default is 0)
+    Returns:
+        engine (sqlalchemy engine): A sqlalchemy engine for the database (an in memory database is dropped by engine.dispose())
+    Required:
+        import numpy, import sqlalchemy, must load make_shellcast_db_engine() and insert_ncdmf_leases() functions before this
+    """
+    if (sqlalchemy.engine.url.make_url(db_url).get_backend_name() != "sqlite"):
+        raise ValueError("make_synthetic_shellcast_db() only makes sqlite databases, not " + str(db_url))
+
+    rng = numpy.random.default_rng(seed)
+    engine = make_shellcast_db_engine(None, None, db_url = db_url)
+
+    with engine.connect() as db_conn:
+        with db_conn.begin():
+            for table_sql in shellcast_db_tables_sql:
+                db_conn.execute(sqlalchemy.text(table_sql))
+
+            # leases that are already in the database
+            existing_lease_data = lease_data[rng.random(len(lease_data)) < existing_lease_frac]
+            if (len(existing_lease_data) > 0):
+                insert_ncdmf_leases(db_conn, existing_lease_data)
+
+            # user leases
+            user_lease_ids = lease_data['ncdmf_lease_id'][rng.random(len(lease_data)) < user_lease_frac]
+            if (len(user_lease_ids) > 0):
+                db_conn.execute(sqlalchemy.text("INSERT INTO `user_leases` (`ncdmf_lease_id`) VALUES (:ncdmf_lease_id)"),
+                                [{'ncdmf_lease_id': lease_id} for lease_id in user_lease_ids])
+
+    return engine
@@ -0,0 +1,85 @@
+"""
+# ---- script header ----
+script name: run_benchmark.py
+purpose of script: times a function over several runs and measures its peak python memory use
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: time, tracemalloc, gc, io, contextlib, statistics
+required functions: none
+
+"""
+import time
+import tracemalloc
+import gc
+import io
+import contextlib
+import statistics
+
+def run_benchmark(benchmark_func, setup_func = None, teardown_func = None, num_repeats = 5, measure_memory = True):
+    """
+    Description: Runs benchmark_func num_repeats times and returns the median and min time, then runs it once more with tracemalloc to get its peak memory
+                 (tracemalloc slows things down so memory isn't measured in the timed runs), printed status from benchmark_func is hidden
+    Parameters:
+        benchmark_func (function): The function to time, it's called with the arguments returned by setup_func
+        setup_func (function): Optional function that returns a tuple of arguments for benchmark_func, it's run before every run and isn't timed
+                               (default is None, which calls benchmark_func with no arguments)
+        teardown_func (function): Optional function that's called with the same arguments after every run and isn't timed (e.g., to close a database) (default is None)
+        num_repeats (int): The number of timed runs (default is 5)
+        measure_memory (boolean): If True, does one more run to measure peak memory (default is True)
+    Returns:
+        benchmark_info (dict): A dictionary with median_secs, min_secs, peak_mb (peak memory allocated during the run in MB, None if not measured),
+                               num_rows (length of what benchmark_func returns, None if it doesn't have a length), and num_repeats
+    Required:
+        import time, import tracemalloc, import gc, import io, import contextlib, import statistics
+
+    Note: tracemalloc counts memory allocated by python and numpy (not by other c libraries like geos or sqlite).
+    """
+    def run_once(trace_memory):
+        benchmark_args = setup_func() if (setup_func is not None) else ()
+        gc.collect()
+        peak_mb = None
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                if trace_memory:
+                    tracemalloc.start()
+                start_time = time.perf_counter()
+                benchmark_result = benchmark_func(*benchmark_args)
+                run_secs = time.perf_counter() - start_time
+                if trace_memory:
+                    peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+        finally:
+            if trace_memory:
+                tracemalloc.stop()
+            if (teardown_func is not None):
+                teardown_func(*benchmark_args)
+        return run_secs, peak_mb, benchmark_result
+
+    run_secs_list = []
+    for i in range(num_repeats):
+        run_secs, peak_mb, benchmark_result = run_once(False)
+        run_secs_list.append(run_secs)
+
+    peak_mb = run_once(True)[1] if measure_memory else None
+
+    # number of rows in the result (dataframes and arrays) or the result itself when it's a count
+    if isinstance(benchmark_result, tuple):
+        benchmark_result = benchmark_result[0]
+    if isinstance(benchmark_result, dict):
+        row_counts = [row_count for row_count in benchmark_result.values() if isinstance(row_count, int)]
+        num_rows = sum(row_counts) if (len(row_counts) > 0) else None
+    elif isinstance(benchmark_result, int):
+        num_rows = benchmark_result
+    elif hasattr(benchmark_result, "__len__"):
+        num_rows = len(benchmark_result)
+    else:
+        num_rows = None
+
+    benchmark_info = {'median_secs': statistics.median(run_secs_list),
+                      'min_secs': min(run_secs_list),
+                      'peak_mb': peak_mb,
+                      'num_rows': num_rows,
+                      'num_repeats': num_repeats}
+
+    return benchmark_info
@@ -0,0 +1,159 @@
+"""
+# ---- script header ----
+script name: start_sco_ndfd_test_server.py
+purpose of script: starts a local stand-in for the nc sco thredds (opendap) server that serves synthetic or recorded ndfd forecast cycles
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pydap, wsgiref, socketserver, threading, random, re, time
+required functions: convert_sco_ndfd_datetime_str.py, make_synthetic_sco_ndfd_data.py
+
+"""
+import re
+import time
+import random
+import threading
+import socketserver
+from wsgiref.simple_server import WSGIServer, WSGIRequestHandler, make_server
+from pydap.handlers.lib import BaseHandler
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+from benchmarks.make_synthetic_sco_ndfd_data import make_synthetic_sco_ndfd_data
+
+def start_sco_ndfd_test_server(cycle_datetime_strs = None, ndfd_data = None, grid_size = "midatlan", latency_secs = 0., latency_jitter_secs = 0.,
+                               bandwidth_mb_per_sec = None, missing_frac = 0., error_frac = 0., truncate_frac = 0., publish_delay_secs = 0., port = 0, seed = 0):
+    """
+    Description: Starts a local OPeNDAP server in a background thread with the same url layout as the SCO NDFD TDS server
+                 (<base_server_url>YYYYMM/YYYYMMDD/YYYYMMDDHHds.midatlan.oper.bin), so get_sco_ndfd_data() and get_sco_ndfd_cycle_data() can be run against it,
+                 requests can be slowed down (latency and bandwidth) and can fail (missing cycles, server errors, and responses that are cut off)
+    Parameters:
+        cycle_datetime_strs (list): Optional list of cycles to serve as strings in "%Y-%m-%d %H:%M" format with timezone = UCT, other cycles give 404
+                                    (default is None, which serves every cycle)
+        ndfd_data (pydap Dataset or dict): Optional pydap dataset served for every cycle, or a dictionary of pydap datasets with "%Y%m%d%H" cycle strings as keys
+                                           (e.g., recorded cycles), cycles that aren't in the dictionary give 404 (default is None, which serves a synthetic dataset)
+        grid_size (str or tuple): The make_synthetic_sco_ndfd_data() grid size when ndfd_data is None (default is "midatlan")
+        latency_secs (float): Seconds to wait before answering each request (default is 0)
+        latency_jitter_secs (float): Up to this many more seconds (uniform random) to wait before answering each request (default is 0)
+        bandwidth_mb_per_sec (float): Optional maximum speed of each response in MB per second (default is None, which doesn't limit it)
+        missing_frac (float): The fraction of served cycles that give 404 anyway, picked once per cycle so a missing cycle stays missing (default is 0)
+        error_frac (float): The fraction of requests that give a 503 server error (default is 0)
+        truncate_frac (float): The fraction of data (.dods) responses that are cut off half way through (default is 0)
+        publish_delay_secs (float): Served cycles give 404 until this many seconds after the server starts, like a cycle that isn't posted yet (default is 0)
+        port (int): The port to listen on (default is 0, which picks a free port)
+        seed (int): The random number seed for latency, missing cycles, and failures (default is 0)
+    Returns:
+        server (WSGIServer): The running server with base_server_url (str, to use in place of the SCO NDFD TDS url) and request_log (list of dictionaries with
+                             method, path, status, num_bytes, and secs for each request) attributes, stop it with server.shutdown() and server.server_close()
+    Required:
+        import pydap, import wsgiref, import socketserver, import threading, import random, import re, import time,
+        must load convert_sco_ndfd_datetime_str() and make_synthetic_sco_ndfd_data() functions before this
+
+    Note: Only the .dds, .das, and .dods opendap responses are served (that's all pydap's open_url() uses), there's no thredds catalog.
+    """
+    # datasets to serve
+    if (ndfd_data is None):
+        ndfd_data = make_synthetic_sco_ndfd_data(grid_size = grid_size)
+    if isinstance(ndfd_data, dict):
+        ndfd_handlers = {cycle_str: BaseHandler(cycle_data) for cycle_str, cycle_data in ndfd_data.items()}
+    else:
+        ndfd_handler = BaseHandler(ndfd_data)
+        ndfd_handlers = None
+    served_cycle_strs = None if (cycle_datetime_strs is None) else set(convert_sco_ndfd_datetime_str(cycle_str)[2] for cycle_str in cycle_datetime_strs)
+
+    # url layout of the sco server (the month and day directories have to match the cycle)
+    base_path = "/thredds/dodsC/nws/ndfd/"
+    url_pattern = re.compile(r"^" + base_path + r"(\d{6})/(\d{8})/(\d{10})ds\.midatlan\.oper\.bin\.(dds|das|dods)$")
+
+    # random numbers are shared by the request threads
+    rng = random.Random(seed)
+    rng_lock = threading.Lock()
+    missing_cycle_strs = {}
+    chunk_bytes = 64 * 1024
+
+    def get_cycle_handler(cycle_str):
+        if (served_cycle_strs is not None) and (cycle_str not in served_cycle_strs):
+            return None
+        if ((time.perf_counter() - server.start_time) < publish_delay_secs):
+            return None
+        with rng_lock:
+            if cycle_str not in missing_cycle_strs:
+                missing_cycle_strs[cycle_str] = rng.random() < missing_frac
+        if missing_cycle_strs[cycle_str]:
+            return None
+        return ndfd_handler if (ndfd_handlers is None) else ndfd_handlers.get(cycle_str)
+
+    def serve_ndfd_data(environ, start_response):
+        request_start = time.perf_counter()
+        request_info = {'method': environ['REQUEST_METHOD'], 'path': environ['PATH_INFO'], 'status': None, 'num_bytes': 0, 'secs': None}
+        server.request_log.append(request_info)
+
+        with rng_lock:
+            wait_secs = latency_secs + latency_jitter_secs * rng.random()
+            server_error = rng.random() < error_frac
+            truncate = rng.random() < truncate_frac
+
+        url_match = url_pattern.match(environ['PATH_INFO'])
+        cycle_handler = None
+        if (url_match is not None) and (url_match.group(3)[0:6] == url_match.group(1)) and (url_match.group(3)[0:8] == url_match.group(2)):
+            cycle_handler = get_cycle_handler(url_match.group(3))
+
+        time.sleep(wait_secs)
+
+        # get the whole response first so it can be slowed down or cut off
+        response_info = {}
+        def save_response_info(status, headers, exc_info = None):
+            response_info['status'] = status
+            response_info['headers'] = [(name, value) for name, value in headers if name.lower() != "content-length"]
+
+        if server_error:
+            save_response_info("503 Service Unavailable", [('Content-Type', 'text/plain')])
+            response_body = b"service unavailable"
+        elif (cycle_handler is None):
+            save_response_info("404 Not Found", [('Content-Type', 'text/plain')])
+            response_body = b"not found"
+        else:
+            # pydap expects the path to end with the dataset name and response type
+            environ['PATH_INFO'] = "/ds." + url_match.group(4)
+            response_iter = cycle_handler(environ, save_response_info)
+            response_body = b"".join(response_iter)
+            if hasattr(response_iter, "close"):
+                response_iter.close()
+
+        # content length is always sent, so a response that's cut off fails on the client instead of looking complete
+        start_response(response_info['status'], response_info['headers'] + [('Content-Length', str(len(response_body)))])
+        request_info['status'] = int(response_info['status'][0:3])
+        if (request_info['method'] == "HEAD"):
+            request_info['secs'] = time.perf_counter() - request_start
+            return []
+        if truncate and (url_match is not None) and (url_match.group(4) == "dods") and (request_info['status'] == 200):
+            response_body = response_body[0:(len(response_body) // 2)]
+
+        def send_response_body():
+            try:
+                for chunk_start in range(0, len(response_body), chunk_bytes):
+                    chunk = response_body[chunk_start:(chunk_start + chunk_bytes)]
+                    if (bandwidth_mb_per_sec is not None):
+                        time.sleep(len(chunk) / (bandwidth_mb_per_sec * 1e6))
+                    request_info['num_bytes'] += len(chunk)
+                    yield chunk
+            finally:
+                request_info['secs'] = time.perf_counter() - request_start
+
+        return send_response_body()
+
+    # one thread per request so concurrent requests don't wait on each other
+    class ThreadingWSGIServer(socketserver.ThreadingMixIn, WSGIServer):
+        daemon_threads = True
+
+    class QuietWSGIRequestHandler(WSGIRequestHandler):
+        def log_message(self, *args):
+            pass
+
+    server = make_server("127.0.0.1", port, serve_ndfd_data, server_class = ThreadingWSGIServer, handler_class = QuietWSGIRequestHandler)
+    server.base_server_url = "http://127.0.0.1:" + str(server.server_port) + base_path
+    server.request_log = []
+    server.start_time = time.perf_counter()
+    threading.Thread(target = server.serve_forever, daemon = True).start()
+
+    return server
@@ -0,0 +1,17 @@
+"""
+# ---- script header ----
+script name: __init__.py
+purpose of script: makes the custom functions directory an importable package
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+# ---- notes ----
+notes:
+each module holds one function with the same name as the file, import functions from their module, for example
+from functions.tidy_sco_ndfd_data import tidy_sco_ndfd_data
+(analysis_base_path needs to be on sys.path, see ndfd_get_forecast_data_script.py)
+
+nothing is imported here so importing one function only loads the libraries it needs (e.g., pydap, geopandas, sqlalchemy)
+
+"""
@@ -0,0 +1,67 @@
+"""
+# ---- script header ----
+script name: aggregate_sco_ndfd_var_periods.py
+purpose of script: returns a pandas dataframe of nc sco data aggregated for a specified variable and several time periods at once
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas
+required functions: none
+
+"""
+import numpy
+import pandas
+
+def aggregate_sco_ndfd_var_periods(var_period_raw_data, var_subperiod_vals, valid_period_hrs, ndfd_var, y_index_start = 0, x_index_start = 0, compact = False):
+    """
+    Description: Returns a tidy dataframe of SCO NDFD data aggregated to every valid period (e.g., 24hr, 48hr, and 72hr) in one pass
+    Parameters:
+        var_period_raw_data (numpy array): A (time, y, x) array with all subperiods needed for the longest valid period, read once from the pydap variable
+        var_subperiod_vals (array): An array of subperiod values (e.g., 6hr, 12hr, ..., 72hr) for each time slice of var_period_raw_data, in ascending order
+        valid_period_hrs (list): A list of valid period end values (e.g., [24, 48, 72]), each period covers the subperiods after the previous valid period up to and including its own end
+        ndfd_var (str): either "qpf" or "pop12", the SCO NDFD variable of interest
+        y_index_start (integer): Grid y index of the first row of var_period_raw_data when it's a subset of the full grid (default is 0)
+        x_index_start (integer): Grid x index of the first column of var_period_raw_data when it's a subset of the full grid (default is 0)
+        compact (boolean): When True y_index, x_index, and valid_period_hrs are int16 and values are float32 instead of int64, float, and str (default is False)
+    Returns:
+        var_agg_data_pd (data frame): A pandas dataframe with columns y_index, x_index, qpf_value_kgperm2 or pop12_value_perc, and valid_period_hrs with one block of rows per valid period
+    Required:
+        import numpy, import pandas
+
+    Note: All valid periods are reduced with one segmented reduction along the time axis (numpy reduceat), so adding longer valid periods (e.g., out to 168hr) does not add reads from the server.
+    """
+    # first subperiod position of each valid period
+    valid_period_hrs = numpy.asarray(valid_period_hrs)
+    valid_period_start_hrs = numpy.concatenate(([0.], valid_period_hrs[:-1]))
+    valid_period_start_index = numpy.searchsorted(var_subperiod_vals, valid_period_start_hrs, side = 'right')
+
+    if ndfd_var == "qpf":
+        # aggregate subperiods within each period (take summation, missing values are skipped and cells with no data sum to zero)
+        var_period_fill_data = numpy.where(numpy.isnan(var_period_raw_data), 0, var_period_raw_data)
+        var_period_agg_np = numpy.add.reduceat(var_period_fill_data, valid_period_start_index, axis = 0)
+        var_value_col = "qpf_value_kgperm2"
+
+    else: # ndfd_var == "pop12"
+        # aggregate subperiods within each period (take maximum, missing values are skipped and cells with no data stay missing)
+        var_period_agg_np = numpy.fmax.reduceat(var_period_raw_data, valid_period_start_index, axis = 0)
+        var_value_col = "pop12_value_perc"
+
+    # make long dataframe of aggregated data (row major order within each valid period)
+    num_periods, num_y, num_x = var_period_agg_np.shape
+    if compact:
+        var_agg_data_pd = pandas.DataFrame({'y_index': numpy.tile(numpy.repeat(numpy.arange(y_index_start, y_index_start + num_y, dtype = numpy.int16), num_x), num_periods),
+                                            'x_index': numpy.tile(numpy.arange(x_index_start, x_index_start + num_x, dtype = numpy.int16), num_y * num_periods),
+                                            var_value_col: var_period_agg_np.ravel().astype(numpy.float32, copy = False),
+                                            'valid_period_hrs': numpy.repeat(valid_period_hrs.astype(numpy.int16), num_y * num_x)})
+
+    else:
+        var_agg_data_pd = pandas.DataFrame({'y_index': numpy.tile(numpy.repeat(numpy.arange(y_index_start, y_index_start + num_y), num_x), num_periods),
+                                            'x_index': numpy.tile(numpy.arange(x_index_start, x_index_start + num_x), num_y * num_periods),
+                                            var_value_col: var_period_agg_np.ravel(),
+                                            'valid_period_hrs': numpy.repeat(valid_period_hrs.astype(int).astype(str), num_y * num_x)})
+
+    # print response
+    print(ndfd_var + " " + ", ".join(valid_period_hrs.astype(int).astype(str)) + " hr periods aggregated")
+
+    return(var_agg_data_pd)
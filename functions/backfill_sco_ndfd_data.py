@@ -0,0 +1,160 @@
+"""
+# ---- script header ----
+script name: backfill_sco_ndfd_data.py
+purpose of script: fetches, tidies, and exports many past nc sco ndfd forecast cycles at once
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pydap, requests, numpy, pandas, datetime, os, time, random, threading, concurrent.futures, urllib.parse, sqlite3
+required functions: convert_sco_ndfd_datetime_str.py, get_sco_ndfd_cycle_data.py, get_sco_ndfd_cache_file.py, get_sco_ndfd_data.py, get_sco_ndfd_coords.py, get_sco_ndfd_subset_index.py, aggregate_sco_ndfd_var_periods.py, make_sco_ndfd_tidy_df.py, tidy_sco_ndfd_data.py, make_shellcast_ledger.py, write_shellcast_ledger.py, get_shellcast_ledger_missing.py, read_sco_ndfd_cache.py and write_sco_ndfd_cache.py (optional)
+
+"""
+import os
+import time
+import random
+import threading
+import concurrent.futures
+import urllib.parse
+import pandas
+import requests
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+from functions.get_sco_ndfd_cycle_data import get_sco_ndfd_cycle_data
+from functions.tidy_sco_ndfd_data import tidy_sco_ndfd_data
+from functions.make_shellcast_ledger import make_shellcast_ledger
+from functions.write_shellcast_ledger import write_shellcast_ledger
+from functions.get_shellcast_ledger_missing import get_shellcast_ledger_missing
+
+def backfill_sco_ndfd_data(base_server_url, datetime_uct_str_list, output_path, ledger_file, ndfd_var_names = None, ndfd_bbox_km = None,
+                           ndfd_cache_path = None, max_workers = 4, max_host_connections = 4, max_retries = 3, backoff_secs = 2., ledger_batch_size = 100, csv_log_file = None):
+    """
+    Description: Fetches, tidies, and exports qpf and pop12 SCO NDFD data for a list of past forecast cycles using a pool of threads,
+                 cached cycles are read from the local cache without going to the server, server and connection errors are retried with exponential backoff
+                 (other errors fail the cycle right away) and finished cycles are recorded in the run ledger (stage "backfill") so a stopped backfill can be restarted
+    Parameters:
+        base_server_url (str): Base URL (string) for the SCO NDFD TDS server
+        datetime_uct_str_list (list): A list of strings in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT, one per forecast cycle
+        output_path (str): A string defining the directory path where qpf_YYYYMMDDHH.csv and pop12_YYYYMMDDHH.csv files are saved
+        ledger_file (str): A string defining the run ledger file path (see make_shellcast_ledger()) where the status of each cycle is saved,
+                           cycles that are already "available" or "not_available" in the ledger are skipped
+        ndfd_var_names (list): Optional list of SCO NDFD variable names to request, passed to get_sco_ndfd_cycle_data() (default is None, which opens all variables)
+        ndfd_bbox_km (list): Optional bounding box [xmin, ymin, xmax, ymax] in NDFD grid km, passed to get_sco_ndfd_cycle_data() (default is None, which requests the full grid)
+        ndfd_cache_path (str): Optional local cache directory path, passed to get_sco_ndfd_cycle_data() and tidy_sco_ndfd_data() (default is None, which doesn't use a cache)
+        max_workers (integer): Number of cycles processed at the same time (default is 4)
+        max_host_connections (integer): Maximum number of cycles requesting data from the same server at the same time (default is 4)
+        max_retries (integer): Number of times a cycle is retried after a server or connection error (a requests error, e.g., a bad server status) (default is 3)
+        backoff_secs (float): Wait before the first retry in seconds, doubles for each retry (default is 2)
+        ledger_batch_size (integer): Number of finished cycles that are saved to the ledger at once (default is 100), up to this many cycles are done again if the backfill is stopped
+        csv_log_file (str): Optional old csv progress file (backfill_log.csv) to import to the ledger the first time it's used (default is None)
+    Returns:
+        backfill_status_pd (data frame): A pandas dataframe with datetime_uct_str and status ("available", "not_available", or "failed") for each cycle processed in this run
+    Required:
+        import pandas, import numpy, import requests, import os, import time, import random, import threading, import concurrent.futures, import urllib.parse, import sqlite3,
+        must load convert_sco_ndfd_datetime_str(), get_sco_ndfd_cycle_data(), get_sco_ndfd_cache_file(), get_sco_ndfd_data(), get_sco_ndfd_coords(), get_sco_ndfd_subset_index(), aggregate_sco_ndfd_var_periods(), make_sco_ndfd_tidy_df(), tidy_sco_ndfd_data(), make_shellcast_ledger(), write_shellcast_ledger(), and get_shellcast_ledger_missing() functions before this
+    """
+    # make output directory
+    os.makedirs(output_path, exist_ok = True)
+
+    # only run cycles that aren't done (from an earlier run)
+    ledger_conn = make_shellcast_ledger(ledger_file, csv_log_files = None if (csv_log_file is None) else {'backfill': csv_log_file})
+    todo_datetime_uct_strs = get_shellcast_ledger_missing(ledger_conn, datetime_uct_str_list, "backfill")
+    print("backfilling " + str(len(todo_datetime_uct_strs)) + " of " + str(len(datetime_uct_str_list)) + " cycles")
+
+    # limit the number of cycles requesting data from each server at the same time
+    host_limits = {urllib.parse.urlsplit(base_server_url).netloc: threading.BoundedSemaphore(max_host_connections)}
+
+    # one requests session (connection pool) per thread
+    thread_data = threading.local()
+
+    def backfill_cycle(datetime_uct_str):
+        # get this thread's session
+        if not hasattr(thread_data, 'session'):
+            thread_data.session = requests.Session()
+
+        for attempt in range(0, max_retries + 1):
+            try:
+                with host_limits[urllib.parse.urlsplit(base_server_url).netloc]:
+                    # get data (local cache first, same as the daily run)
+                    cycle_data = get_sco_ndfd_cycle_data(base_server_url, datetime_uct_str, ndfd_var_names, ndfd_cache_path = ndfd_cache_path,
+                                                         ndfd_bbox_km = ndfd_bbox_km, session = thread_data.session)
+
+                    # 404 means the cycle isn't on the server (don't retry), anything else is a server or connection error
+                    if not (cycle_data['cached'] or (cycle_data['ndfd_data'] is not None)):
+                        if (cycle_data['fetch_info']['status_code'] == 404):
+                            return datetime_uct_str, "not_available"
+                        raise requests.exceptions.HTTPError("server status " + str(cycle_data['fetch_info']['status_code']))
+
+                    # tidy qpf and pop12 data (coordinates and grid subset are shared by both variables)
+                    qpf_data_pd, datetime_ymdh_str = tidy_sco_ndfd_data(cycle_data['ndfd_data'], datetime_uct_str, "qpf", ndfd_coords = cycle_data['ndfd_coords'],
+                                                                        ndfd_subset_index = cycle_data['ndfd_subset_index'], ndfd_cache_path = ndfd_cache_path)
+                    pop12_data_pd, datetime_ymdh_str = tidy_sco_ndfd_data(cycle_data['ndfd_data'], datetime_uct_str, "pop12", ndfd_coords = cycle_data['ndfd_coords'],
+                                                                          ndfd_subset_index = cycle_data['ndfd_subset_index'], ndfd_cache_path = ndfd_cache_path)
+
+                # only export when we have both
+                if ((len(qpf_data_pd) > 0) and (len(pop12_data_pd) > 0)):
+                    qpf_data_pd.to_csv(os.path.join(output_path, "qpf_" + datetime_ymdh_str + ".csv"), index = False)
+                    pop12_data_pd.to_csv(os.path.join(output_path, "pop12_" + datetime_ymdh_str + ".csv"), index = False)
+
+                    return datetime_uct_str, "available"
+
+                else:
+                    return datetime_uct_str, "not_available"
+
+            # retry server and connection errors with exponential backoff (and a little jitter so threads don't retry at the same time)
+            # local errors (e.g., a full disk when caching or exporting) aren't retried
+            except requests.exceptions.RequestException as error:
+                if (attempt == max_retries):
+                    print("failed " + datetime_uct_str + " after " + str(max_retries + 1) + " attempts: " + str(error))
+
+                    return datetime_uct_str, "failed"
+
+                wait_secs = backoff_secs * (2 ** attempt) + random.uniform(0, backoff_secs)
+                print("retrying " + datetime_uct_str + " in " + str(round(wait_secs, 1)) + " s: " + str(error))
+                time.sleep(wait_secs)
+
+            # other errors (e.g., in tidying) won't go away by fetching again
+            except Exception as error:
+                print("failed " + datetime_uct_str + ": " + type(error).__name__ + ": " + str(error))
+
+                return datetime_uct_str, "failed"
+
+    def run_backfill_cycle(datetime_uct_str):
+        cycle_start = time.perf_counter()
+        datetime_uct_str, status = backfill_cycle(datetime_uct_str)
+
+        return datetime_uct_str, status, time.perf_counter() - cycle_start
+
+    # run cycles in a pool of threads and record each cycle as it finishes (only this thread writes to the ledger, ledger_batch_size cycles at a time)
+    backfill_status = []
+    ledger_rows = []
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers = max_workers) as executor:
+            backfill_futures = [executor.submit(run_backfill_cycle, datetime_uct_str) for datetime_uct_str in todo_datetime_uct_strs]
+
+            for backfill_future in concurrent.futures.as_completed(backfill_futures):
+                datetime_uct_str, status, wall_secs = backfill_future.result()
+                backfill_status.append([datetime_uct_str, status])
+
+                # ledger rows for the cycle and each output file
+                ledger_rows.append({'stage': "backfill", 'datetime_uct_str': datetime_uct_str, 'status': status, 'wall_secs': wall_secs, 'output_path': output_path})
+                if (status == "available"):
+                    datetime_ymdh_str = convert_sco_ndfd_datetime_str(datetime_uct_str)[2]
+                    ledger_rows.extend([{'stage': "backfill", 'ndfd_var': ndfd_var, 'datetime_uct_str': datetime_uct_str, 'status': status,
+                                         'output_path': os.path.join(output_path, ndfd_var + "_" + datetime_ymdh_str + ".csv")} for ndfd_var in ("qpf", "pop12")])
+                if (len(backfill_status) % ledger_batch_size == 0):
+                    write_shellcast_ledger(ledger_conn, ledger_rows)
+                    ledger_rows = []
+
+                # print status
+                print(status + ": " + datetime_uct_str + " (" + str(len(backfill_status)) + " of " + str(len(todo_datetime_uct_strs)) + ")")
+
+    # save the last batch (also when the backfill is stopped)
+    finally:
+        if (len(ledger_rows) > 0):
+            write_shellcast_ledger(ledger_conn, ledger_rows)
+        ledger_conn.close()
+
+    backfill_status_pd = pandas.DataFrame(backfill_status, columns = ['datetime_uct_str', 'status'])
+
+    return backfill_status_pd
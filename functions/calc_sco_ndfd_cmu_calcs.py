@@ -0,0 +1,58 @@
+"""
+# ---- script header ----
+script name: calc_sco_ndfd_cmu_calcs.py
+purpose of script: returns the probability of closure for every cmu and valid period (ndfd_cmu_calcs table)
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas
+required functions: calc_sco_ndfd_cmu_means.py
+
+"""
+import numpy
+import pandas
+
+def calc_sco_ndfd_cmu_calcs(cmu_names, cmu_rain_in, valid_period_hrs, cmu_pop12_perc, cmu_qpf_in, datetime_uct_str):
+    """
+    Description: Returns the ndfd_cmu_calcs table with the probability of closure (pop12 * exp(-rainfall threshold / qpf)) for every cmu and valid period at once
+    Parameters:
+        cmu_names (array): An array of cmu names (HA_CLASS)
+        cmu_rain_in (array): An array of cmu rainfall thresholds in inches, in the same order as cmu_names
+        valid_period_hrs (list): A list of valid periods in hours (e.g., [24, 48, 72])
+        cmu_pop12_perc (numpy array): A (cmu, valid period) array of area weighted pop12 in percent, from calc_sco_ndfd_cmu_means()
+        cmu_qpf_in (numpy array): A (cmu, valid period) array of area weighted qpf in inches, from calc_sco_ndfd_cmu_means()
+        datetime_uct_str (str): A string in "%Y-%m-%d" format (e.g., "2016-01-01") with the forecast date (UCT)
+    Returns:
+        ndfd_cmu_calcs_pd (data frame): A pandas dataframe with row_num, HA_CLASS, rainfall_thresh_in, datetime_uct, valid_period_hrs, pop12_perc, qpf_in,
+                                        and prob_close_perc with one block of rows per valid period (same as ndfd_analyze_forecast_data_script.R)
+    Required:
+        import numpy, import pandas
+
+    Note: pop12 and qpf are rounded to 2 decimals before the probability is calculated (like the R script), cmus with qpf of 0 (no rain) have a probability of 0,
+          and cmus without data (nan pop12 or qpf) have a nan probability (the R script gives these 0).
+    """
+    # one row per valid period and cmu (valid period is the outer loop)
+    num_cmu, num_periods = (len(cmu_names), len(valid_period_hrs))
+    pop12_perc = numpy.round(numpy.asarray(cmu_pop12_perc, dtype = float).T.ravel(), 2)
+    qpf_in = numpy.round(numpy.asarray(cmu_qpf_in, dtype = float).T.ravel(), 2)
+    rain_in = numpy.tile(numpy.asarray(cmu_rain_in, dtype = float), num_periods)
+
+    # probability of closure (equation 1 in proposal)
+    # exp(-rain_in/qpf_in) goes to 0 as qpf_in goes to 0, so set qpf_in <= 0 to 0 instead of dividing by 0
+    qpf_pos = qpf_in > 0
+    prob_close_perc = numpy.zeros(len(qpf_in))
+    prob_close_perc[qpf_pos] = pop12_perc[qpf_pos] * numpy.exp(-rain_in[qpf_pos] / qpf_in[qpf_pos])
+    prob_close_perc[numpy.isnan(pop12_perc) | numpy.isnan(qpf_in)] = numpy.nan
+    prob_close_perc = numpy.round(prob_close_perc, 1)
+
+    ndfd_cmu_calcs_pd = pandas.DataFrame({'row_num': numpy.arange(1, num_cmu * num_periods + 1),
+                                          'HA_CLASS': numpy.tile(numpy.asarray(cmu_names), num_periods),
+                                          'rainfall_thresh_in': rain_in,
+                                          'datetime_uct': datetime_uct_str,
+                                          'valid_period_hrs': numpy.repeat(numpy.asarray(valid_period_hrs, dtype = int), num_cmu),
+                                          'pop12_perc': pop12_perc,
+                                          'qpf_in': qpf_in,
+                                          'prob_close_perc': prob_close_perc})
+
+    return ndfd_cmu_calcs_pd
@@ -0,0 +1,39 @@
+"""
+# ---- script header ----
+script name: calc_sco_ndfd_cmu_means.py
+purpose of script: returns area weighted means of nc sco ndfd grid values for each cmu
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, scipy
+required functions: get_sco_ndfd_cmu_weights.py
+
+"""
+import numpy
+
+def calc_sco_ndfd_cmu_means(cmu_weights, var_grid_np):
+    """
+    Description: Returns the area weighted mean of SCO NDFD grid values for each cmu and valid period, grid cells without data are left out of the mean
+    Parameters:
+        cmu_weights (dict): A dictionary from get_sco_ndfd_cmu_weights()
+        var_grid_np (numpy array): A (valid period, y, x) or (valid period, grid cell) array of values on the same grid as cmu_weights
+    Returns:
+        cmu_means_np (numpy array): A (cmu, valid period) array of area weighted means, cmus with no data in any of their grid cells are nan
+    Required:
+        import numpy, import scipy.sparse, must load and run get_sco_ndfd_cmu_weights() function before this
+    """
+    # one row per valid period and one column per grid cell
+    var_grid_np = numpy.asarray(var_grid_np, dtype = float)
+    var_grid_np = var_grid_np.reshape(var_grid_np.shape[0], -1)
+
+    # weighted sum of values and weighted sum of cells with values
+    var_valid_np = numpy.isfinite(var_grid_np)
+    cmu_value_sums_np = cmu_weights['weights'] @ numpy.where(var_valid_np, var_grid_np, 0.).T
+    cmu_weight_sums_np = cmu_weights['weights'] @ var_valid_np.T.astype(float)
+
+    # weighted means
+    with numpy.errstate(invalid = 'ignore', divide = 'ignore'):
+        cmu_means_np = numpy.where(cmu_weight_sums_np > 0, cmu_value_sums_np / cmu_weight_sums_np, numpy.nan)
+
+    return cmu_means_np
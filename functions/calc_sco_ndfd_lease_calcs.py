@@ -0,0 +1,50 @@
+"""
+# ---- script header ----
+script name: calc_sco_ndfd_lease_calcs.py
+purpose of script: returns the probability of closure for every lease and valid period (ndfd_lease_calcs table)
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas
+required functions: get_sco_ndfd_lease_index.py, calc_sco_ndfd_cmu_calcs.py
+
+"""
+import numpy
+import pandas
+
+def calc_sco_ndfd_lease_calcs(lease_index, ndfd_cmu_calcs_pd):
+    """
+    Description: Returns the ndfd_lease_calcs table by looking up the cmu probability of closure of every lease (no spatial calcs),
+                 leases in more than one cmu get the maximum probability
+    Parameters:
+        lease_index (dict): A lease lookup from get_sco_ndfd_lease_index()
+        ndfd_cmu_calcs_pd (data frame): A pandas dataframe from calc_sco_ndfd_cmu_calcs(), valid periods have to be multiples of 24 hrs (gives a ValueError otherwise), with cmus in the same order as the cmu rows of lease_index
+    Returns:
+        ndfd_lease_calcs_pd (data frame): A pandas dataframe with lease_id, day, prob_1d_perc, prob_2d_perc, and prob_3d_perc
+                                          (one probability column per valid period, same as ndfd_analyze_forecast_data_script.R)
+    Required:
+        import numpy, import pandas, must load and run get_sco_ndfd_lease_index() and calc_sco_ndfd_cmu_calcs() functions before this
+
+    Note: Leases that aren't in any cmu are left out (like the R script) and cmus without data are skipped when taking the maximum.
+    """
+    # columns are named by day (e.g., 24 hrs is "1d"), so every valid period has to be whole days or columns would overwrite each other
+    valid_period_hrs_bad = [valid_period_hr for valid_period_hr in pandas.unique(ndfd_cmu_calcs_pd['valid_period_hrs']) if (float(valid_period_hr) % 24 != 0)]
+    if (len(valid_period_hrs_bad) > 0):
+        raise ValueError("valid periods have to be multiples of 24 hrs, not " + ", ".join(str(valid_period_hr) for valid_period_hr in valid_period_hrs_bad))
+
+    # (cmu, valid period) probabilities (cmu calcs have one block of rows per valid period)
+    valid_period_hrs = pandas.unique(ndfd_cmu_calcs_pd['valid_period_hrs'])
+    cmu_prob_close_perc = ndfd_cmu_calcs_pd['prob_close_perc'].to_numpy(dtype = float).reshape(len(valid_period_hrs), -1).T
+
+    # look up each lease and cmu pair and take the maximum for each lease
+    lease_rows, cmu_rows = (lease_index['lease_rows'], lease_index['cmu_rows'])
+    lease_starts = numpy.flatnonzero(numpy.diff(lease_rows, prepend = -1))
+    lease_prob_close_perc = numpy.fmax.reduceat(cmu_prob_close_perc[cmu_rows], lease_starts, axis = 0) if (len(lease_rows) > 0) else numpy.zeros((0, len(valid_period_hrs)))
+
+    ndfd_lease_calcs_pd = pandas.DataFrame({'lease_id': lease_index['lease_ids'][lease_rows[lease_starts]],
+                                            'day': ndfd_cmu_calcs_pd['datetime_uct'].iloc[0] if (len(ndfd_cmu_calcs_pd) > 0) else None})
+    for i, valid_period_hr in enumerate(valid_period_hrs):
+        ndfd_lease_calcs_pd['prob_' + str(int(valid_period_hr) // 24) + 'd_perc'] = numpy.round(lease_prob_close_perc[:, i], 0)
+
+    return ndfd_lease_calcs_pd
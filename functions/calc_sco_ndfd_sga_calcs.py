@@ -0,0 +1,50 @@
+"""
+# ---- script header ----
+script name: calc_sco_ndfd_sga_calcs.py
+purpose of script: returns the minimum and maximum probability of closure for every sga and valid period (ndfd_sga_calcs table)
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas
+required functions: calc_sco_ndfd_cmu_calcs.py
+
+"""
+import numpy
+import pandas
+
+def calc_sco_ndfd_sga_calcs(ndfd_cmu_calcs_pd, cmu_sga_lookup_pd, sga_names):
+    """
+    Description: Returns the ndfd_sga_calcs table with the minimum and maximum cmu probability of closure in each sga (grow area) for every valid period
+    Parameters:
+        ndfd_cmu_calcs_pd (data frame): A pandas dataframe from calc_sco_ndfd_cmu_calcs(), valid periods have to be multiples of 24 hrs (gives a ValueError otherwise)
+        cmu_sga_lookup_pd (data frame): A pandas dataframe with HA_CLASS and grow_area columns (e.g., from rainfall_thresholds.csv)
+        sga_names (array): An array of all sga names, sgas without cmus are kept with missing values
+    Returns:
+        ndfd_sga_calcs_pd (data frame): A pandas dataframe with grow_area_name, min_1d_prob, max_1d_prob, min_2d_prob, max_2d_prob, min_3d_prob, and max_3d_prob
+                                        (one min and max column pair per valid period, same as ndfd_analyze_forecast_data_script.R)
+    Required:
+        import numpy, import pandas, must load and run calc_sco_ndfd_cmu_calcs() function before this
+    """
+    # columns are named by day (e.g., 24 hrs is "1d"), so every valid period has to be whole days or columns would overwrite each other
+    valid_period_hrs_bad = [valid_period_hr for valid_period_hr in pandas.unique(ndfd_cmu_calcs_pd['valid_period_hrs']) if (float(valid_period_hr) % 24 != 0)]
+    if (len(valid_period_hrs_bad) > 0):
+        raise ValueError("valid periods have to be multiples of 24 hrs, not " + ", ".join(str(valid_period_hr) for valid_period_hr in valid_period_hrs_bad))
+
+    # join cmu calcs to grow areas
+    ndfd_cmu_calcs_join_pd = ndfd_cmu_calcs_pd.merge(cmu_sga_lookup_pd[['HA_CLASS', 'grow_area']].drop_duplicates(), how = "left", on = "HA_CLASS")
+
+    # min and max for each sga and valid period (cmus without data are skipped)
+    ndfd_sga_calcs_long_pd = ndfd_cmu_calcs_join_pd.groupby(['grow_area', 'valid_period_hrs'])['prob_close_perc'].agg(['min', 'max']).round(0)
+
+    # one column per statistic and valid period (e.g., 24 hrs is "1d_prob")
+    ndfd_sga_calcs_pd = ndfd_sga_calcs_long_pd.unstack('valid_period_hrs')
+    ndfd_sga_calcs_pd.columns = [stat + "_" + str(int(valid_period_hr) // 24) + "d_prob" for stat, valid_period_hr in ndfd_sga_calcs_pd.columns]
+    valid_period_days = sorted(set(int(valid_period_hr) // 24 for valid_period_hr in ndfd_cmu_calcs_pd['valid_period_hrs']))
+    sga_calcs_cols = [stat + "_" + str(valid_period_day) + "d_prob" for valid_period_day in valid_period_days for stat in ("min", "max")]
+
+    # fill in missing sgas
+    ndfd_sga_calcs_pd = ndfd_sga_calcs_pd.reindex(index = pandas.unique(numpy.asarray(sga_names)), columns = sga_calcs_cols)
+    ndfd_sga_calcs_pd = ndfd_sga_calcs_pd.rename_axis("grow_area_name").reset_index()
+
+    return ndfd_sga_calcs_pd
@@ -0,0 +1,46 @@
+"""
+# ---- script header ----
+script name: check_shellcast_stage.py
+purpose of script: decides if a stage of the daily shellcast analysis needs to run
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: os, pandas
+required functions: none
+
+"""
+import os
+import pandas
+
+def check_shellcast_stage(stage_name, stage_names, resume_stage = None, output_files = None, input_files = None, fresh_after = None, skip_fresh = True):
+    """
+    Description: Returns whether a stage of the daily ShellCast analysis needs to run, stages before resume_stage are skipped and
+                 stages with outputs that are newer than their inputs (and fresh_after) are skipped when skip_fresh is True (like make)
+    Parameters:
+        stage_name (str): The stage to check (e.g., "tidy")
+        stage_names (list): All stages in run order (e.g., ["fetch", "tidy", "grid", "zonal", "db"])
+        resume_stage (str): Optional stage to start from, stages before this are skipped (default is None, which starts from the first stage)
+        output_files (list): Optional list of file paths the stage writes (default is None, stages without outputs are never fresh)
+        input_files (list): Optional list of file paths the stage reads, outputs have to be newer than these to be fresh (default is None)
+        fresh_after (datetime): Optional pandas timestamp, outputs have to be newer than this to be fresh (e.g., the forecast cycle time) (default is None)
+        skip_fresh (boolean): If True, skip stages with fresh outputs (default is True)
+    Returns:
+        stage_status (str): "run", "skipped (resume)", or "skipped (fresh)"
+    Required:
+        import os, import pandas
+    """
+    # resume from a later stage
+    if (resume_stage is not None) and (stage_names.index(stage_name) < stage_names.index(resume_stage)):
+        return "skipped (resume)"
+
+    # outputs have to exist and be newer than the inputs and fresh_after
+    if skip_fresh and output_files and all(os.path.exists(output_file) for output_file in output_files):
+        output_mtime = min(os.path.getmtime(output_file) for output_file in output_files)
+        input_mtimes = [os.path.getmtime(input_file) for input_file in (input_files or []) if os.path.exists(input_file)]
+        if (fresh_after is not None):
+            input_mtimes.append(pandas.Timestamp(fresh_after).timestamp())
+        if (output_mtime >= max(input_mtimes, default = 0)):
+            return "skipped (fresh)"
+
+    return "run"
@@ -0,0 +1,93 @@
+"""
+# ---- script header ----
+script name: export_sco_ndfd_data.py
+purpose of script: saves a tidy dataframe of nc sco data as csv and/or parquet
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas, os, json, pyarrow (only for parquet)
+required functions: tidy_sco_ndfd_data.py
+
+"""
+import os
+import json
+import numpy
+import pandas
+
+def export_sco_ndfd_data(var_data_pd, output_path, ndfd_var, datetime_ymdh_str, output_format = "csv", partition = False):
+    """
+    Description: Saves a tidy SCO NDFD dataframe as csv (same columns as tidy_sco_ndfd_data()) and/or as typed parquet partitioned by variable and cycle
+    Parameters:
+        var_data_pd (data frame): A pandas dataframe from tidy_sco_ndfd_data() or make_sco_ndfd_tidy_df() (full or compact)
+        output_path (str): A string defining the directory path where the data are saved
+        ndfd_var (str): either "qpf" or "pop12", the SCO NDFD variable of interest
+        datetime_ymdh_str (str): A string in "%Y%m%d%H" format (e.g, "2016010100")
+        output_format (str): either "csv", "parquet", or "both" (default is "csv")
+        partition (boolean): When True csv files are saved as csv/ndfd_var=<ndfd_var>/datetime_ymdh=<YYYYMMDDHH>/part-0.csv, when False as <ndfd_var>.csv (default is False),
+                             parquet files are always saved as parquet/ndfd_var=<ndfd_var>/datetime_ymdh=<YYYYMMDDHH>/part-0.parquet
+    Returns:
+        output_files (list): A list of the file paths that were saved
+    Required:
+        import numpy, import pandas, import os, import json, pyarrow must be installed for output_format = "parquet" or "both"
+
+    Note: Parquet files keep one row per grid cell and valid period with int32 index, int16 y_index and x_index, float32 values and coordinates,
+          categorical valid_period_hrs, and a single utc timestamp column (time_uct), the string time columns are left out since they can be made from time_uct.
+          Read them back one variable at a time (qpf and pop12 have different value columns) with
+          pandas.read_parquet(output_path + "parquet/ndfd_var=qpf/", columns = [...], filters = [("datetime_ymdh", "==", 2016010100)]),
+          the datetime_ymdh partition column is read back as an integer.
+          Compact dataframes (compact = True) are saved with their cycle times (var_data_pd.attrs) in a <csv file>.json sidecar next to the csv,
+          parquet files are the same for full and compact dataframes.
+    """
+    # check output format
+    if (output_format not in ("csv", "parquet", "both")):
+        return print("Not a valid output_format option.")
+
+    # partition directory (hive style so partition columns can be filtered on when reading, one directory per format)
+    partition_path = os.path.join("ndfd_var=" + ndfd_var, "datetime_ymdh=" + datetime_ymdh_str)
+
+    output_files = []
+
+    if (output_format in ("csv", "both")):
+        if partition:
+            csv_file = os.path.join(output_path, "csv", partition_path, "part-0.csv")
+        else:
+            csv_file = os.path.join(output_path, ndfd_var + ".csv")
+
+        os.makedirs(os.path.dirname(csv_file), exist_ok = True)
+        var_data_pd.to_csv(csv_file, index = False)
+        output_files.append(csv_file)
+
+        # compact dataframes keep cycle times in attrs (not in columns)
+        if (len(var_data_pd.attrs) > 0):
+            with open(csv_file + ".json", "w") as sidecar_file:
+                json.dump(var_data_pd.attrs, sidecar_file)
+            output_files.append(csv_file + ".json")
+
+    if (output_format in ("parquet", "both")):
+        # compact dataframes don't have index and time columns
+        if ('index' in var_data_pd.columns):
+            var_index_np = var_data_pd['index'].to_numpy(dtype = numpy.int32)
+            var_time_uct = var_data_pd['time_uct_long'].dt.tz_convert(tz = 'UTC')
+        else:
+            num_periods = len(var_data_pd.attrs['valid_period_hrs'])
+            var_index_np = numpy.tile(numpy.arange(len(var_data_pd) // num_periods, dtype = numpy.int32), num_periods)
+            var_time_uct = pandas.Series(pandas.Timestamp(var_data_pd.attrs['time_uct'], tz = 'UTC'), index = var_data_pd.index)
+
+        # typed columns
+        var_value_col = "qpf_value_kgperm2" if (ndfd_var == "qpf") else "pop12_value_perc"
+        var_typed_pd = pandas.DataFrame({'index': var_index_np,
+                                         'y_index': var_data_pd['y_index'].to_numpy(dtype = numpy.int16),
+                                         'x_index': var_data_pd['x_index'].to_numpy(dtype = numpy.int16),
+                                         var_value_col: var_data_pd[var_value_col].to_numpy(dtype = numpy.float32),
+                                         'valid_period_hrs': pandas.Categorical(var_data_pd['valid_period_hrs'].astype(str)),
+                                         'longitude_km': var_data_pd['longitude_km'].to_numpy(dtype = numpy.float32),
+                                         'latitude_km': var_data_pd['latitude_km'].to_numpy(dtype = numpy.float32),
+                                         'time_uct': var_time_uct})
+
+        parquet_file = os.path.join(output_path, "parquet", partition_path, "part-0.parquet")
+        os.makedirs(os.path.dirname(parquet_file), exist_ok = True)
+        var_typed_pd.to_parquet(parquet_file, index = False)
+        output_files.append(parquet_file)
+
+    return output_files
@@ -0,0 +1,53 @@
+"""
+# ---- script header ----
+script name: get_new_ncdmf_leases.py
+purpose of script: returns the leases that aren't in the ncdmf_leases table of the mysql database yet
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas, sqlalchemy
+required functions: make_shellcast_db_engine.py
+
+"""
+import pandas
+import sqlalchemy
+
+def get_new_ncdmf_leases(db_conn, lease_data, batch_size = 1000):
+    """
+    Description: Returns the leases in lease_data that aren't in the ncdmf_leases table, the lease ids are loaded into a temporary table and compared
+                 in the database (anti-join) so only the new lease ids are sent back (not the whole ncdmf_leases table)
+    Parameters:
+        db_conn (sqlalchemy connection): An open sqlalchemy connection from make_shellcast_db_engine()
+        lease_data (data frame): A pandas dataframe with an ncdmf_lease_id column (e.g., lease_centroids_db_wgs84.csv)
+        batch_size (int): The number of lease ids in each INSERT statement into the temporary table (default is 1000)
+    Returns:
+        lease_data_new (data frame): The rows of lease_data with new ncdmf_lease_id values
+    Required:
+        import pandas, import sqlalchemy, must load and run make_shellcast_db_engine() function before this
+    """
+    temp_table_name = "ncdmf_lease_ids_temp"
+    drop_temp_table_sql = "DROP TEMPORARY TABLE IF EXISTS `" + temp_table_name + "`"
+    if (db_conn.dialect.name != "mysql"):
+        drop_temp_table_sql = "DROP TABLE IF EXISTS temp.`" + temp_table_name + "`"
+
+    # temporary table with the same ncdmf_lease_id column type as ncdmf_leases (so mysql collations match)
+    db_conn.execute(sqlalchemy.text(drop_temp_table_sql))
+    db_conn.execute(sqlalchemy.text("CREATE TEMPORARY TABLE `" + temp_table_name + "` AS SELECT `ncdmf_lease_id` FROM `ncdmf_leases` LIMIT 0"))
+
+    # load lease ids in batches (pymysql executemany() turns each batch into one multi row INSERT)
+    lease_id_params = [{'ncdmf_lease_id': lease_id} for lease_id in pandas.unique(lease_data['ncdmf_lease_id'].astype(str))]
+    for batch_start in range(0, len(lease_id_params), batch_size):
+        db_conn.execute(sqlalchemy.text("INSERT INTO `" + temp_table_name + "` (`ncdmf_lease_id`) VALUES (:ncdmf_lease_id)"),
+                        lease_id_params[batch_start:(batch_start + batch_size)])
+
+    # lease ids that aren't in ncdmf_leases
+    new_lease_ids_sql = ("SELECT t.`ncdmf_lease_id` FROM `" + temp_table_name + "` t "
+                         "LEFT JOIN `ncdmf_leases` l ON l.`ncdmf_lease_id` = t.`ncdmf_lease_id` "
+                         "WHERE l.`ncdmf_lease_id` IS NULL")
+    new_lease_ids = [row[0] for row in db_conn.execute(sqlalchemy.text(new_lease_ids_sql))]
+    db_conn.execute(sqlalchemy.text(drop_temp_table_sql))
+
+    lease_data_new = lease_data[lease_data['ncdmf_lease_id'].astype(str).isin(new_lease_ids)].reset_index(drop = True)
+
+    return lease_data_new
@@ -0,0 +1,36 @@
+"""
+# ---- script header ----
+script name: get_sco_ndfd_cache_file.py
+purpose of script: returns the local cache file path for a nc sco ndfd cycle, variable, and grid subset
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: os, hashlib
+required functions: none
+
+"""
+import os
+import hashlib
+
+def get_sco_ndfd_cache_file(cache_path, datetime_ymdh_str, ndfd_var, ndfd_subset_index = None):
+    """
+    Description: Returns the local cache file path for a SCO NDFD forecast cycle, variable, and grid subset
+    Parameters:
+        cache_path (str): A string defining the cache directory path
+        datetime_ymdh_str (str): A string in "%Y%m%d%H" format (e.g, "2016010100"), from convert_sco_ndfd_datetime_str() function
+        ndfd_var (str): the cached SCO NDFD variable (e.g., "qpf", "pop12", or "coords")
+        ndfd_subset_index (tuple): Optional (y_slice, x_slice) tuple from get_sco_ndfd_subset_index() (default is None, which is the full grid)
+    Returns:
+        cache_file (str): A string defining the cache file path, the file name is the cycle, variable, and a hash of the grid subset
+        (e.g., "2016010100_qpf_0123456789ab.npz")
+    Required:
+        import os, import hashlib
+    """
+    # hash the grid subset so each subset gets its own file
+    subset_hash = hashlib.sha1(str(ndfd_subset_index).encode("utf-8")).hexdigest()[0:12]
+
+    # define cache file path
+    cache_file = os.path.join(cache_path, datetime_ymdh_str + "_" + ndfd_var + "_" + subset_hash + ".npz")
+
+    return cache_file
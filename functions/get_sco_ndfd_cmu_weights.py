@@ -0,0 +1,100 @@
+"""
+# ---- script header ----
+script name: get_sco_ndfd_cmu_weights.py
+purpose of script: returns a sparse matrix with the fraction of each nc sco ndfd grid cell covered by each cmu
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, scipy, shapely, geopandas, os, hashlib
+required functions: none
+
+"""
+import os
+import hashlib
+import numpy
+import scipy.sparse
+import shapely
+
+def get_sco_ndfd_cmu_weights(cmu_bounds, ndfd_grid_coords, ndfd_proj4, cmu_id_col = "HA_CLASS", cache_path = None):
+    """
+    Description: Returns a sparse cmu by grid cell matrix with the fraction of each SCO NDFD grid cell covered by each cmu (like raster::rasterize(..., getCover = TRUE)),
+                 the matrix only depends on the cmu bounds and the grid so it's saved to cache_path and reused on later runs
+    Parameters:
+        cmu_bounds (geodataframe): A geopandas geodataframe of cmu polygons with a crs (e.g., cmu_bounds_albers.shp)
+        ndfd_grid_coords (tuple): A (x_coords_np, y_coords_np) tuple in km with the x and y value of each grid column and row (in y_index and x_index order),
+                                  this is the grid that's averaged so it should match the (subset) grid of the tidy data
+        ndfd_proj4 (str): The proj4 string of the SCO NDFD grid (lambert conformal conic, m)
+        cmu_id_col (str): The cmu_bounds column with cmu names (default is "HA_CLASS")
+        cache_path (str): Optional directory path where the matrix is saved, when given the matrix is read from here if it's there (default is None, which doesn't use a cache)
+    Returns:
+        cmu_weights (dict): A dictionary with 'weights' (scipy sparse csr matrix, one row per cmu and one column per grid cell in row major (y, x) order)
+                            and 'cmu_names' (numpy array of cmu names in row order)
+    Required:
+        import numpy, import scipy.sparse, import shapely, import geopandas, import os, import hashlib
+
+    Note: Coverage is the exact polygon and grid cell overlap area divided by the grid cell area on the native ndfd grid (no resampling to albers).
+    """
+    # grid cell edges (grid spacing is constant)
+    x_coords_np, y_coords_np = (numpy.asarray(ndfd_grid_coords[0], dtype = float), numpy.asarray(ndfd_grid_coords[1], dtype = float))
+    num_x, num_y = (len(x_coords_np), len(y_coords_np))
+    cell_dx_km = abs(numpy.median(numpy.diff(x_coords_np))) if (num_x > 1) else 1.
+    cell_dy_km = abs(numpy.median(numpy.diff(y_coords_np))) if (num_y > 1) else 1.
+
+    # project cmu bounds to the ndfd grid (in km)
+    cmu_names = cmu_bounds[cmu_id_col].to_numpy().astype("U")
+    cmu_geoms_ndfd = shapely.transform(cmu_bounds.to_crs(ndfd_proj4).geometry.to_numpy(), lambda coords: coords / 1000.)
+
+    # look for a cached matrix for these cmu bounds and this grid
+    if (cache_path is not None):
+        cache_key = hashlib.sha1()
+        for cmu_data in (cmu_names, x_coords_np, y_coords_np):
+            cache_key.update(numpy.ascontiguousarray(cmu_data).tobytes())
+        cache_key.update(b"".join(shapely.to_wkb(cmu_geoms_ndfd)))
+        cache_file = os.path.join(cache_path, "cmu_weights_" + cache_key.hexdigest()[0:12] + ".npz")
+
+        if os.path.exists(cache_file):
+            cache_data = numpy.load(cache_file)
+            cmu_weights = {'weights': scipy.sparse.csr_matrix((cache_data['data'], cache_data['indices'], cache_data['indptr']), shape = tuple(cache_data['shape'])),
+                           'cmu_names': cache_data['cmu_names']}
+
+            # print status
+            print("read cmu weights from cache")
+
+            return cmu_weights
+
+    # fraction of each grid cell inside each cmu
+    weight_rows, weight_cols, weight_vals = ([], [], [])
+    for cmu_row, cmu_geom in enumerate(cmu_geoms_ndfd):
+        # only check grid cells that touch the cmu bounding box
+        cmu_xmin, cmu_ymin, cmu_xmax, cmu_ymax = cmu_geom.bounds
+        cmu_x_index = numpy.where((x_coords_np + cell_dx_km / 2 > cmu_xmin) & (x_coords_np - cell_dx_km / 2 < cmu_xmax))[0]
+        cmu_y_index = numpy.where((y_coords_np + cell_dy_km / 2 > cmu_ymin) & (y_coords_np - cell_dy_km / 2 < cmu_ymax))[0]
+        if ((len(cmu_x_index) == 0) or (len(cmu_y_index) == 0)):
+            continue
+
+        # grid cell boxes and their overlap with the cmu
+        cell_y_index, cell_x_index = (numpy.repeat(cmu_y_index, len(cmu_x_index)), numpy.tile(cmu_x_index, len(cmu_y_index)))
+        cell_boxes = shapely.box(x_coords_np[cell_x_index] - cell_dx_km / 2, y_coords_np[cell_y_index] - cell_dy_km / 2,
+                                 x_coords_np[cell_x_index] + cell_dx_km / 2, y_coords_np[cell_y_index] + cell_dy_km / 2)
+        cell_cover = shapely.area(shapely.intersection(cell_boxes, cmu_geom)) / (cell_dx_km * cell_dy_km)
+
+        cell_in = cell_cover > 0
+        weight_rows.append(numpy.full(cell_in.sum(), cmu_row))
+        weight_cols.append(cell_y_index[cell_in] * num_x + cell_x_index[cell_in])
+        weight_vals.append(cell_cover[cell_in])
+
+    weights = scipy.sparse.csr_matrix((numpy.concatenate(weight_vals + [numpy.zeros(0)]),
+                                       (numpy.concatenate(weight_rows + [numpy.zeros(0, dtype = int)]), numpy.concatenate(weight_cols + [numpy.zeros(0, dtype = int)]))),
+                                      shape = (len(cmu_names), num_y * num_x))
+    cmu_weights = {'weights': weights, 'cmu_names': cmu_names}
+
+    # save to cache
+    if (cache_path is not None):
+        os.makedirs(cache_path, exist_ok = True)
+        numpy.savez(cache_file, data = weights.data, indices = weights.indices, indptr = weights.indptr, shape = numpy.array(weights.shape), cmu_names = cmu_names)
+
+    # print status
+    print("calculated cmu weights for " + str(len(cmu_names)) + " cmus")
+
+    return cmu_weights
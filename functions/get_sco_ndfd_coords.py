@@ -0,0 +1,29 @@
+"""
+# ---- script header ----
+script name: get_sco_ndfd_coords.py
+purpose of script: returns the x and y coordinate arrays of the nc sco ndfd grid
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pydap, numpy
+required functions: get_sco_ndfd_data.py
+
+"""
+import numpy
+
+def get_sco_ndfd_coords(ndfd_data):
+    """
+    Description: Returns the x and y coordinate arrays of a SCO NDFD dataset so they only have to be fetched from the server once
+    Parameters:
+        ndfd_data (pydap Dataset): Pydap dataset object for specified datetime, from get_sco_ndfd_data() function
+    Returns:
+        ndfd_coords (tuple): A tuple of numpy arrays (x_coords_np, y_coords_np) with the x (longitude_km) and y (latitude_km) value for each grid index
+    Required:
+        import numpy, must load and run get_sco_ndfd_data() function before this
+    """
+    # save x and y data
+    x_coords_np = numpy.asarray(ndfd_data['x'][:].data) # x coordinate
+    y_coords_np = numpy.asarray(ndfd_data['y'][:].data) # y coordinate
+
+    return x_coords_np, y_coords_np
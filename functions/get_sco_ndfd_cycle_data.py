@@ -0,0 +1,89 @@
+"""
+# ---- script header ----
+script name: get_sco_ndfd_cycle_data.py
+purpose of script: opens one nc sco ndfd forecast cycle from the local cache or the server
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pydap, requests, numpy, os
+required functions: convert_sco_ndfd_datetime_str.py, get_sco_ndfd_data.py, get_sco_ndfd_coords.py, get_sco_ndfd_subset_index.py, get_sco_ndfd_cache_file.py,
+                    read_sco_ndfd_cache.py, write_sco_ndfd_cache.py
+
+"""
+import os
+import requests
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+from functions.get_sco_ndfd_cache_file import get_sco_ndfd_cache_file
+from functions.get_sco_ndfd_coords import get_sco_ndfd_coords
+from functions.get_sco_ndfd_data import get_sco_ndfd_data
+from functions.get_sco_ndfd_subset_index import get_sco_ndfd_subset_index
+from functions.read_sco_ndfd_cache import read_sco_ndfd_cache
+from functions.write_sco_ndfd_cache import write_sco_ndfd_cache
+
+def get_sco_ndfd_cycle_data(base_server_url, datetime_uct_str, ndfd_var_names, ndfd_cache_path = None, ndfd_bbox_km = None, ndfd_cache_max_mb = 2000, session = None):
+    """
+    Description: Checks the local cache for one SCO NDFD forecast cycle (qpf and pop12) and only opens the server dataset if it's not cached,
+                 the result can go straight to tidy_sco_ndfd_data()
+    Parameters:
+        base_server_url (str): Base URL (string) for the SCO NDFD TDS server
+        datetime_uct_str (str): A string in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT
+        ndfd_var_names (list): A list of server variable names to request (e.g., qpf and pop12)
+        ndfd_cache_path (str): Optional directory path of the local cache (default is None, which always uses the server)
+        ndfd_bbox_km (list): Optional bounding box [xmin, ymin, xmax, ymax] to request in the ndfd grid projection and units (lambert conformal conic, km)
+                             (default is None, which requests the full grid)
+        ndfd_cache_max_mb (float): Maximum size of the local cache in megabytes (default is 2000)
+        session (requests.Session): Optional session to reuse connections to the server (default is None, which makes a new session if it's needed)
+    Returns:
+        cycle_data (dict): A dictionary with 'ndfd_data' (pydap dataset or None), 'ndfd_coords' (x and y coordinates tuple or None),
+                           'ndfd_subset_index' (grid index slices or None), 'cached' (True when both variables are in the local cache),
+                           and 'fetch_info' (from get_sco_ndfd_data() or None when cached), the data are available when cached is True or ndfd_data is not None
+    Required:
+        import pydap, import requests, import numpy, import os, must load convert_sco_ndfd_datetime_str(), get_sco_ndfd_data(), get_sco_ndfd_coords(),
+        get_sco_ndfd_subset_index(), get_sco_ndfd_cache_file(), read_sco_ndfd_cache(), and write_sco_ndfd_cache() functions before this
+    """
+    # convert datetime string for cache file names
+    datetime_ym_str, datetime_ymd_str, datetime_ymdh_str = convert_sco_ndfd_datetime_str(datetime_uct_str)
+
+    cycle_data = {'ndfd_data': None, 'ndfd_coords': None, 'ndfd_subset_index': None, 'cached': False, 'fetch_info': None}
+
+    # check local cache first (reruns don't need to go back to the server)
+    if (ndfd_cache_path is not None):
+        coords_cache = read_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, "coords")
+
+        if (coords_cache is not None):
+            cycle_data['ndfd_coords'] = (coords_cache['x_coords'], coords_cache['y_coords'])
+
+            # get grid index ranges for bounding box (None requests the full grid)
+            if (ndfd_bbox_km is not None):
+                cycle_data['ndfd_subset_index'] = get_sco_ndfd_subset_index(ndfd_coords = cycle_data['ndfd_coords'], bbox_km = ndfd_bbox_km, buffer_km = 5)
+
+            # both variables have to be cached to skip the server
+            cycle_data['cached'] = (os.path.exists(get_sco_ndfd_cache_file(ndfd_cache_path, datetime_ymdh_str, "qpf", cycle_data['ndfd_subset_index'])) and
+                                    os.path.exists(get_sco_ndfd_cache_file(ndfd_cache_path, datetime_ymdh_str, "pop12", cycle_data['ndfd_subset_index'])))
+
+    # get data from the server if it's not cached
+    if not cycle_data['cached']:
+        # one session (connection pool) for all requests to the server
+        if (session is None):
+            session = requests.Session()
+
+        cycle_data['ndfd_data'], cycle_data['fetch_info'] = get_sco_ndfd_data(base_server_url = base_server_url, datetime_uct_str = datetime_uct_str, ndfd_var_names = ndfd_var_names, session = session)
+
+        # print status
+        print("checked " + cycle_data['fetch_info']['data_url'] + " (status: " + str(cycle_data['fetch_info']['status_code']) + ", " + str(round(cycle_data['fetch_info']['check_secs'], 2)) + " s)")
+
+        if (cycle_data['ndfd_data'] is not None):
+            # get x and y coordinates once for both variables
+            cycle_data['ndfd_coords'] = get_sco_ndfd_coords(ndfd_data = cycle_data['ndfd_data'])
+
+            # save them to the local cache
+            if (ndfd_cache_path is not None):
+                write_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, "coords", {'x_coords': cycle_data['ndfd_coords'][0], 'y_coords': cycle_data['ndfd_coords'][1]}, max_cache_mb = ndfd_cache_max_mb)
+
+            # get grid index ranges for bounding box (None requests the full grid)
+            if (ndfd_bbox_km is not None):
+                cycle_data['ndfd_subset_index'] = get_sco_ndfd_subset_index(ndfd_coords = cycle_data['ndfd_coords'], bbox_km = ndfd_bbox_km, buffer_km = 5)
+
+    return cycle_data
@@ -0,0 +1,33 @@
+"""
+# ---- script header ----
+script name: get_sco_ndfd_cycle_str.py
+purpose of script: returns the nc sco ndfd forecast cycle (00 or 12 uct) to use for a given time
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas
+required functions: none
+
+"""
+import pandas
+
+def get_sco_ndfd_cycle_str(datetime_now_uct, round_hour = True):
+    """
+    Description: Returns the SCO NDFD forecast cycle for a given time, the time is rounded to the nearest hour and the cycle is midnight (00 UCT)
+                 for times between midnight and noon and noon (12 UCT) for times between noon and midnight
+    Parameters:
+        datetime_now_uct (datetime): A pandas timestamp with timezone = UCT (e.g., today at 07:00 UCT)
+        round_hour (boolean): If True, round to the nearest hour first, if False the cycle is the last 00 or 12 UCT at or before the time (default is True)
+    Returns:
+        datetime_uct_str (str): A string in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT
+    Required:
+        import pandas
+    """
+    # round to nearest hour and then down to midnight or noon
+    datetime_cycle_uct = pandas.Timestamp(datetime_now_uct).tz_convert("UTC")
+    if round_hour:
+        datetime_cycle_uct = datetime_cycle_uct.round("h")
+    datetime_cycle_uct = datetime_cycle_uct.floor("12h")
+
+    return datetime_cycle_uct.strftime("%Y-%m-%d %H:%M")
@@ -10,22 +10,32 @@ required libraries & functions: pydap, requests
 required functions: convert_sco_ndfd_datetime_str.py
 
 """
+import time
+import requests
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
 
 # %% get ndfd data function
 
-def get_sco_ndfd_data(base_server_url, datetime_uct_str):
+def get_sco_ndfd_data(base_server_url, datetime_uct_str, ndfd_var_names = None, session = None):
     """
     Description: Returns a dataframe of NC State Climate office (SCO) National Digital Forecast Dataset (NDFD) data for a specified datetime,
-                 if url does not exist then will give empty dataset
+                 if url does not exist then will give None
     Parameters:
         base_server_url (str): Base URL (string) for the SCO NDFD TDS server
         datetime_uct_str (str): A string in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT
+        ndfd_var_names (list): Optional list of SCO NDFD variable names to request (e.g., ["Total_precipitation_surface_6_Hour_Accumulation"]),
+        the x and y coordinates are always included (default is None, which opens all variables in the dataset)
+        session (requests Session): Optional requests session shared by the url check, pydap, and later data requests so connections to the server are reused (default is None, which makes a new session)
     Returns:
         ndfd_data (pydap Dataset): Pydap dataset object for specified datetime,
-        if url does not exist then will give empty dataset
+        if url does not exist then will give None
+        fetch_info (dict): A dictionary with the data_url, status_code (None if the server could not be reached), available (True or False),
+        check_secs (time to check the url), and open_secs (time to open the dataset) for logging
     Required:
         import open_url from pydap.client
         import requests
+        import time
         must load and run convert_sco_ndfd_datetime_str() function
     """
     # convert datetime string
@@ -34,18 +44,43 @@ def get_sco_ndfd_data(base_server_url, datetime_uct_str):
     # define data url
     date_str_url = year_month + "/" + year_month_day + "/" + year_month_day_hour
     data_url = base_server_url + date_str_url + "ds.midatlan.oper.bin"
-    data_url_to_check = data_url + ".html" # check with requests is working unless it has .html on end
-    # needs to be in format https://tds.climate.ncsu.edu/thredds/dodsC/nws/ndfd/YYYYMM/YYYYMMDD/YYYYMMDDHHds.midatlan.oper.bin.html
+    data_url_to_check = data_url + ".dds" # dataset descriptor, small and only exists when the dataset exists
+    # needs to be in format https://tds.climate.ncsu.edu/thredds/dodsC/nws/ndfd/YYYYMM/YYYYMMDD/YYYYMMDDHHds.midatlan.oper.bin.dds
+
+    # share one session (connection pool) with pydap
+    if (session is None):
+        session = requests.Session()
+
+    # keep track of status and timing
+    fetch_info = {'data_url': data_url, 'status_code': None, 'available': False, 'check_secs': None, 'open_secs': None}
 
-    # check if url exisits
-    url_check = requests.get(data_url_to_check)
-    url_status = url_check.status_code
+    # check if url exisits (head request so nothing is downloaded, fall back to get if the server doesn't allow head requests)
+    check_start = time.perf_counter()
+    try:
+        url_check = session.head(data_url_to_check, allow_redirects = True)
+        if url_check.status_code in (405, 501):
+            url_check = session.get(data_url_to_check, stream = True)
+            url_check.close()
+        fetch_info['status_code'] = url_check.status_code
+    except requests.exceptions.RequestException as error:
+        print("could not reach " + data_url_to_check + ": " + str(error))
+    fetch_info['check_secs'] = time.perf_counter() - check_start
+
+    if (fetch_info['status_code'] == 200): # 200 means that everything is ok
+        # only open the variables of interest (and x and y coordinates) using a dap constraint expression
+        if (ndfd_var_names is not None):
+            data_url = data_url + "?" + ",".join(["x", "y"] + list(ndfd_var_names))
 
-    if url_status == 200: # 200 means that everything is ok
         # get data from SCO server url and store it on pc
-        ndfd_data = open_url(data_url)
+        # pydap is only imported when a dataset is opened because it's slow to import and cached cycles don't need it
+        from pydap.client import open_url
+
+        open_start = time.perf_counter()
+        ndfd_data = open_url(data_url, session = session)
+        fetch_info['open_secs'] = time.perf_counter() - open_start
+        fetch_info['available'] = True
 
     else: # 404 or any other number means that url is not ok
-        ndfd_data = []
+        ndfd_data = None
 
-    return ndfd_data #, url_status, data_url_to_check
+    return ndfd_data, fetch_info
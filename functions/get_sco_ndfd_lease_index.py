@@ -0,0 +1,103 @@
+"""
+# ---- script header ----
+script name: get_sco_ndfd_lease_index.py
+purpose of script: returns the cmu(s) and nc sco ndfd grid cell of every lease centroid
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, shapely, geopandas, os, hashlib
+required functions: none
+
+"""
+import os
+import hashlib
+import numpy
+import shapely
+import geopandas
+
+def get_sco_ndfd_lease_index(lease_centroids_pd, cmu_bounds, ndfd_grid_coords, ndfd_proj4, cmu_id_col = "HA_CLASS", max_distance_m = 0, cache_path = None):
+    """
+    Description: Returns a lookup from each lease (ncdmf_lease_id) to the cmu(s) its centroid falls in and the SCO NDFD grid cell it falls in,
+                 the lookup only depends on the leases, the cmu bounds, and the grid so it's saved to cache_path and only recalculated when one of them changes
+    Parameters:
+        lease_centroids_pd (data frame): A pandas dataframe with ncdmf_lease_id, longitude, and latitude (wgs84) columns (e.g., lease_centroids_db_wgs84.csv)
+        cmu_bounds (geodataframe): A geopandas geodataframe of cmu polygons with a crs (e.g., cmu_bounds_albers.shp), must be in the same order as the cmu rows of
+                                   get_sco_ndfd_cmu_weights()
+        ndfd_grid_coords (tuple): A (x_coords_np, y_coords_np) tuple in km with the x and y value of each grid column and row (in y_index and x_index order)
+        ndfd_proj4 (str): The proj4 string of the SCO NDFD grid (lambert conformal conic, m)
+        cmu_id_col (str): The cmu_bounds column with cmu names (default is "HA_CLASS")
+        max_distance_m (float): Leases with centroids outside of all cmus are matched to cmus within this distance in cmu_bounds crs units (default is 0, which only
+                                keeps cmus the centroid falls in)
+        cache_path (str): Optional directory path where the lookup is saved, when given the lookup is read from here if it's there (default is None, which doesn't use a cache)
+    Returns:
+        lease_index (dict): A dictionary with 'lease_ids' (numpy array of all ncdmf_lease_id values), 'lease_rows' and 'cmu_rows' (numpy arrays with one
+                            lease and cmu row pair per match, sorted by lease row), and 'y_index' and 'x_index' (numpy arrays with the grid cell of each lease,
+                            -1 if the lease is off the grid)
+    Required:
+        import numpy, import shapely, import geopandas, import os, import hashlib
+
+    Note: Leases are matched by centroid, a lease that overlaps two cmus gets both when its centroid is on their shared edge or they overlap.
+    """
+    lease_ids = lease_centroids_pd['ncdmf_lease_id'].to_numpy().astype("U")
+    lease_lon = lease_centroids_pd['longitude'].to_numpy(dtype = float)
+    lease_lat = lease_centroids_pd['latitude'].to_numpy(dtype = float)
+    x_coords_np, y_coords_np = (numpy.asarray(ndfd_grid_coords[0], dtype = float), numpy.asarray(ndfd_grid_coords[1], dtype = float))
+    cmu_geoms = cmu_bounds.geometry.to_numpy()
+
+    # look for a cached lookup for these leases, cmu bounds, and grid
+    if (cache_path is not None):
+        cache_key = hashlib.sha1()
+        for index_data in (lease_ids, lease_lon, lease_lat, cmu_bounds[cmu_id_col].to_numpy().astype("U"), x_coords_np, y_coords_np, numpy.array([max_distance_m], dtype = float)):
+            cache_key.update(numpy.ascontiguousarray(index_data).tobytes())
+        cache_key.update(b"".join(shapely.to_wkb(cmu_geoms)))
+        cache_key.update(str(cmu_bounds.crs).encode())
+        cache_file = os.path.join(cache_path, "lease_index_" + cache_key.hexdigest()[0:12] + ".npz")
+
+        if os.path.exists(cache_file):
+            cache_data = numpy.load(cache_file)
+            lease_index = {key: cache_data[key] for key in ('lease_ids', 'lease_rows', 'cmu_rows', 'y_index', 'x_index')}
+
+            # print status
+            print("read lease index from cache")
+
+            return lease_index
+
+    # lease centroids in the cmu bounds crs and on the ndfd grid (in km)
+    lease_points = geopandas.GeoSeries(geopandas.points_from_xy(lease_lon, lease_lat), crs = "EPSG:4326")
+    lease_points_cmu = lease_points.to_crs(cmu_bounds.crs).to_numpy()
+    lease_points_ndfd = shapely.get_coordinates(lease_points.to_crs(ndfd_proj4).to_numpy()) / 1000.
+
+    # cmus each lease centroid falls in (or is within max_distance_m of)
+    cmu_tree = shapely.STRtree(cmu_geoms)
+    if (max_distance_m > 0):
+        lease_rows, cmu_rows = cmu_tree.query_nearest(lease_points_cmu, max_distance = max_distance_m, all_matches = True)
+    else:
+        lease_rows, cmu_rows = cmu_tree.query(lease_points_cmu, predicate = "intersects")
+    lease_order = numpy.lexsort((cmu_rows, lease_rows))
+
+    # grid cell each lease centroid falls in (grid spacing is constant so no search is needed)
+    lease_cell_index = []
+    for lease_coords_km, grid_coords_km in ((lease_points_ndfd[:, 0], x_coords_np), (lease_points_ndfd[:, 1], y_coords_np)):
+        cell_d_km = numpy.median(numpy.diff(grid_coords_km)) if (len(grid_coords_km) > 1) else 1.
+        cell_index = numpy.rint((lease_coords_km - grid_coords_km[0]) / cell_d_km).astype(int)
+        cell_index[(cell_index < 0) | (cell_index >= len(grid_coords_km))] = -1
+        lease_cell_index.append(cell_index)
+    off_grid = (lease_cell_index[0] < 0) | (lease_cell_index[1] < 0)
+    lease_cell_index[0][off_grid], lease_cell_index[1][off_grid] = (-1, -1)
+
+    lease_index = {'lease_ids': lease_ids,
+                   'lease_rows': lease_rows[lease_order],
+                   'cmu_rows': cmu_rows[lease_order],
+                   'y_index': lease_cell_index[1],
+                   'x_index': lease_cell_index[0]}
+
+    # save to cache
+    if (cache_path is not None):
+        os.makedirs(cache_path, exist_ok = True)
+        numpy.savez(cache_file, **lease_index)
+
+    # print status
+    print("calculated lease index for " + str(len(lease_ids)) + " leases (" + str(len(numpy.unique(lease_index['lease_rows']))) + " in cmus)")
+
+    return lease_index
@@ -0,0 +1,45 @@
+"""
+# ---- script header ----
+script name: get_sco_ndfd_subset_index.py
+purpose of script: returns the y and x index ranges of the nc sco ndfd grid that cover a bounding box
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy
+required functions: get_sco_ndfd_coords.py
+
+"""
+import numpy
+
+def get_sco_ndfd_subset_index(ndfd_coords, bbox_km, buffer_km = 0):
+    """
+    Description: Returns the y and x index ranges (slices) of the SCO NDFD grid that cover a bounding box so only that part of the grid is requested from the server
+    Parameters:
+        ndfd_coords (tuple): A (x_coords_np, y_coords_np) tuple from get_sco_ndfd_coords()
+        bbox_km (list): A bounding box [xmin, ymin, xmax, ymax] in the NDFD grid projection and units (lambert conformal conic, km), for example the sga buffer extent
+        buffer_km (float): Extra distance (km) added to each side of bbox_km so cells that only touch the edge of the box are kept (default is 0)
+    Returns:
+        ndfd_subset_index (tuple): A tuple of slices (y_slice, x_slice) with the grid index ranges inside the bounding box,
+        if the bounding box does not overlap the grid then None
+    Required:
+        import numpy, must load and run get_sco_ndfd_coords() function before this
+    """
+    # unpack coordinates and bounding box
+    x_coords_np, y_coords_np = ndfd_coords
+    xmin, ymin, xmax, ymax = bbox_km
+
+    # find grid indices inside the (buffered) bounding box
+    x_index_in = numpy.where((x_coords_np >= (xmin - buffer_km)) & (x_coords_np <= (xmax + buffer_km)))[0]
+    y_index_in = numpy.where((y_coords_np >= (ymin - buffer_km)) & (y_coords_np <= (ymax + buffer_km)))[0]
+
+    # if bounding box is outside of the grid
+    if ((len(x_index_in) == 0) or (len(y_index_in) == 0)):
+        print("bounding box does not overlap the ndfd grid")
+
+        return None
+
+    # define index ranges (end is not included, like python slicing)
+    ndfd_subset_index = (slice(int(y_index_in[0]), int(y_index_in[-1]) + 1), slice(int(x_index_in[0]), int(x_index_in[-1]) + 1))
+
+    return ndfd_subset_index
@@ -0,0 +1,36 @@
+"""
+# ---- script header ----
+script name: get_shellcast_ledger_latest.py
+purpose of script: returns the latest forecast cycle in the sqlite run ledger with a given status
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: sqlite3
+required functions: none
+
+"""
+
+def get_shellcast_ledger_latest(ledger_conn, stage, statuses = ("available",), ndfd_var = "all", before_datetime_uct_str = None):
+    """
+    Description: Returns the latest forecast cycle of a stage (and variable) in the ShellCast run ledger with one of the given statuses (e.g., the latest good cycle),
+                 it's an index lookup so it doesn't get slower as the ledger grows
+    Parameters:
+        ledger_conn (sqlite3 Connection): A connection from make_shellcast_ledger()
+        stage (str): The stage name (e.g., "tidy" or "backfill")
+        statuses (list): The statuses to look for (default is ("available",))
+        ndfd_var (str): The variable ("qpf" or "pop12") or "all" for rows of the whole cycle (default is "all")
+        before_datetime_uct_str (str): Optional string in "%Y-%m-%d %H:%M" format, only cycles on or before it are returned (default is None, which returns the latest cycle)
+    Returns:
+        datetime_uct_str (str): The latest cycle as a string in "%Y-%m-%d %H:%M" format, None if there isn't one
+    Required:
+        import sqlite3
+    """
+    # cycle strings sort in time order
+    ledger_sql = ("SELECT MAX(datetime_uct_str) FROM run_ledger WHERE stage = ? AND ndfd_var = ? AND status IN (" + ", ".join(["?"] * len(statuses)) + ")" +
+                  ("" if (before_datetime_uct_str is None) else " AND datetime_uct_str <= ?"))
+    ledger_values = [stage, ndfd_var] + list(statuses) + ([] if (before_datetime_uct_str is None) else [before_datetime_uct_str])
+
+    datetime_uct_str = ledger_conn.execute(ledger_sql, ledger_values).fetchone()[0]
+
+    return datetime_uct_str
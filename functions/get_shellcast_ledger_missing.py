@@ -0,0 +1,40 @@
+"""
+# ---- script header ----
+script name: get_shellcast_ledger_missing.py
+purpose of script: returns the forecast cycles in a list that aren't done in the sqlite run ledger
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: sqlite3
+required functions: none
+
+"""
+
+def get_shellcast_ledger_missing(ledger_conn, datetime_uct_str_list, stage, done_statuses = ("available", "not_available"), ndfd_var = "all"):
+    """
+    Description: Returns the forecast cycles in datetime_uct_str_list that don't have one of the done statuses for a stage (and variable) in the ShellCast run ledger
+                 (e.g., the cycles a stopped backfill still has to do), only the ledger rows between the first and last cycle in the list are read
+    Parameters:
+        ledger_conn (sqlite3 Connection): A connection from make_shellcast_ledger()
+        datetime_uct_str_list (list): A list of strings in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT, one per forecast cycle
+        stage (str): The stage name (e.g., "tidy" or "backfill")
+        done_statuses (list): The statuses that count as done, cycles with any other status (e.g., "failed") or no row are missing (default is ("available", "not_available"))
+        ndfd_var (str): The variable ("qpf" or "pop12") or "all" for rows of the whole cycle (default is "all")
+    Returns:
+        missing_datetime_uct_strs (list): The cycles in datetime_uct_str_list that aren't done, in the same order
+    Required:
+        import sqlite3
+    """
+    if (len(datetime_uct_str_list) == 0):
+        return []
+
+    # done cycles in the range of the list (uses the primary key index)
+    ledger_sql = ("SELECT datetime_uct_str FROM run_ledger WHERE stage = ? AND ndfd_var = ? AND datetime_uct_str BETWEEN ? AND ? AND status IN (" +
+                  ", ".join(["?"] * len(done_statuses)) + ")")
+    ledger_values = [stage, ndfd_var, min(datetime_uct_str_list), max(datetime_uct_str_list)] + list(done_statuses)
+    done_datetime_uct_strs = set(ledger_row[0] for ledger_row in ledger_conn.execute(ledger_sql, ledger_values))
+
+    missing_datetime_uct_strs = [datetime_uct_str for datetime_uct_str in datetime_uct_str_list if datetime_uct_str not in done_datetime_uct_strs]
+
+    return missing_datetime_uct_strs
@@ -0,0 +1,50 @@
+"""
+# ---- script header ----
+script name: insert_ncdmf_leases.py
+purpose of script: adds new leases to the ncdmf_leases table of the mysql database in batches
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas, sqlalchemy
+required functions: make_shellcast_db_engine.py
+
+"""
+import sqlalchemy
+
+def insert_ncdmf_leases(db_conn, lease_data, batch_size = 1000):
+    """
+    Description: Adds new leases to the ncdmf_leases table with bound parameters (no quoting issues) in batches of batch_size rows per INSERT statement,
+                 the geometry is made on the server with ST_PointFromText()
+    Parameters:
+        db_conn (sqlalchemy connection): An open sqlalchemy connection from make_shellcast_db_engine()
+        lease_data (data frame): A pandas dataframe with ncdmf_lease_id, grow_area_name, rainfall_thresh_in, longitude, and latitude columns (e.g., lease_centroids_db_wgs84.csv)
+        batch_size (int): The number of leases in each INSERT statement (default is 1000)
+    Returns:
+        num_leases (int): The number of leases added
+    Required:
+        import pandas, import sqlalchemy, must load and run make_shellcast_db_engine() function before this
+
+    Note: This doesn't commit, leases are added in the transaction of db_conn. Databases other than MySQL (e.g., sqlite for testing) get the point as text.
+    """
+    # one parameter tuple per lease (missing values are NULL)
+    lease_params = list(zip(lease_data['ncdmf_lease_id'].astype(str),
+                            lease_data['grow_area_name'].astype(object).where(lease_data['grow_area_name'].notna(), None),
+                            lease_data['rainfall_thresh_in'].astype(object).where(lease_data['rainfall_thresh_in'].notna(), None),
+                            "POINT(" + lease_data['longitude'].round(6).astype(str) + " " + lease_data['latitude'].round(6).astype(str) + ")"))
+
+    # one multi row INSERT per batch (pymysql executemany() only batches rows when the values are all plain placeholders, so write out the batch here)
+    lease_insert_sql = "INSERT INTO `ncdmf_leases` (`ncdmf_lease_id`, `grow_area_name`, `rainfall_thresh_in`, `geometry`) VALUES "
+    lease_row_sql = "(:ncdmf_lease_id_{i}, :grow_area_name_{i}, :rainfall_thresh_in_{i}, ST_PointFromText(:geometry_{i}))"
+    if (db_conn.dialect.name != "mysql"):
+        lease_row_sql = "(:ncdmf_lease_id_{i}, :grow_area_name_{i}, :rainfall_thresh_in_{i}, :geometry_{i})"
+
+    for batch_start in range(0, len(lease_params), batch_size):
+        batch_params = lease_params[batch_start:(batch_start + batch_size)]
+        batch_sql = lease_insert_sql + ", ".join([lease_row_sql.format(i = i) for i in range(len(batch_params))])
+        batch_param_dict = {}
+        for i, lease_row_params in enumerate(batch_params):
+            batch_param_dict.update(zip(["ncdmf_lease_id_" + str(i), "grow_area_name_" + str(i), "rainfall_thresh_in_" + str(i), "geometry_" + str(i)], lease_row_params))
+        db_conn.execute(sqlalchemy.text(batch_sql), batch_param_dict)
+
+    return len(lease_params)
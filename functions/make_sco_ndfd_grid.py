@@ -0,0 +1,48 @@
+"""
+# ---- script header ----
+script name: make_sco_ndfd_grid.py
+purpose of script: returns a (valid period, y, x) array of nc sco ndfd data from a tidy dataframe
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas
+required functions: tidy_sco_ndfd_data.py
+
+"""
+import numpy
+
+def make_sco_ndfd_grid(var_data_pd, ndfd_var):
+    """
+    Description: Returns a (valid period, y, x) array of SCO NDFD data from a tidy dataframe, with the x and y coordinates of the grid columns and rows
+    Parameters:
+        var_data_pd (data frame): A pandas dataframe from tidy_sco_ndfd_data() (full or compact) or read back from the csv or parquet outputs
+        ndfd_var (str): either "qpf" or "pop12", the SCO NDFD variable of interest
+    Returns:
+        var_grid_np (numpy array): A (valid period, y, x) float array, grid cells without a row are nan
+        valid_period_hrs (list): A list of valid periods (in hrs) in the same order as the first dimension of var_grid_np
+        ndfd_grid_coords (tuple): A (x_coords_np, y_coords_np) tuple in km with the x and y value of each grid column and row
+    Required:
+        import numpy, import pandas
+    """
+    # value column
+    var_value_col = "qpf_value_kgperm2" if (ndfd_var == "qpf") else "pop12_value_perc"
+
+    # grid and period positions of each row
+    var_y_index_np = var_data_pd['y_index'].to_numpy(dtype = int)
+    var_x_index_np = var_data_pd['x_index'].to_numpy(dtype = int)
+    y_index_start, x_index_start = (var_y_index_np.min(), var_x_index_np.min())
+    num_y, num_x = (var_y_index_np.max() - y_index_start + 1, var_x_index_np.max() - x_index_start + 1)
+    valid_period_hrs, var_period_pos_np = numpy.unique(var_data_pd['valid_period_hrs'].astype(str).astype(int).to_numpy(), return_inverse = True)
+
+    # fill grid
+    var_grid_np = numpy.full((len(valid_period_hrs), num_y, num_x), numpy.nan)
+    var_grid_np[var_period_pos_np, var_y_index_np - y_index_start, var_x_index_np - x_index_start] = var_data_pd[var_value_col].to_numpy(dtype = float)
+
+    # grid coordinates
+    x_coords_np = numpy.full(num_x, numpy.nan)
+    y_coords_np = numpy.full(num_y, numpy.nan)
+    x_coords_np[var_x_index_np - x_index_start] = var_data_pd['longitude_km'].to_numpy(dtype = float)
+    y_coords_np[var_y_index_np - y_index_start] = var_data_pd['latitude_km'].to_numpy(dtype = float)
+
+    return var_grid_np, [int(valid_period_hr) for valid_period_hr in valid_period_hrs], (x_coords_np, y_coords_np)
@@ -0,0 +1,43 @@
+"""
+# ---- script header ----
+script name: make_sco_ndfd_raster.py
+purpose of script: returns a north up raster array and affine transform for a grid of nc sco ndfd data
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, rasterio
+required functions: make_sco_ndfd_grid.py
+
+"""
+import numpy
+import rasterio.transform
+
+def make_sco_ndfd_raster(var_grid_np, ndfd_grid_coords):
+    """
+    Description: Returns a north up raster array and its affine transform (in m, ndfd lambert conformal conic projection) for a grid of SCO NDFD data,
+                 so the grid can be used as a raster without turning it into points first
+    Parameters:
+        var_grid_np (numpy array): A (y, x) or (valid period, y, x) array from make_sco_ndfd_grid()
+        ndfd_grid_coords (tuple): A (x_coords_np, y_coords_np) tuple in km with the x and y value of each grid column and row, from make_sco_ndfd_grid()
+    Returns:
+        var_raster_np (numpy array): var_grid_np with rows ordered from north to south
+        var_transform (affine): A rasterio affine transform from (row, col) to ndfd x and y in m
+    Required:
+        import numpy, import rasterio, must load and run make_sco_ndfd_grid() function before this
+    """
+    # grid cell centers in m (grid spacing is constant)
+    x_coords_m = numpy.asarray(ndfd_grid_coords[0], dtype = float) * 1000
+    y_coords_m = numpy.asarray(ndfd_grid_coords[1], dtype = float) * 1000
+    cell_dx_m = abs(numpy.median(numpy.diff(x_coords_m)))
+    cell_dy_m = abs(numpy.median(numpy.diff(y_coords_m)))
+
+    # rasters go from north to south (sco ndfd y values go from south to north)
+    var_raster_np = var_grid_np
+    if (y_coords_m[0] < y_coords_m[-1]):
+        var_raster_np = numpy.flip(var_grid_np, axis = -2)
+
+    # transform from the upper left corner of the upper left cell
+    var_transform = rasterio.transform.from_origin(x_coords_m.min() - cell_dx_m / 2, y_coords_m.max() + cell_dy_m / 2, cell_dx_m, cell_dy_m)
+
+    return var_raster_np, var_transform
@@ -0,0 +1,76 @@
+"""
+# ---- script header ----
+script name: make_sco_ndfd_tidy_df.py
+purpose of script: returns a tidy dataframe of nc sco data from an array of subperiod data that's already been read
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas
+required functions: aggregate_sco_ndfd_var_periods.py
+
+"""
+import numpy
+import pandas
+
+from functions.aggregate_sco_ndfd_var_periods import aggregate_sco_ndfd_var_periods
+
+def make_sco_ndfd_tidy_df(var_period_raw_data, var_times_sel, valid_period_hrs, ndfd_var, ndfd_coords, datetime_uct_str, y_index_start = 0, x_index_start = 0, compact = False):
+    """
+    Description: Returns a tidy dataframe of SCO NDFD data (aggregated periods, coordinates, and time columns) from a (time, y, x) array of subperiod data
+    Parameters:
+        var_period_raw_data (numpy array): A (time, y, x) array with one time slice per value in var_times_sel
+        var_times_sel (array): An array of subperiod values (e.g., 6hr, 12hr, ..., 72hr) for each time slice of var_period_raw_data, in ascending order
+        valid_period_hrs (list): A list of valid periods to aggregate to in hours (e.g., [24, 48, 72])
+        ndfd_var (str): either "qpf" or "pop12", the SCO NDFD variable of interest
+        ndfd_coords (tuple): A (x_coords_np, y_coords_np) tuple from get_sco_ndfd_coords() for the full grid
+        datetime_uct_str (str): A string in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT
+        y_index_start (integer): Grid y index of the first row of var_period_raw_data when it's a subset of the full grid (default is 0)
+        x_index_start (integer): Grid x index of the first column of var_period_raw_data when it's a subset of the full grid (default is 0)
+        compact (boolean): When True rows only keep int16 y_index, x_index, and valid_period_hrs, float32 values, and float32 longitude_km and latitude_km,
+                           the cycle times are saved once in var_data_pd.attrs instead of in five time columns (default is False)
+    Returns:
+        var_data_pd (data frame): A pandas dataframe with SCO NDFD variable data, same columns as tidy_sco_ndfd_data()
+    Required:
+        import numpy, import pandas, must load aggregate_sco_ndfd_var_periods() function before this
+    """
+    # aggregate data for all valid periods
+    var_data_pd = aggregate_sco_ndfd_var_periods(var_period_raw_data, var_times_sel, valid_period_hrs, ndfd_var,
+                                                 y_index_start = y_index_start, x_index_start = x_index_start, compact = compact)
+
+    if compact:
+        # add longitude and latitude to data frame
+        x_coords_np, y_coords_np = ndfd_coords
+        var_data_pd['longitude_km'] = numpy.asarray(x_coords_np, dtype = numpy.float32)[var_data_pd['x_index'].to_numpy()] # x is longitude
+        var_data_pd['latitude_km'] = numpy.asarray(y_coords_np, dtype = numpy.float32)[var_data_pd['y_index'].to_numpy()] # y is latitude
+
+        # save cycle times once (same for every row)
+        time_uct_long = pandas.to_datetime(datetime_uct_str, format = "%Y-%m-%d %H:%M").tz_localize(tz = 'UCT')
+        var_data_pd.attrs = {'ndfd_var': ndfd_var,
+                             'valid_period_hrs': [int(valid_period_hr) for valid_period_hr in valid_period_hrs],
+                             'time_uct': time_uct_long.strftime("%Y-%m-%d %H:%M"),
+                             'time_nyc': time_uct_long.tz_convert(tz = 'America/New_York').strftime("%Y-%m-%d %H:%M")}
+
+        return var_data_pd
+
+    # keep row number within each valid period as the first column (downstream scripts read columns by position)
+    var_data_pd.insert(0, 'index', numpy.tile(numpy.arange(len(var_data_pd) // len(valid_period_hrs)), len(valid_period_hrs)))
+
+    # add longitude and latitude to data frame
+    x_coords_np, y_coords_np = ndfd_coords
+    var_data_pd['longitude_km'] = x_coords_np[var_data_pd['x_index'].to_numpy()] # x is longitude
+    var_data_pd['latitude_km'] = y_coords_np[var_data_pd['y_index'].to_numpy()] # y is latitude
+
+    # create and wrangle time columns
+    # server time is in UCT but changing it to something that's local for NC (use NYC timezone)
+    # every row has the same cycle times, so parse and format them once and repeat them for all rows (same dtypes as the per row version)
+    time_naive = pandas.to_datetime([datetime_uct_str], format = "%Y-%m-%d %H:%M")
+    time_uct_long = time_naive.tz_localize(tz = 'UCT')
+    time_nyc_long = time_uct_long.tz_convert(tz = 'America/New_York')
+    var_data_pd['time'] = time_naive.repeat(len(var_data_pd))
+    var_data_pd['time_uct_long'] = time_uct_long.repeat(len(var_data_pd))
+    var_data_pd['time_uct'] = time_uct_long.strftime("%Y-%m-%d %H:%M").repeat(len(var_data_pd))
+    var_data_pd['time_nyc_long'] = time_nyc_long.repeat(len(var_data_pd))
+    var_data_pd['time_nyc'] = time_nyc_long.strftime("%Y-%m-%d %H:%M").repeat(len(var_data_pd))
+
+    return var_data_pd
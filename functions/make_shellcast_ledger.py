@@ -0,0 +1,61 @@
+"""
+# ---- script header ----
+script name: make_shellcast_ledger.py
+purpose of script: opens (and makes if needed) the sqlite run ledger of forecast cycles, variables, and stages
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: sqlite3, csv, os
+required functions: write_shellcast_ledger.py
+
+"""
+import os
+import csv
+import sqlite3
+
+from functions.write_shellcast_ledger import write_shellcast_ledger
+
+# one row per stage, variable, and cycle (the last status, time, and output), the primary key is the index for cycle range lookups
+shellcast_ledger_sql = ["CREATE TABLE IF NOT EXISTS run_ledger (stage TEXT NOT NULL, ndfd_var TEXT NOT NULL, datetime_uct_str TEXT NOT NULL, status TEXT NOT NULL, "
+                        "wall_secs REAL, output_path TEXT, updated_uct TEXT NOT NULL, PRIMARY KEY (stage, ndfd_var, datetime_uct_str)) WITHOUT ROWID",
+                        "CREATE INDEX IF NOT EXISTS run_ledger_status ON run_ledger (stage, ndfd_var, status, datetime_uct_str)"]
+
+def make_shellcast_ledger(ledger_file, csv_log_files = None):
+    """
+    Description: Opens the ShellCast run ledger (a sqlite database of the status, time, and output path of each stage, variable, and forecast cycle),
+                 makes it if it doesn't exist, and imports old two column (datetime_uct_str, status) csv logs for stages that aren't in the ledger yet
+    Parameters:
+        ledger_file (str): A string defining the ledger file path (e.g., ".../shellcast_ledger.db"), the directory is made if it doesn't exist
+        csv_log_files (dict): Optional dictionary of stage names and csv log file paths to import (e.g., {'tidy': ".../data_log.csv"}),
+                              a log is only imported when the ledger doesn't have any rows for its stage, so it's read once (default is None)
+    Returns:
+        ledger_conn (sqlite3 Connection): A connection to the ledger, close it with ledger_conn.close()
+    Required:
+        import sqlite3, import csv, import os, must load write_shellcast_ledger() function before this
+
+    Note: A sqlite connection can only be used by the thread that made it.
+    """
+    # make ledger
+    os.makedirs(os.path.dirname(os.path.abspath(ledger_file)), exist_ok = True)
+    ledger_conn = sqlite3.connect(ledger_file, timeout = 30)
+    ledger_conn.execute("PRAGMA journal_mode = WAL") # readers don't wait on a writer (e.g., backfill and the daily run at the same time)
+    with ledger_conn:
+        for ledger_sql in shellcast_ledger_sql:
+            ledger_conn.execute(ledger_sql)
+
+    # import old csv logs
+    if (csv_log_files is not None):
+        for stage, csv_log_file in csv_log_files.items():
+            stage_row = ledger_conn.execute("SELECT 1 FROM run_ledger WHERE stage = ? LIMIT 1", (stage,)).fetchone()
+            if (stage_row is None) and os.path.exists(csv_log_file):
+                with open(csv_log_file, newline = '') as read_obj:
+                    ledger_rows = [{'stage': stage, 'datetime_uct_str': csv_row[0], 'status': csv_row[1]} for csv_row in csv.reader(read_obj) if (len(csv_row) >= 2)]
+
+                # the last row for a cycle is its latest status
+                num_rows = write_shellcast_ledger(ledger_conn, ledger_rows)
+
+                # print status
+                print("imported " + str(num_rows) + " rows of " + csv_log_file + " to the ledger")
+
+    return ledger_conn
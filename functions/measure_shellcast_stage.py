@@ -0,0 +1,54 @@
+"""
+# ---- script header ----
+script name: measure_shellcast_stage.py
+purpose of script: measures the time, cpu time, and memory of a shellcast analysis stage
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: time, resource, sys, contextlib
+required functions: none
+
+"""
+import time
+import resource
+import sys
+import contextlib
+
+@contextlib.contextmanager
+def measure_shellcast_stage(stage_name, stage_log):
+    """
+    Description: Context manager (use it in a with statement) that measures the wall time, cpu time, and peak memory of a stage and adds the stage record to stage_log
+                 when the stage ends, the stage adds its bytes_fetched, rows_out, and rows_written to the record it gets from the with statement,
+                 a stage that raises an error is recorded with status "failed"
+    Parameters:
+        stage_name (str): The name of the stage (e.g., "fetch" or "tidy")
+        stage_log (list): The list of stage records for the run (records are added in the order the stages end)
+    Returns:
+        stage_info (dict): The stage record with stage, status ("run" or "failed"), wall_secs, cpu_secs, peak_rss_mb, bytes_fetched, rows_out, and rows_written
+                           (bytes and rows are None unless the stage sets them)
+    Required:
+        import time, import resource, import sys, import contextlib
+
+    Note: peak_rss_mb is the peak memory of the whole python process so far (it never goes down), so a stage with a higher peak than the one before it
+    used more memory than anything before it. cpu_secs includes all threads of the process.
+    """
+    stage_info = {'stage': stage_name, 'status': "run", 'wall_secs': None, 'cpu_secs': None, 'peak_rss_mb': None,
+                  'bytes_fetched': None, 'rows_out': None, 'rows_written': None}
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
+    try:
+        yield stage_info
+    except BaseException:
+        stage_info['status'] = "failed"
+        raise
+    finally:
+        stage_info['wall_secs'] = time.perf_counter() - wall_start
+        stage_info['cpu_secs'] = time.process_time() - cpu_start
+
+        # ru_maxrss is in bytes on mac and in kilobytes on linux
+        peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        stage_info['peak_rss_mb'] = (peak_rss / 1e6) if (sys.platform == "darwin") else (peak_rss * 1024 / 1e6)
+
+        stage_log.append(stage_info)
@@ -0,0 +1,64 @@
+"""
+# ---- script header ----
+script name: read_sco_ndfd_cache.py
+purpose of script: reads nc sco ndfd arrays for a cycle, variable, and grid subset from the local cache
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: os, hashlib, zipfile, numpy
+required functions: get_sco_ndfd_cache_file.py
+
+"""
+import os
+import zipfile
+import numpy
+
+from functions.get_sco_ndfd_cache_file import get_sco_ndfd_cache_file
+
+def read_sco_ndfd_cache(cache_path, datetime_ymdh_str, ndfd_var, ndfd_subset_index = None):
+    """
+    Description: Reads SCO NDFD arrays for a forecast cycle, variable, and grid subset from the local cache
+    Parameters:
+        cache_path (str): A string defining the cache directory path
+        datetime_ymdh_str (str): A string in "%Y%m%d%H" format (e.g, "2016010100"), from convert_sco_ndfd_datetime_str() function
+        ndfd_var (str): the cached SCO NDFD variable (e.g., "qpf", "pop12", or "coords")
+        ndfd_subset_index (tuple): Optional (y_slice, x_slice) tuple from get_sco_ndfd_subset_index() (default is None, which is the full grid)
+    Returns:
+        cache_data (dict): A dictionary of numpy arrays that was saved with write_sco_ndfd_cache(),
+        if there's no cache file (or it can't be read) then None
+    Required:
+        import os, import hashlib, import zipfile, import numpy, must load get_sco_ndfd_cache_file() function before this
+    """
+    # define cache file path
+    cache_file = get_sco_ndfd_cache_file(cache_path, datetime_ymdh_str, ndfd_var, ndfd_subset_index)
+
+    # if not cached
+    if not os.path.exists(cache_file):
+        return None
+
+    # read all arrays (the file can be removed by another writer's eviction at the same time)
+    try:
+        with numpy.load(cache_file) as cache_npz:
+            cache_data = {key: cache_npz[key] for key in cache_npz.files}
+
+    except FileNotFoundError:
+        return None
+
+    # remove unreadable files (e.g., left over from a run that was killed) so they're fetched again
+    except (OSError, ValueError, zipfile.BadZipFile):
+        print("removing unreadable cache file " + cache_file)
+        try:
+            os.remove(cache_file)
+        except FileNotFoundError:
+            pass
+
+        return None
+
+    # mark as recently used (for least recently used eviction)
+    try:
+        os.utime(cache_file)
+    except FileNotFoundError:
+        pass
+
+    return cache_data
@@ -6,262 +6,170 @@ author: sheila saia
 email: ssaia@ncsu.edu
 date created: 20200427
 
-required libraries: pydap, requests, numpy, pandas, datetime
-required functions: convert_sco_ndfd_datetime_str.py, get_sco_ndfd_data.py
+required libraries: pydap, requests, numpy, pandas, datetime, time
+required functions: convert_sco_ndfd_datetime_str.py, get_sco_ndfd_data.py, get_sco_ndfd_coords.py, get_sco_ndfd_subset_index.py (optional), aggregate_sco_ndfd_var_periods.py, make_sco_ndfd_tidy_df.py, read_sco_ndfd_cache.py and write_sco_ndfd_cache.py (optional)
 
 """
-def tidy_sco_ndfd_data(ndfd_data, datetime_uct_str, ndfd_var):
+import time
+import numpy
+import pandas
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+from functions.get_sco_ndfd_coords import get_sco_ndfd_coords
+from functions.make_sco_ndfd_tidy_df import make_sco_ndfd_tidy_df
+from functions.read_sco_ndfd_cache import read_sco_ndfd_cache
+from functions.write_sco_ndfd_cache import write_sco_ndfd_cache
+
+def tidy_sco_ndfd_data(ndfd_data, datetime_uct_str, ndfd_var, valid_period_hrs = (24, 48, 72), ndfd_coords = None, ndfd_subset_index = None, ndfd_cache_path = None, ndfd_cache_max_mb = 2000, compact = False, tidy_stats = None):
     """
     Description: Returns a tidy dataframe of qpf SCO NDFD data for a specified date
     Parameters:
-        ndfd_data (pydap Dataset): Pydap dataset object for specified datetime, from get_sco_ndfd_data() function
+        ndfd_data (pydap Dataset): Pydap dataset object for specified datetime, from get_sco_ndfd_data() function (can be None when the data are cached)
         datetime_uct_str (str): A string in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT
         ndfd_var (str): either "qpf" or "pop12", the SCO NDFD variable of interest
+        valid_period_hrs (list): A list of valid periods to aggregate to in hours (default is 24, 48, and 72 hrs, longer periods like 96 to 168 hrs can be added if the forecast has them)
+        ndfd_coords (tuple): Optional (x_coords_np, y_coords_np) tuple from get_sco_ndfd_coords() so coordinates are fetched once per dataset and shared by qpf and pop12 (default is None, which fetches them here)
+        ndfd_subset_index (tuple): Optional (y_slice, x_slice) tuple from get_sco_ndfd_subset_index() so only that part of the grid is requested from the server (default is None, which requests the full grid)
+        ndfd_cache_path (str): Optional cache directory path, when given the variable data are read from the local cache if they're there and saved to it after they're fetched (default is None, which doesn't use a cache)
+        ndfd_cache_max_mb (float): Maximum size of the local cache in megabytes (default is 2000)
+        compact (boolean): When True the dataframe only keeps int16 y_index, x_index, and valid_period_hrs, float32 values and coordinates,
+                           and the cycle times are saved once in var_data_pd.attrs, see make_sco_ndfd_tidy_df() (default is False)
+        tidy_stats (dict): Optional dictionary that bytes_fetched (bytes of data downloaded from the server) and aggregate_secs (time to aggregate the subperiods
+                           and make the dataframe) are added to, so they can be added up over variables (default is None)
     Returns:
         var_data_pd (data frame): A pandas dataframe with SCO NDFD variable data
         datetime_ymdh_str (str): A string in "%Y%m%d%H" format (e.g, "2016010100")
     Required:
-        import numpy, import pandas, import datatime, must load and run convert_sco_ndfd_datetime_str(), get_sco_ndfd_data(), and aggregate_sco_ndfd_var_data() functions before this
+        import numpy, import pandas, import datatime, import time, must load and run convert_sco_ndfd_datetime_str(), get_sco_ndfd_data(), get_sco_ndfd_coords(), aggregate_sco_ndfd_var_periods(), and make_sco_ndfd_tidy_df() functions before this,
+        must also load read_sco_ndfd_cache() and write_sco_ndfd_cache() functions when using ndfd_cache_path
     """
     # ndfd_data.values # to see all possible variables
 
     # convert datetime str so can append to file name
     datetime_ym, datetime_ymd_str, datetime_ymdh_str = convert_sco_ndfd_datetime_str(datetime_uct_str)
 
-    # if data exists
-    if (len(ndfd_data) > 0):
-        # make ndfd_data children into string for later search check
-        ndfd_children_str = str(ndfd_data.children)
+    # sco ndfd variable name and subperiod length (in hrs) for each ndfd_var option
+    # qpf is reported in 6 hr subperiods (summed) and pop12 is reported in 12 hr subperiods (max)
+    ndfd_var_options = {"qpf": ("Total_precipitation_surface_6_Hour_Accumulation", 6.),
+                        "pop12": ("Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254", 12.)}
 
-        # find variable of interest, if -1 then it does not exist
-        qpf_var_check = ndfd_children_str.find('Total_precipitation_surface_6_Hour_Accumulation')
-        pop12_var_check = ndfd_children_str.find('Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254')
-
-        # if requestig qpf data
-        if ((ndfd_var == "qpf") and (qpf_var_check != -1)):
-            # save variable data
-            var_data = ndfd_data['Total_precipitation_surface_6_Hour_Accumulation'] # qpf
-            #var_data.dimensions # to see dimensions of variable
-
-            # save variable dimentions
-            var_data_dims = var_data.dimensions # get all dimentions
-
-            # check number of dimensions and find 'time' dimensions
-            # when there are more than three (i.e., when 'refime' dimension exisits) there's
-            # no available list of pop12 or qpf for 24, 36, etc. hours out (which i need)
-            # so skip entries with 4 dimensions
-            if (len(var_data_dims) == 3): # when dimensions are (time, y, x)
-                # get time dimention
-                var_data_time_dim = var_data_dims[0]
-
-                # save list of variable time dimentions
-                var_time_np = numpy.array(var_data[var_data_time_dim][:])
-                # we want 24 hr (1-day), 48 hr (2-day), and 72 hr (3-day) data
-
-                # select subperiods
-                var_times_sel = numpy.array([6., 12., 18., 24., 30., 36., 42., 48., 54., 60., 66., 72.])
-
-                # check that subperiods are available
-                var_comparison = numpy.intersect1d(var_time_np, var_times_sel) # has to be 12 long
-
-                # all subperiods are available
-                if(len(var_comparison) == 12):
-                    # get subperiod values
-                    var_24hr_vals = var_times_sel[0:4]
-                    var_48hr_vals = var_times_sel[4:8]
-                    var_72hr_vals = var_times_sel[8:12]
-
-                    # get index for pulling data
-                    var_24hr_index = numpy.where(numpy.isin(var_times_sel, var_24hr_vals))[0] # 1-day forecast
-                    var_48hr_index = numpy.where(numpy.isin(var_times_sel, var_48hr_vals))[0] # 2-day forecast
-                    var_72hr_index = numpy.where(numpy.isin(var_times_sel, var_72hr_vals))[0] # 3-day forecast
-
-                    # aggregate qpf data
-                    var_24hr_pd_raw = aggregate_sco_ndfd_var_data(var_data, var_24hr_index, var_24hr_vals, ndfd_var)
-                    var_48hr_pd_raw = aggregate_sco_ndfd_var_data(var_data, var_48hr_index, var_48hr_vals, ndfd_var)
-                    var_72hr_pd_raw = aggregate_sco_ndfd_var_data(var_data, var_72hr_index, var_72hr_vals, ndfd_var)
-
-                    # add valid period column
-                    var_24hr_pd_raw['valid_period_hrs'] = numpy.repeat("24", len(var_24hr_pd_raw), axis=0)
-                    var_48hr_pd_raw['valid_period_hrs'] = numpy.repeat("48", len(var_48hr_pd_raw), axis=0)
-                    var_72hr_pd_raw['valid_period_hrs'] = numpy.repeat("72", len(var_72hr_pd_raw), axis=0)
-
-                    # merge rows of data frames
-                    var_data_pd_raw = var_24hr_pd_raw.append([var_48hr_pd_raw, var_72hr_pd_raw]).reset_index()
-
-                    # rename columns
-                    var_data_pd = var_data_pd_raw.rename(columns={"level_0": "y_index", "level_1": "x_index", "qpf_value_kgperm2": "qpf_value_kgperm2"})
-
-                    # save x and y data
-                    x_data = ndfd_data['x'][:] # x coordinate
-                    y_data = ndfd_data['y'][:] # y coordinate
-
-                    # create latitude and longitude columns
-                    longitude = []
-                    latitude = []
-                    for row in range(0, var_data_pd.shape[0]):
-                        x_index_val = var_data_pd['x_index'][row]
-                        y_index_val = var_data_pd['y_index'][row]
-                        longitude.append(x_data.data[x_index_val]) # x is longitude
-                        latitude.append(y_data.data[y_index_val]) # y is latitude
-
-                    # add longitude and latitude to data frame
-                    var_data_pd['longitude_km'] = longitude
-                    var_data_pd['latitude_km']  = latitude
-
-                    # create and wrangle time columns
-                    # server time is in UCT but changing it to something that's local for NC (use NYC timezone)
-                    var_data_pd['time'] = pandas.to_datetime(numpy.repeat(datetime_uct_str, len(var_data_pd), axis=0), format = "%Y-%m-%d %H:%M")
-                    var_data_pd['time_uct_long'] = var_data_pd.time.dt.tz_localize(tz = 'UCT')
-                    var_data_pd['time_uct'] = var_data_pd.time_uct_long.dt.strftime("%Y-%m-%d %H:%M")
-                    var_data_pd['time_nyc_long'] = var_data_pd.time_uct_long.dt.tz_convert(tz = 'America/New_York')
-                    var_data_pd['time_nyc'] = var_data_pd.time_nyc_long.dt.strftime("%Y-%m-%d %H:%M")
-
-                    # print status
-                    print("tidied " + ndfd_var + " data on " + datetime_ymdh_str)
-
-                    return var_data_pd, datetime_ymdh_str
-
-                # not all subperiods are available for this analysis so don't run
-                else:
-                    # empty dataframe
-                    var_data_pd = pandas.DataFrame()
-
-                    # print status
-                    print("desired subperiods for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
-
-                    return var_data_pd, datetime_ymdh_str
-
-            # if number of dimensions is more than 3 i.e. when they are: (reftime, time, y, x)
-            else:
-                # empty dataframe
-                var_data_pd = pandas.DataFrame()
-
-                # print status
-                print("desired data dimensions for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
-
-                return var_data_pd, datetime_ymdh_str
-
-
-        # if requesting pop12 data
-        elif ((ndfd_var == "pop12") and (pop12_var_check != -1)):
-            # save variable data
-            var_data = ndfd_data['Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254'] # pop12
-
-            # save variable dimentions
-            var_data_dims = var_data.dimensions # get all dimentions
-
-            # check number of dimensions and find 'time' dimensions
-            # when there are more than three (i.e., when 'refime' dimension exisits) there's
-            # no available list of pop12 and qpf for 24, 36, etc. hours out (which i need)
-            # so skip entries with 4 dimensions
-            if (len(var_data_dims) == 3): # when dimensions are (time, y, x)
-                var_data_time_dim = var_data_dims[0] # get time dimention
+    # if requesting something other than qpf or pop12 data
+    if (ndfd_var not in ndfd_var_options):
+        return print("Not a valid ndfd_var option.")
+
+    # select subperiods (e.g., 6, 12, ..., 72 hrs for qpf to get 24 hr (1-day), 48 hr (2-day), and 72 hr (3-day) data)
+    var_name, var_subperiod_hrs = ndfd_var_options[ndfd_var]
+    var_times_sel = numpy.arange(var_subperiod_hrs, max(valid_period_hrs) + var_subperiod_hrs, var_subperiod_hrs)
+
+    # get y and x index ranges for pulling data (full grid by default)
+    if (ndfd_subset_index is None):
+        var_y_slice, var_x_slice = (slice(0, None), slice(0, None))
+    else:
+        var_y_slice, var_x_slice = ndfd_subset_index
 
-                # save list of variable time dimentions
-                var_time_np = numpy.array(var_data[var_data_time_dim][:])
-                # we want 24 hr (1-day), 48 hr (2-day), and 72 hr (3-day) data
-
-                # select subperiods
-                var_times_sel = numpy.array([12.,  24.,  36.,  48.,  60.,  72.])
-
-                # check that subperiods are available
-                var_comparison = numpy.intersect1d(var_time_np, var_times_sel) # has to be 6 long
-
-                # all subperiods are available
-                if(len(var_comparison) == 6):
-                    # get subperiod values
-                    var_24hr_vals = var_times_sel[0:2]
-                    var_48hr_vals = var_times_sel[2:4]
-                    var_72hr_vals = var_times_sel[4:6]
+    # check local cache
+    var_cache_data = None
+    if (ndfd_cache_path is not None):
+        var_cache_data = read_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, ndfd_var, ndfd_subset_index)
 
-                    # get index for pulling data
-                    var_24hr_index = numpy.where(numpy.isin(var_times_sel, var_24hr_vals))[0] # 1-day forecast
-                    var_48hr_index = numpy.where(numpy.isin(var_times_sel, var_48hr_vals))[0] # 2-day forecast
-                    var_72hr_index = numpy.where(numpy.isin(var_times_sel, var_72hr_vals))[0] # 3-day forecast
+        # only use cached data when it has all the subperiods
+        if ((var_cache_data is not None) and (len(numpy.intersect1d(var_cache_data['var_times'], var_times_sel)) != len(var_times_sel))):
+            var_cache_data = None
 
-                    # aggregate qpf data
-                    var_24hr_pd_raw = aggregate_sco_ndfd_var_data(var_data, var_24hr_index, var_24hr_vals, ndfd_var)
-                    var_48hr_pd_raw = aggregate_sco_ndfd_var_data(var_data, var_48hr_index, var_48hr_vals, ndfd_var)
-                    var_72hr_pd_raw = aggregate_sco_ndfd_var_data(var_data, var_72hr_index, var_72hr_vals, ndfd_var)
+    # if data are cached
+    if (var_cache_data is not None):
+        # save cached subperiod data and their times
+        var_raw_data = var_cache_data['var_data']
+        var_time_np = var_cache_data['var_times']
 
-                    # add valid period column
-                    var_24hr_pd_raw['valid_period_hrs'] = numpy.repeat("24", len(var_24hr_pd_raw), axis=0)
-                    var_48hr_pd_raw['valid_period_hrs'] = numpy.repeat("48", len(var_48hr_pd_raw), axis=0)
-                    var_72hr_pd_raw['valid_period_hrs'] = numpy.repeat("72", len(var_72hr_pd_raw), axis=0)
+        # use cached x and y data if they weren't passed in
+        if (ndfd_coords is None):
+            ndfd_coords = (var_cache_data['x_coords'], var_cache_data['y_coords'])
 
-                    # merge rows of data frames
-                    var_data_pd_raw = var_24hr_pd_raw.append([var_48hr_pd_raw, var_72hr_pd_raw]).reset_index()
+        # print status
+        print("read " + ndfd_var + " data on " + datetime_ymdh_str + " from cache")
 
-                    # rename columns
-                    var_data_pd = var_data_pd_raw.rename(columns={"level_0": "y_index", "level_1": "x_index", "pop12_value_perc": "pop12_value_perc"})
+    # if data exists
+    elif ((ndfd_data is not None) and (len(ndfd_data) > 0)):
+        # make ndfd_data children into string for later search check
+        ndfd_children_str = str(ndfd_data.children)
 
-                    # save x and y data
-                    x_data = ndfd_data['x'][:] # x coordinate
-                    y_data = ndfd_data['y'][:] # y coordinate
+        # find variable of interest, if -1 then it does not exist
+        var_check = ndfd_children_str.find(var_name)
 
-                    # create latitude and longitude columns
-                    longitude = []
-                    latitude = []
-                    for row in range(0, var_data_pd.shape[0]):
-                        x_index_val = var_data_pd['x_index'][row]
-                        y_index_val = var_data_pd['y_index'][row]
-                        longitude.append(x_data.data[x_index_val]) # x is longitude
-                        latitude.append(y_data.data[y_index_val]) # y is latitude
+        # if qpf or pop12 are wanted to but not available
+        if (var_check == -1):
+            # empty dataframe
+            var_data_pd = pandas.DataFrame()
 
-                    # add longitude and latitude to data frame
-                    var_data_pd['longitude_km'] = longitude
-                    var_data_pd['latitude_km']  = latitude
+            # print status
+            print("desired vars for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
 
-                    # create and wrangle time columns
-                    # server time is in UCT but changing it to something that's local for NC (use NYC timezone)
-                    var_data_pd['time'] = pandas.to_datetime(numpy.repeat(datetime_uct_str, len(var_data_pd), axis=0), format = "%Y-%m-%d %H:%M")
-                    var_data_pd['time_uct_long'] = var_data_pd.time.dt.tz_localize(tz = 'UCT')
-                    var_data_pd['time_uct'] = var_data_pd.time_uct_long.dt.strftime("%Y-%m-%d %H:%M")
-                    var_data_pd['time_nyc_long'] = var_data_pd.time_uct_long.dt.tz_convert(tz = 'America/New_York')
-                    var_data_pd['time_nyc'] = var_data_pd.time_nyc_long.dt.strftime("%Y-%m-%d %H:%M")
+            return var_data_pd, datetime_ymdh_str
 
-                    # print status
-                    print("tidied " + ndfd_var + " data on " + datetime_ymdh_str)
+        # save variable data
+        var_data = ndfd_data[var_name]
+        #var_data.dimensions # to see dimensions of variable
 
-                    return var_data_pd, datetime_ymdh_str
+        # save variable dimentions
+        var_data_dims = var_data.dimensions # get all dimentions
 
-                # not all subperiods are available for this analysis so don't run
-                else:
-                    # empty dataframe
-                    var_data_pd = pandas.DataFrame()
+        # check number of dimensions and find 'time' dimensions
+        # when there are more than three (i.e., when 'refime' dimension exisits) there's
+        # no available list of pop12 or qpf for 24, 36, etc. hours out (which i need)
+        # so skip entries with 4 dimensions
+        if (len(var_data_dims) != 3): # when dimensions are not (time, y, x)
+            # empty dataframe
+            var_data_pd = pandas.DataFrame()
 
-                    # print status
-                    print("desired subperiods for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
+            # print status
+            print("desired data dimensions for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
 
-                    return var_data_pd, datetime_ymdh_str
+            return var_data_pd, datetime_ymdh_str
 
-            # if number of dimensions is more than 3 i.e. when they are: (reftime, time, y, x)
-            else:
-                # empty dataframe
-                var_data_pd = pandas.DataFrame()
+        # get time dimention
+        var_data_time_dim = var_data_dims[0]
 
-                # print status
-                print("desired times for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
-
-                return var_data_pd, datetime_ymdh_str
+        # save list of variable time dimentions
+        var_time_np = numpy.array(var_data[var_data_time_dim][:])
 
+        # check that subperiods are available
+        var_comparison = numpy.intersect1d(var_time_np, var_times_sel)
 
-        # if qpf or pop12 are wanted to but not available
-        elif(((ndfd_var == "qpf") and (qpf_var_check == -1)) or ((ndfd_var == "pop12") and (pop12_var_check == -1))):
+        # not all subperiods are available for this analysis so don't run
+        if (len(var_comparison) != len(var_times_sel)):
             # empty dataframe
             var_data_pd = pandas.DataFrame()
 
             # print status
-            print("desired vars for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
+            print("desired subperiods for " + ndfd_var + " data on " + datetime_ymdh_str + " are not available")
 
             return var_data_pd, datetime_ymdh_str
 
+        # get index for pulling data
+        var_times_index = numpy.where(numpy.isin(var_time_np, var_times_sel))[0]
+        var_times_slice = slice(int(var_times_index[0]), int(var_times_index[-1]) + 1)
 
-        # if requesting something other than qpf or pop12 data
+        # read all subperiods from the server at once, slicing the proxy only requests this hyperslab (dap constraint expression)
+        var_raw_data = numpy.asarray(var_data.data[0][var_times_slice, var_y_slice, var_x_slice])
+        var_time_np = var_time_np[var_times_slice]
+
+        # save x and y data (only fetch when they weren't passed in)
+        if (ndfd_coords is None):
+            ndfd_coords = get_sco_ndfd_coords(ndfd_data)
+            var_raw_data_bytes = var_raw_data.nbytes + ndfd_coords[0].nbytes + ndfd_coords[1].nbytes
         else:
-            return print("Not a valid ndfd_var option.")
+            var_raw_data_bytes = var_raw_data.nbytes
+
+        # keep track of downloads
+        if (tidy_stats is not None):
+            tidy_stats['bytes_fetched'] = tidy_stats.get('bytes_fetched', 0) + var_raw_data_bytes
 
+        # save to local cache
+        if (ndfd_cache_path is not None):
+            write_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, ndfd_var,
+                                 {'var_data': var_raw_data, 'var_times': var_time_np, 'x_coords': ndfd_coords[0], 'y_coords': ndfd_coords[1]},
+                                 ndfd_subset_index = ndfd_subset_index, max_cache_mb = ndfd_cache_max_mb)
 
     # if data doesn't exist
     else:
@@ -272,3 +180,18 @@ def tidy_sco_ndfd_data(ndfd_data, datetime_uct_str, ndfd_var):
         var_data_pd = pandas.DataFrame()
 
         return var_data_pd, datetime_ymdh_str
+
+    # select subperiods
+    var_period_raw_data = var_raw_data[numpy.isin(var_time_np, var_times_sel)]
+
+    # aggregate data for all valid periods and add coordinates and time columns
+    aggregate_start = time.perf_counter()
+    var_data_pd = make_sco_ndfd_tidy_df(var_period_raw_data, var_times_sel, valid_period_hrs, ndfd_var, ndfd_coords, datetime_uct_str,
+                                        y_index_start = var_y_slice.start, x_index_start = var_x_slice.start, compact = compact)
+    if (tidy_stats is not None):
+        tidy_stats['aggregate_secs'] = tidy_stats.get('aggregate_secs', 0.) + (time.perf_counter() - aggregate_start)
+
+    # print status
+    print("tidied " + ndfd_var + " data on " + datetime_ymdh_str)
+
+    return var_data_pd, datetime_ymdh_str
@@ -0,0 +1,164 @@
+"""
+# ---- script header ----
+script name: tidy_sco_ndfd_data_batch.py
+purpose of script: tidies many cached nc sco ndfd forecast cycles at once across a pool of processes and saves them to a partitioned directory
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, pandas, datetime, os, hashlib, zipfile, multiprocessing, concurrent.futures
+required functions: convert_sco_ndfd_datetime_str.py, get_sco_ndfd_cache_file.py, read_sco_ndfd_cache.py, aggregate_sco_ndfd_var_periods.py, make_sco_ndfd_tidy_df.py, export_sco_ndfd_data.py
+
+"""
+import os
+import concurrent.futures
+import multiprocessing
+from multiprocessing import shared_memory
+import numpy
+import pandas
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+from functions.export_sco_ndfd_data import export_sco_ndfd_data
+from functions.make_sco_ndfd_tidy_df import make_sco_ndfd_tidy_df
+from functions.read_sco_ndfd_cache import read_sco_ndfd_cache
+
+def tidy_sco_ndfd_data_batch(datetime_uct_str_list, ndfd_var_list, ndfd_cache_path, output_path, valid_period_hrs = (24, 48, 72), ndfd_subset_index = None, max_workers = None, output_format = "csv", compact = False):
+    """
+    Description: Tidies qpf and/or pop12 SCO NDFD data for many cached forecast cycles using a pool of processes, the grids are handed to the
+                 processes through shared memory (not pickled) and each process saves its tidy dataframe to a partitioned directory
+    Parameters:
+        datetime_uct_str_list (list): A list of strings in "%Y-%m-%d %H:%M" format (e.g., "2016-01-01 00:00") with timezone = UCT, one per forecast cycle
+        ndfd_var_list (list): A list with "qpf" and/or "pop12", the SCO NDFD variables of interest
+        ndfd_cache_path (str): Local cache directory path with the fetched data, filled by tidy_sco_ndfd_data() or backfill_sco_ndfd_data()
+        output_path (str): A string defining the directory path where the tidy data are saved as csv/ndfd_var=<ndfd_var>/datetime_ymdh=<YYYYMMDDHH>/part-0.csv and/or parquet/.../part-0.parquet
+        valid_period_hrs (list): A list of valid periods to aggregate to in hours (default is 24, 48, and 72 hrs)
+        ndfd_subset_index (tuple): Optional (y_slice, x_slice) tuple from get_sco_ndfd_subset_index() the data were cached with (default is None, the full grid)
+        max_workers (integer): Number of processes (default is None, which uses the number of cpus)
+        output_format (str): either "csv", "parquet", or "both", passed to export_sco_ndfd_data() (default is "csv")
+        compact (boolean): When True each process makes a compact dataframe, passed to make_sco_ndfd_tidy_df() (default is False)
+    Returns:
+        batch_status_pd (data frame): A pandas dataframe with datetime_uct_str, ndfd_var, status ("tidied", "not_cached", or "failed"), num_rows, and files for each cycle and variable
+    Required:
+        import numpy, import pandas, import os, import hashlib, import zipfile, import multiprocessing, from multiprocessing import shared_memory, import concurrent.futures,
+        must load convert_sco_ndfd_datetime_str(), get_sco_ndfd_cache_file(), read_sco_ndfd_cache(), aggregate_sco_ndfd_var_periods(), make_sco_ndfd_tidy_df(), and export_sco_ndfd_data() functions before this
+
+    Note: Processes are started with "forkserver" ("spawn" where forkserver isn't available, e.g., windows) instead of "fork", forking a parent with numpy/blas threads
+          running isn't safe (e.g., on macos), so each process imports this module again and scripts that call this need an if __name__ == "__main__" guard.
+          Cycles that aren't in the cache are skipped, run backfill_sco_ndfd_data() with ndfd_cache_path to cache them first.
+    """
+    # subperiod length (in hrs) for each ndfd_var option (see tidy_sco_ndfd_data())
+    ndfd_var_subperiod_hrs = {"qpf": 6., "pop12": 12.}
+
+    # get y and x index of the first cached grid cell
+    if (ndfd_subset_index is None):
+        y_index_start, x_index_start = (0, 0)
+    else:
+        y_index_start, x_index_start = (ndfd_subset_index[0].start, ndfd_subset_index[1].start)
+
+    # number of processes
+    if (max_workers is None):
+        max_workers = os.cpu_count()
+
+    batch_status = []
+    batch_shms = {} # every shared memory segment that's still open, by name
+    batch_tasks = {}
+    batch_futures = set()
+
+    def free_shm(var_shm):
+        batch_shms.pop(var_shm.name, None)
+        var_shm.close()
+        var_shm.unlink()
+
+    def finish_tasks(return_when):
+        # wait for running tasks, then free their shared memory and record them (a task that raised is recorded as failed)
+        done_futures, not_done_futures = concurrent.futures.wait(batch_futures, return_when = return_when)
+        for done_future in done_futures:
+            var_shm, datetime_uct_str, ndfd_var = batch_tasks.pop(done_future)
+            free_shm(var_shm)
+            try:
+                batch_status.append(done_future.result())
+            except Exception as error:
+                print("failed " + ndfd_var + " " + datetime_uct_str + ": " + type(error).__name__ + ": " + str(error))
+                batch_status.append([datetime_uct_str, ndfd_var, "failed", 0, []])
+
+        return not_done_futures
+
+    # start processes from a forkserver (only this module is preloaded in it) or spawn them, not fork
+    if ("forkserver" in multiprocessing.get_all_start_methods()):
+        mp_context = multiprocessing.get_context("forkserver")
+        mp_context.set_forkserver_preload([__name__])
+    else:
+        mp_context = multiprocessing.get_context("spawn")
+
+    # shared memory outlives the processes, so free every segment that's left when the pool stops (e.g., after an error or KeyboardInterrupt)
+    try:
+        with concurrent.futures.ProcessPoolExecutor(max_workers = max_workers, mp_context = mp_context) as executor:
+            for datetime_uct_str in datetime_uct_str_list:
+                datetime_ym, datetime_ymd_str, datetime_ymdh_str = convert_sco_ndfd_datetime_str(datetime_uct_str)
+
+                for ndfd_var in ndfd_var_list:
+                    # select subperiods (same as tidy_sco_ndfd_data())
+                    var_subperiod_hrs = ndfd_var_subperiod_hrs[ndfd_var]
+                    var_times_sel = numpy.arange(var_subperiod_hrs, max(valid_period_hrs) + var_subperiod_hrs, var_subperiod_hrs)
+
+                    # only use cached data when it has all the subperiods
+                    var_cache_data = read_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, ndfd_var, ndfd_subset_index)
+                    if ((var_cache_data is None) or (len(numpy.intersect1d(var_cache_data['var_times'], var_times_sel)) != len(var_times_sel))):
+                        batch_status.append([datetime_uct_str, ndfd_var, "not_cached", 0, []])
+                        continue
+
+                    var_period_raw_data = var_cache_data['var_data'][numpy.isin(var_cache_data['var_times'], var_times_sel)]
+                    ndfd_coords = (var_cache_data['x_coords'], var_cache_data['y_coords'])
+
+                    # copy grid to shared memory
+                    var_shm = shared_memory.SharedMemory(create = True, size = max(var_period_raw_data.nbytes, 1))
+                    batch_shms[var_shm.name] = var_shm
+                    numpy.ndarray(var_period_raw_data.shape, dtype = var_period_raw_data.dtype, buffer = var_shm.buf)[:] = var_period_raw_data
+
+                    # keep the number of grids in shared memory small
+                    if (len(batch_futures) >= 2 * max_workers):
+                        batch_futures = finish_tasks(concurrent.futures.FIRST_COMPLETED)
+
+                    var_future = executor.submit(tidy_sco_ndfd_data_batch_task, var_shm.name, var_period_raw_data.shape, var_period_raw_data.dtype.str,
+                                                 var_times_sel, valid_period_hrs, ndfd_var, ndfd_coords, datetime_uct_str, datetime_ymdh_str, y_index_start, x_index_start,
+                                                 output_path, output_format, compact)
+                    batch_tasks[var_future] = (var_shm, datetime_uct_str, ndfd_var)
+                    batch_futures.add(var_future)
+
+            finish_tasks(concurrent.futures.ALL_COMPLETED)
+
+    finally:
+        for var_shm in list(batch_shms.values()):
+            free_shm(var_shm)
+
+    # print status
+    print("tidied " + str(sum(status[2] == "tidied" for status in batch_status)) + " of " + str(len(batch_status)) + " cycles and variables")
+
+    batch_status_pd = pandas.DataFrame(batch_status, columns = ['datetime_uct_str', 'ndfd_var', 'status', 'num_rows', 'files'])
+
+    return batch_status_pd
+
+
+def tidy_sco_ndfd_data_batch_task(shm_name, shape, dtype_str, var_times_sel, valid_period_hrs, ndfd_var, ndfd_coords, datetime_uct_str, datetime_ymdh_str, y_index_start, x_index_start,
+                                  output_path, output_format, compact):
+    """
+    Description: Runs in a tidy_sco_ndfd_data_batch() process, tidies one cycle and variable from shared memory and saves it to output_path
+    Returns:
+        A [datetime_uct_str, ndfd_var, "tidied", num_rows, output_files] list
+    """
+    # read grid from shared memory (no copy)
+    var_shm = shared_memory.SharedMemory(name = shm_name)
+    try:
+        var_period_raw_data = numpy.ndarray(shape, dtype = numpy.dtype(dtype_str), buffer = var_shm.buf)
+
+        var_data_pd = make_sco_ndfd_tidy_df(var_period_raw_data, var_times_sel, valid_period_hrs, ndfd_var, ndfd_coords, datetime_uct_str,
+                                            y_index_start = y_index_start, x_index_start = x_index_start, compact = compact)
+        del var_period_raw_data
+
+    finally:
+        var_shm.close()
+
+    # save to partitioned directory
+    output_files = export_sco_ndfd_data(var_data_pd, output_path, ndfd_var, datetime_ymdh_str, output_format = output_format, partition = True)
+
+    return [datetime_uct_str, ndfd_var, "tidied", len(var_data_pd), output_files]
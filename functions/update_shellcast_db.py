@@ -0,0 +1,114 @@
+"""
+# ---- script header ----
+script name: update_shellcast_db.py
+purpose of script: updates the sga_min_max, ncdmf_leases, and closure_probabilities tables of the shellcast mysql database
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas, numpy, sqlalchemy, tempfile, os
+required functions: make_shellcast_db_engine.py, write_shellcast_db_table.py, get_new_ncdmf_leases.py, insert_ncdmf_leases.py, upsert_closure_probabilities.py
+
+"""
+import pandas
+import sqlalchemy
+
+from functions.get_new_ncdmf_leases import get_new_ncdmf_leases
+from functions.insert_ncdmf_leases import insert_ncdmf_leases
+from functions.upsert_closure_probabilities import upsert_closure_probabilities
+from functions.write_shellcast_db_table import write_shellcast_db_table
+
+def update_shellcast_db(db_conn, sga_data, lease_spatial_data, lease_data, batch_size = 1000, bulk_load = False, closure_prob_write_mode = "append", closure_prob_skip_unchanged = False,
+                        forecast_date = None):
+    """
+    Description: Updates the ShellCast database with the daily sga min and max calcs, new ncdmf leases, and user lease probabilities of closure
+    Parameters:
+        db_conn (sqlalchemy connection): An open sqlalchemy connection from make_shellcast_db_engine()
+        sga_data (data frame): A pandas dataframe of sga min and max calcs (e.g., ndfd_sga_calcs.csv)
+        lease_spatial_data (data frame): A pandas dataframe of ncdmf leases (e.g., lease_centroids_db_wgs84.csv)
+        lease_data (data frame): A pandas dataframe of lease calcs with lease_id, day, prob_1d_perc, prob_2d_perc, and prob_3d_perc (e.g., ndfd_lease_calcs.csv)
+        batch_size (int): The number of rows in each INSERT statement (default is 1000)
+        bulk_load (boolean): If True, appends with LOAD DATA LOCAL INFILE (mysql only, see write_shellcast_db_table()) (default is False)
+        closure_prob_write_mode (str): "append" to add every row every run or "upsert" for one row per lease and forecast date (default is "append"),
+                                       upsert needs the forecast_date column and unique key in upsert_closure_probabilities()
+        closure_prob_skip_unchanged (boolean): When upserting, don't write leases with the same probabilities as their latest row,
+                                               so readers have to use each lease's latest row on or before a date (default is False)
+        forecast_date (str): Optional forecast date ("%Y-%m-%d" format) of the upserted rows (default is None, which uses the day column of lease_data),
+                             when upserting without a forecast date (e.g., lease_data is empty) closure_probabilities isn't written
+    Returns:
+        db_update_info (dict): A dictionary with the number of rows written to each table ('sga_min_max', 'ncdmf_leases', and 'closure_probabilities')
+    Required:
+        import pandas, import numpy, import sqlalchemy, import tempfile, import os, must load make_shellcast_db_engine(), write_shellcast_db_table(),
+        get_new_ncdmf_leases(), insert_ncdmf_leases(), and upsert_closure_probabilities() functions before this
+
+    Note: This doesn't commit, call commit() on the transaction of db_conn after this so the whole update is one transaction.
+    """
+    db_update_info = {}
+
+    # update sga min and max table
+    db_update_info['sga_min_max'] = write_shellcast_db_table(db_conn, 'sga_min_max', sga_data, batch_size = batch_size, bulk_load = bulk_load)
+
+    # print status
+    print("added sga min and max data to mysql db")
+
+    # update ncdmf leases table (i.e., all possible leases from the ncdmf rest api)
+    # anti-join in the db to find new ncdmf leases (i.e., NOT in ncdmf_leases shellcast mysql table)
+    lease_spatial_data_sel = get_new_ncdmf_leases(db_conn, lease_spatial_data, batch_size = batch_size)
+
+    # if there are no new leases to add (from the ncdmf rest api) then skip inserting rows
+    if (len(lease_spatial_data_sel) > 0):
+        db_update_info['ncdmf_leases'] = insert_ncdmf_leases(db_conn, lease_spatial_data_sel, batch_size = batch_size)
+
+        # print status
+        print("added " + str(len(lease_spatial_data_sel)) + " new ncdmf leases to mysql db")
+
+    else:
+        db_update_info['ncdmf_leases'] = 0
+
+        # print status
+        print("there were no new ncdmf leases to add to mysql db")
+
+    # update closure_probabilities table
+    # get current user leases in db
+    user_leases_current_df = pandas.read_sql(sqlalchemy.text("SELECT id, ncdmf_lease_id FROM user_leases"), db_conn)
+
+    # lease calcs df select only needed columns and rename to match current lease df
+    lease_data_sel = lease_data[['lease_id', 'prob_1d_perc', 'prob_2d_perc', 'prob_3d_perc']].rename(columns = {'lease_id': 'ncdmf_lease_id'})
+
+    # join lease calcs to user leases (user leases without calcs are NULL)
+    leases_join_df = user_leases_current_df.merge(lease_data_sel, how = "left", on = "ncdmf_lease_id")
+
+    # finalize data to add to mysql db
+    closure_prob_data = pandas.DataFrame({'lease_id': leases_join_df['id'],
+                                          'prob_1d_perc': leases_join_df['prob_1d_perc'],
+                                          'prob_2d_perc': leases_join_df['prob_2d_perc'],
+                                          'prob_3d_perc': leases_join_df['prob_3d_perc']})
+
+    # forecast date of the lease calcs (upsert key is lease_id and forecast_date)
+    if (forecast_date is None) and (len(lease_data) > 0):
+        forecast_date = str(lease_data['day'].iloc[0])
+
+    if (closure_prob_write_mode == "upsert") and (forecast_date is None):
+        # forecast_date can't be NULL, skip instead of failing the whole transaction
+        db_update_info['closure_probabilities'] = 0
+
+        # print status
+        print("there was no forecast date for the user lease data, skipped closure probabilities in mysql db")
+
+    elif (closure_prob_write_mode == "upsert"):
+        # add forecast date
+        closure_prob_data.insert(1, 'forecast_date', forecast_date)
+
+        # add or update rows in batches
+        db_update_info['closure_probabilities'] = upsert_closure_probabilities(db_conn, closure_prob_data, batch_size = batch_size, skip_unchanged = closure_prob_skip_unchanged)
+
+        # print status
+        print("added or updated " + str(db_update_info['closure_probabilities']) + " rows of user lease data in mysql db")
+
+    else:
+        db_update_info['closure_probabilities'] = write_shellcast_db_table(db_conn, 'closure_probabilities', closure_prob_data, batch_size = batch_size, bulk_load = bulk_load)
+
+        # print status
+        print("added user lease data to mysql db")
+
+    return db_update_info
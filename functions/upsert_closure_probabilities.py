@@ -0,0 +1,71 @@
+"""
+# ---- script header ----
+script name: upsert_closure_probabilities.py
+purpose of script: adds or updates lease probabilities of closure in the closure_probabilities table of the mysql database
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas, numpy, sqlalchemy
+required functions: make_shellcast_db_engine.py
+
+"""
+import numpy
+import pandas
+import sqlalchemy
+
+def upsert_closure_probabilities(db_conn, closure_prob_data, batch_size = 1000, skip_unchanged = False):
+    """
+    Description: Adds lease probabilities of closure to the closure_probabilities table, or updates them if there's already a row for that lease and forecast date,
+                 with bound parameters in batches of batch_size rows
+    Parameters:
+        db_conn (sqlalchemy connection): An open sqlalchemy connection from make_shellcast_db_engine()
+        closure_prob_data (data frame): A pandas dataframe with lease_id, forecast_date ("%Y-%m-%d"), prob_1d_perc, prob_2d_perc, and prob_3d_perc columns
+        batch_size (int): The number of rows in each INSERT statement (default is 1000)
+        skip_unchanged (boolean): If True, leases with the same probabilities as their latest row in the table (on or before forecast_date) aren't written,
+                                  so the latest row for a lease on or before a date holds its probabilities (default is False, which writes every row)
+    Returns:
+        num_rows (int): The number of rows sent to the database
+    Required:
+        import pandas, import numpy, import sqlalchemy, must load and run make_shellcast_db_engine() function before this
+
+    Note: The table needs a forecast_date column and a unique key on lease_id and forecast_date for the update to work,
+          see the closure probabilities upsert section of the README for the migration and the order to roll it out in.
+          With skip_unchanged, a lease that didn't change has no row for forecast_date, so readers have to use the latest row of each lease on or before the date
+          instead of filtering on forecast_date = the date.
+          This doesn't commit, rows are added in the transaction of db_conn.
+    """
+    prob_cols = ['prob_1d_perc', 'prob_2d_perc', 'prob_3d_perc']
+    closure_prob_sel = closure_prob_data[['lease_id', 'forecast_date'] + prob_cols]
+
+    # drop leases with the same probabilities as their latest row
+    if skip_unchanged and (len(closure_prob_sel) > 0):
+        latest_prob_sql = ("SELECT c.`lease_id`, c.`prob_1d_perc`, c.`prob_2d_perc`, c.`prob_3d_perc` FROM `closure_probabilities` c "
+                           "JOIN (SELECT `lease_id`, MAX(`forecast_date`) AS `forecast_date` FROM `closure_probabilities` WHERE `forecast_date` <= :forecast_date GROUP BY `lease_id`) m "
+                           "ON c.`lease_id` = m.`lease_id` AND c.`forecast_date` = m.`forecast_date`")
+        latest_prob_result = db_conn.execute(sqlalchemy.text(latest_prob_sql), {'forecast_date': str(closure_prob_sel['forecast_date'].max())})
+        latest_prob_data = pandas.DataFrame(latest_prob_result.fetchall(), columns = ['lease_id'] + prob_cols)
+
+        closure_prob_join = closure_prob_sel.merge(latest_prob_data, how = "left", on = "lease_id", suffixes = ("", "_latest"), indicator = True)
+        prob_same = numpy.ones(len(closure_prob_join), dtype = bool)
+        for prob_col in prob_cols:
+            new_prob = pandas.to_numeric(closure_prob_join[prob_col], errors = "coerce").to_numpy(dtype = float)
+            latest_prob = pandas.to_numeric(closure_prob_join[prob_col + "_latest"], errors = "coerce").to_numpy(dtype = float)
+            prob_same &= (new_prob == latest_prob) | (numpy.isnan(new_prob) & numpy.isnan(latest_prob)) # missing values are NULL
+        closure_prob_sel = closure_prob_sel[~(prob_same & (closure_prob_join['_merge'] == "both")).to_numpy()]
+
+    # one parameter dictionary per row (missing values are NULL)
+    closure_prob_params = closure_prob_sel.astype(object).where(closure_prob_sel.notna(), None).to_dict("records")
+
+    # mysql and sqlite (for testing) upserts, pymysql executemany() turns each batch into one multi row INSERT
+    closure_prob_upsert_sql = ("INSERT INTO `closure_probabilities` (`lease_id`, `forecast_date`, `prob_1d_perc`, `prob_2d_perc`, `prob_3d_perc`) "
+                               "VALUES (:lease_id, :forecast_date, :prob_1d_perc, :prob_2d_perc, :prob_3d_perc) ")
+    if (db_conn.dialect.name == "mysql"):
+        closure_prob_upsert_sql += "ON DUPLICATE KEY UPDATE " + ", ".join(["`" + col + "` = VALUES(`" + col + "`)" for col in prob_cols])
+    else:
+        closure_prob_upsert_sql += "ON CONFLICT (`lease_id`, `forecast_date`) DO UPDATE SET " + ", ".join(["`" + col + "` = excluded.`" + col + "`" for col in prob_cols])
+
+    for batch_start in range(0, len(closure_prob_params), batch_size):
+        db_conn.execute(sqlalchemy.text(closure_prob_upsert_sql), closure_prob_params[batch_start:(batch_start + batch_size)])
+
+    return len(closure_prob_params)
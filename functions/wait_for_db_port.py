@@ -0,0 +1,39 @@
+"""
+# ---- script header ----
+script name: wait_for_db_port.py
+purpose of script: waits until a database port (e.g., the cloud sql proxy) accepts connections
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: socket, time
+required functions: none
+
+"""
+import time
+import socket
+
+def wait_for_db_port(host, port, timeout_secs = 60, poll_secs = 0.25):
+    """
+    Description: Checks a TCP port every poll_secs seconds until it accepts connections or timeout_secs seconds have passed,
+                 so the database update starts as soon as the cloud sql proxy is ready instead of after a fixed sleep
+    Parameters:
+        host (str): The database host (e.g., "127.0.0.1")
+        port (int): The database port (e.g., 3306)
+        timeout_secs (float): The maximum number of seconds to wait (default is 60)
+        poll_secs (float): The number of seconds between checks (default is 0.25)
+    Returns:
+        wait_secs (float): The number of seconds it took for the port to open, None if it didn't open before timeout_secs
+    Required:
+        import socket, import time
+    """
+    start_time = time.perf_counter()
+
+    while True:
+        try:
+            with socket.create_connection((host, port), timeout = poll_secs):
+                return time.perf_counter() - start_time
+        except OSError:
+            if ((time.perf_counter() - start_time) >= timeout_secs):
+                return None
+            time.sleep(poll_secs)
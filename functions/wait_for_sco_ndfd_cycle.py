@@ -0,0 +1,98 @@
+"""
+# ---- script header ----
+script name: wait_for_sco_ndfd_cycle.py
+purpose of script: finds the newest complete nc sco ndfd forecast cycle on the server and waits for the latest cycle to be posted
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: requests, pandas, time
+required functions: convert_sco_ndfd_datetime_str.py, get_sco_ndfd_cycle_str.py
+
+"""
+import time
+import pandas
+import requests
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+from functions.get_sco_ndfd_cycle_str import get_sco_ndfd_cycle_str
+
+def wait_for_sco_ndfd_cycle(base_server_url, datetime_now_uct = None, ndfd_var_names = None, timeout_secs = 2700, poll_secs = 30, max_poll_secs = 300,
+                            lookback_cycles = 2, check_timeout_secs = 30, session = None):
+    """
+    Description: Checks the dataset descriptor (.dds, a few kB) of the latest SCO NDFD forecast cycle (the last 00 or 12 UCT) until it's posted with all variables
+                 or timeout_secs seconds have passed, checks start poll_secs seconds apart and double up to max_poll_secs seconds (backoff),
+                 if the latest cycle isn't posted in time the newest complete cycle of the lookback_cycles cycles before it is used,
+                 so the analysis starts as soon as the forecast is posted instead of at a fixed time
+    Parameters:
+        base_server_url (str): Base URL (string) for the SCO NDFD TDS server
+        datetime_now_uct (datetime): Optional pandas timestamp with timezone = UCT, the latest cycle is the last 00 or 12 UCT at or before it (default is None, which uses the current time)
+        ndfd_var_names (list): Optional list of SCO NDFD variable names that have to be in the cycle for it to be complete (default is None, which only checks that the cycle exists)
+        timeout_secs (float): The maximum number of seconds to wait for the latest cycle (default is 2700), 0 checks once
+        poll_secs (float): The number of seconds before the second check (default is 30)
+        max_poll_secs (float): The maximum number of seconds between checks (default is 300)
+        lookback_cycles (int): The number of earlier cycles to check when the latest cycle isn't posted in time (default is 2)
+        check_timeout_secs (float): The maximum number of seconds to wait for each server response (default is 30)
+        session (requests Session): Optional requests session so connections to the server are reused (default is None, which makes a new session)
+    Returns:
+        cycle_info (dict): A dictionary with datetime_uct_str (the newest complete cycle as a string in "%Y-%m-%d %H:%M" format, None if none of the cycles are posted),
+                           latest_datetime_uct_str (the latest cycle), latest (True when datetime_uct_str is the latest cycle), num_checks, and wait_secs
+    Required:
+        import requests, import pandas, import time, must load convert_sco_ndfd_datetime_str() and get_sco_ndfd_cycle_str() functions before this
+    """
+    start_time = time.perf_counter()
+
+    # share one session (connection pool) for all checks
+    if (session is None):
+        session = requests.Session()
+
+    # latest cycle (no rounding, a cycle can't be posted before its time)
+    if (datetime_now_uct is None):
+        datetime_now_uct = pandas.Timestamp.now(tz = "UTC")
+    latest_datetime_uct_str = get_sco_ndfd_cycle_str(datetime_now_uct, round_hour = False)
+
+    cycle_info = {'datetime_uct_str': None, 'latest_datetime_uct_str': latest_datetime_uct_str, 'latest': False, 'num_checks': 0, 'wait_secs': None}
+
+    def check_cycle(datetime_uct_str):
+        # same url as get_sco_ndfd_data(), the descriptor only exists when the dataset exists and lists its variables
+        year_month, year_month_day, year_month_day_hour = convert_sco_ndfd_datetime_str(datetime_uct_str)
+        data_url_to_check = base_server_url + year_month + "/" + year_month_day + "/" + year_month_day_hour + "ds.midatlan.oper.bin.dds"
+        cycle_info['num_checks'] += 1
+
+        try:
+            url_check = session.get(data_url_to_check, timeout = check_timeout_secs)
+        except requests.exceptions.RequestException as error:
+            print("could not reach " + data_url_to_check + ": " + str(error))
+            return False
+
+        # a cycle that's still being posted can be missing variables
+        return (url_check.status_code == 200) and all((ndfd_var_name in url_check.text) for ndfd_var_name in (ndfd_var_names or []))
+
+    # check the latest cycle until it's posted (waits are cut short at the timeout)
+    num_polls = 0
+    while True:
+        if check_cycle(latest_datetime_uct_str):
+            cycle_info['datetime_uct_str'] = latest_datetime_uct_str
+            cycle_info['latest'] = True
+            break
+
+        remaining_secs = timeout_secs - (time.perf_counter() - start_time)
+        if (remaining_secs <= 0):
+            break
+
+        wait_secs = min(poll_secs * (2 ** num_polls), max_poll_secs, remaining_secs)
+        print(latest_datetime_uct_str + " forecast isn't posted yet, checking again in " + str(round(wait_secs, 1)) + " s")
+        time.sleep(wait_secs)
+        num_polls += 1
+
+    # use the newest earlier cycle that's posted
+    if not cycle_info['latest']:
+        for lookback_cycle in range(1, lookback_cycles + 1):
+            lookback_datetime_uct_str = (pandas.to_datetime(latest_datetime_uct_str, format = "%Y-%m-%d %H:%M") - pandas.Timedelta(hours = 12 * lookback_cycle)).strftime("%Y-%m-%d %H:%M")
+            if check_cycle(lookback_datetime_uct_str):
+                cycle_info['datetime_uct_str'] = lookback_datetime_uct_str
+                break
+
+    cycle_info['wait_secs'] = time.perf_counter() - start_time
+
+    return cycle_info
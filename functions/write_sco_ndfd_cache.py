@@ -0,0 +1,82 @@
+"""
+# ---- script header ----
+script name: write_sco_ndfd_cache.py
+purpose of script: writes nc sco ndfd arrays for a cycle, variable, and grid subset to the local cache
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: os, time, tempfile, hashlib, numpy
+required functions: get_sco_ndfd_cache_file.py
+
+"""
+import os
+import time
+import tempfile
+import numpy
+
+from functions.get_sco_ndfd_cache_file import get_sco_ndfd_cache_file
+
+def write_sco_ndfd_cache(cache_path, datetime_ymdh_str, ndfd_var, cache_data, ndfd_subset_index = None, max_cache_mb = 2000):
+    """
+    Description: Writes SCO NDFD arrays for a forecast cycle, variable, and grid subset to the local cache (compressed numpy .npz file),
+                 then removes the least recently used cache files until the cache is under max_cache_mb (and temporary files left by writers that crashed)
+    Parameters:
+        cache_path (str): A string defining the cache directory path, it's made if it doesn't exist
+        datetime_ymdh_str (str): A string in "%Y%m%d%H" format (e.g, "2016010100"), from convert_sco_ndfd_datetime_str() function
+        ndfd_var (str): the cached SCO NDFD variable (e.g., "qpf", "pop12", or "coords")
+        cache_data (dict): A dictionary of numpy arrays to cache (e.g., {'x_coords': x_coords_np, 'y_coords': y_coords_np})
+        ndfd_subset_index (tuple): Optional (y_slice, x_slice) tuple from get_sco_ndfd_subset_index() (default is None, which is the full grid)
+        max_cache_mb (float): Maximum size of the cache directory in megabytes (default is 2000)
+    Returns:
+        cache_file (str): A string defining the cache file path
+    Required:
+        import os, import time, import tempfile, import hashlib, import numpy, must load get_sco_ndfd_cache_file() function before this
+    """
+    # make cache directory
+    os.makedirs(cache_path, exist_ok = True)
+
+    # define cache file path
+    cache_file = get_sco_ndfd_cache_file(cache_path, datetime_ymdh_str, ndfd_var, ndfd_subset_index)
+
+    # write to a temporary file first and then rename it so a partly written file is never read
+    # (each writer gets its own temporary file, other threads or processes can write the same cycle at the same time)
+    cache_file_temp_fd, cache_file_temp = tempfile.mkstemp(dir = cache_path, suffix = ".tmp")
+    try:
+        with os.fdopen(cache_file_temp_fd, 'wb') as write_obj:
+            numpy.savez_compressed(write_obj, **cache_data)
+        os.replace(cache_file_temp, cache_file)
+    except BaseException:
+        os.remove(cache_file_temp)
+        raise
+
+    # list cache files from least to most recently used (other threads or processes can remove files at the same time, skip files that are gone)
+    # temporary files that haven't changed in an hour were left by a writer that crashed, remove them
+    cache_files_info = []
+    for file_name in os.listdir(cache_path):
+        if file_name.endswith(".npz") or file_name.endswith(".tmp"):
+            file_path = os.path.join(cache_path, file_name)
+            try:
+                file_stat = os.stat(file_path)
+                if file_name.endswith(".tmp"):
+                    if ((time.time() - file_stat.st_mtime) > 3600):
+                        os.remove(file_path)
+                    continue
+            except FileNotFoundError:
+                continue
+            cache_files_info.append((file_stat.st_mtime, file_stat.st_size, file_path))
+    cache_files_info.sort()
+
+    # remove least recently used files until cache is small enough (always keep the file that was just written)
+    cache_size_bytes = sum([file_info[1] for file_info in cache_files_info])
+    for file_mtime, file_size, file_path in cache_files_info:
+        if (cache_size_bytes <= (max_cache_mb * 1024 * 1024)):
+            break
+        if (file_path != cache_file):
+            try:
+                os.remove(file_path)
+            except FileNotFoundError:
+                pass # already removed by another writer
+            cache_size_bytes = cache_size_bytes - file_size
+
+    return cache_file
@@ -0,0 +1,63 @@
+"""
+# ---- script header ----
+script name: write_sco_ndfd_raster.py
+purpose of script: saves a raster of nc sco ndfd data as a geotiff, optionally reprojected and cropped
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: numpy, rasterio, math
+required functions: make_sco_ndfd_raster.py
+
+"""
+import math
+import numpy
+import rasterio.transform
+import rasterio.warp
+
+def write_sco_ndfd_raster(var_raster_np, var_transform, src_proj4, output_file, dst_proj4 = None, dst_bounds = None):
+    """
+    Description: Saves a (y, x) raster of SCO NDFD data as a float32 geotiff, reprojected to dst_proj4 and cropped to dst_bounds when they're given
+    Parameters:
+        var_raster_np (numpy array): A north up (y, x) array from make_sco_ndfd_raster()
+        var_transform (affine): The rasterio affine transform of var_raster_np, from make_sco_ndfd_raster()
+        src_proj4 (str): The proj4 string of var_raster_np (e.g., ndfd_proj4)
+        output_file (str): A string defining the geotiff file path (e.g., ".../pop12_24hr_nc_albers.tif")
+        dst_proj4 (str): Optional proj4 string to reproject to (e.g., na_albers_proj4) (default is None, which keeps src_proj4)
+        dst_bounds (list): Optional bounding box [xmin, ymin, xmax, ymax] in dst_proj4 units to crop to (e.g., nc buffer bounds) (default is None, which keeps the full extent)
+    Returns:
+        output_file (str): The geotiff file path
+    Required:
+        import numpy, import rasterio, import rasterio.warp, import math, must load and run make_sco_ndfd_raster() function before this
+
+    Note: Reprojected cells take the value of the nearest grid cell (no smoothing) and cells without data are nan.
+    """
+    var_raster_np = numpy.asarray(var_raster_np, dtype = numpy.float32)
+    src_height, src_width = var_raster_np.shape
+
+    if (dst_proj4 is None):
+        dst_proj4 = src_proj4
+
+    # same projection and extent, no need to resample
+    if ((dst_proj4 == src_proj4) and (dst_bounds is None)):
+        dst_raster_np, dst_transform = (var_raster_np, var_transform)
+
+    else:
+        # destination grid with about the same cell size as the source grid
+        dst_transform, dst_width, dst_height = rasterio.warp.calculate_default_transform(src_proj4, dst_proj4, src_width, src_height,
+                                                                                         *rasterio.transform.array_bounds(src_height, src_width, var_transform))
+        if (dst_bounds is not None):
+            dst_res = dst_transform.a
+            dst_width, dst_height = (math.ceil((dst_bounds[2] - dst_bounds[0]) / dst_res), math.ceil((dst_bounds[3] - dst_bounds[1]) / dst_res))
+            dst_transform = rasterio.transform.from_origin(dst_bounds[0], dst_bounds[3], dst_res, dst_res)
+
+        dst_raster_np = numpy.full((dst_height, dst_width), numpy.nan, dtype = numpy.float32)
+        rasterio.warp.reproject(var_raster_np, dst_raster_np, src_transform = var_transform, src_crs = src_proj4, src_nodata = numpy.nan,
+                                dst_transform = dst_transform, dst_crs = dst_proj4, dst_nodata = numpy.nan, resampling = rasterio.warp.Resampling.nearest)
+
+    # save geotiff
+    with rasterio.open(output_file, "w", driver = "GTiff", height = dst_raster_np.shape[0], width = dst_raster_np.shape[1], count = 1, dtype = "float32",
+                       crs = dst_proj4, transform = dst_transform, nodata = numpy.nan, compress = "deflate") as raster_file:
+        raster_file.write(dst_raster_np, 1)
+
+    return output_file
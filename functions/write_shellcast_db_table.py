@@ -0,0 +1,50 @@
+"""
+# ---- script header ----
+script name: write_shellcast_db_table.py
+purpose of script: appends a dataframe to a table of the shellcast mysql database in batches or with a bulk load
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas, sqlalchemy, tempfile, os
+required functions: make_shellcast_db_engine.py
+
+"""
+import os
+import tempfile
+import sqlalchemy
+
+def write_shellcast_db_table(db_conn, table_name, data, batch_size = 1000, bulk_load = False):
+    """
+    Description: Appends a dataframe to a ShellCast database table in batches of batch_size rows, or with LOAD DATA LOCAL INFILE (MySQL only) for large dataframes
+    Parameters:
+        db_conn (sqlalchemy connection): An open sqlalchemy connection from make_shellcast_db_engine()
+        table_name (str): The table name (e.g., "sga_min_max")
+        data (data frame): A pandas dataframe with column names that match the table
+        batch_size (int): The number of rows in each INSERT statement (default is 1000)
+        bulk_load (boolean): If True and db_conn is MySQL, writes data to a temporary csv and loads it with LOAD DATA LOCAL INFILE, the engine must be
+                             made with local_infile = True (default is False, which uses INSERT statements)
+    Returns:
+        num_rows (int): The number of rows added
+    Required:
+        import pandas, import sqlalchemy, import tempfile, import os, must load and run make_shellcast_db_engine() function before this
+
+    Note: This doesn't commit, rows are added in the transaction of db_conn.
+    """
+    if bulk_load and (db_conn.dialect.name == "mysql"):
+        # missing values are NULL (not enclosed in quotes)
+        with tempfile.NamedTemporaryFile("w", suffix = ".csv", delete = False) as data_file:
+            data.to_csv(data_file, index = False, header = False, na_rep = "NULL", lineterminator = "\n")
+
+        try:
+            load_data_sql = ("LOAD DATA LOCAL INFILE :data_file INTO TABLE `" + table_name + "` "
+                             "FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' LINES TERMINATED BY '\\n' "
+                             "(" + ", ".join(["`" + col + "`" for col in data.columns]) + ")")
+            db_conn.execute(sqlalchemy.text(load_data_sql), {'data_file': data_file.name})
+        finally:
+            os.remove(data_file.name)
+
+    else:
+        data.to_sql(table_name, db_conn, if_exists = "append", index = False, chunksize = batch_size, method = "multi")
+
+    return len(data)
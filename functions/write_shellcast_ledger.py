@@ -0,0 +1,38 @@
+"""
+# ---- script header ----
+script name: write_shellcast_ledger.py
+purpose of script: adds or updates rows of the sqlite run ledger in one transaction
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: sqlite3, datetime
+required functions: none
+
+"""
+import datetime as dt
+
+def write_shellcast_ledger(ledger_conn, ledger_rows):
+    """
+    Description: Adds rows to the ShellCast run ledger or updates the rows that are already there for the same stage, variable, and cycle,
+                 all rows are written in one transaction (so write many rows at once instead of one at a time)
+    Parameters:
+        ledger_conn (sqlite3 Connection): A connection from make_shellcast_ledger()
+        ledger_rows (list): A list of dictionaries with stage, datetime_uct_str (in "%Y-%m-%d %H:%M" format), status (e.g., "available", "not_available", "failed", or "done"),
+                            and optional ndfd_var ("qpf" or "pop12", default is "all"), wall_secs, and output_path,
+                            when a stage, variable, and cycle is in the list more than once the last one is kept
+    Returns:
+        num_rows (int): The number of rows written
+    Required:
+        import sqlite3, import datetime
+    """
+    updated_uct = dt.datetime.now(dt.timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+    ledger_values = [(ledger_row['stage'], ledger_row.get('ndfd_var', "all"), ledger_row['datetime_uct_str'], ledger_row['status'],
+                      ledger_row.get('wall_secs'), ledger_row.get('output_path'), updated_uct) for ledger_row in ledger_rows]
+
+    with ledger_conn:
+        ledger_conn.executemany("INSERT INTO run_ledger (stage, ndfd_var, datetime_uct_str, status, wall_secs, output_path, updated_uct) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                                "ON CONFLICT (stage, ndfd_var, datetime_uct_str) DO UPDATE SET status = excluded.status, wall_secs = excluded.wall_secs, "
+                                "output_path = excluded.output_path, updated_uct = excluded.updated_uct", ledger_values)
+
+    return len(ledger_values)
@@ -0,0 +1,90 @@
+"""
+# ---- script header ----
+script name: write_shellcast_run_metrics.py
+purpose of script: writes a json record and a prometheus textfile of the metrics of a shellcast analysis run
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pandas, json, os
+required functions: measure_shellcast_stage.py (for stage_log)
+
+"""
+import json
+import os
+import pandas
+
+def write_shellcast_run_metrics(run_info, stage_log, json_output_path = None, prom_output_file = None):
+    """
+    Description: Adds the end time, duration, and deadline margin to run_info and writes the run and its stage records to a json file (one file per run)
+                 and/or a prometheus textfile (replaced every run, for the node exporter textfile collector) so late or failed runs can be alerted on
+    Parameters:
+        run_info (dict): A dictionary with run_start (timezone aware pandas Timestamp), run_deadline (timezone aware pandas Timestamp or None),
+                         forecast_datetime_uct_str (str in "%Y-%m-%d %H:%M" format), and status ("success" or "failed"), other values are saved in the json record too
+        stage_log (list): A list of stage records from measure_shellcast_stage() (skipped stages only need stage and status)
+        json_output_path (str): Optional directory path for the json record, named shellcast_run_<run start %Y%m%d%H%M%S>.json (default is None, which doesn't write it)
+        prom_output_file (str): Optional prometheus textfile path, it should end in .prom (default is None, which doesn't write it)
+    Returns:
+        run_record (dict): A dictionary with run (run_info with run_end, duration_secs, and deadline_margin_secs, times as iso strings) and stages (stage_log)
+    Required:
+        import pandas, import json, import os
+
+    Note: deadline_margin_secs is the time left before the deadline when the run ended (less than zero means the run was late).
+    """
+    # run times
+    run_end = pandas.Timestamp.now(tz = "UTC")
+    run_deadline = run_info.get('run_deadline')
+    run_values = {**run_info,
+                  'run_end': run_end,
+                  'duration_secs': (run_end - run_info['run_start']).total_seconds(),
+                  'deadline_margin_secs': (run_deadline - run_end).total_seconds() if (run_deadline is not None) else None}
+    run_record = {'run': {key: (value.isoformat() if isinstance(value, pandas.Timestamp) else value) for key, value in run_values.items()},
+                  'stages': stage_log}
+
+    # json record for this run
+    if (json_output_path is not None):
+        os.makedirs(json_output_path, exist_ok = True)
+        json_output_file = os.path.join(json_output_path, "shellcast_run_" + run_info['run_start'].strftime("%Y%m%d%H%M%S") + ".json")
+        with open(json_output_file, "w") as write_obj:
+            json.dump(run_record, write_obj, indent = 1)
+
+    # prometheus textfile (gauges, stage metrics have a stage label)
+    if (prom_output_file is not None):
+        prom_lines = []
+        def add_prom_metric(metric_name, metric_help, metric_values):
+            prom_lines.append("# HELP " + metric_name + " " + metric_help)
+            prom_lines.append("# TYPE " + metric_name + " gauge")
+            for metric_labels, metric_value in metric_values:
+                if (metric_value is not None):
+                    prom_lines.append(metric_name + metric_labels + " " + repr(float(metric_value)))
+
+        forecast_datetime_uct = pandas.to_datetime(run_info['forecast_datetime_uct_str'], format = "%Y-%m-%d %H:%M").tz_localize(tz = "UTC")
+        add_prom_metric("shellcast_run_start_timestamp_seconds", "Time the run started.", [("", run_info['run_start'].timestamp())])
+        add_prom_metric("shellcast_run_end_timestamp_seconds", "Time the run ended.", [("", run_end.timestamp())])
+        add_prom_metric("shellcast_run_success", "1 if the run finished without errors, 0 if it failed.", [("", run_info['status'] == "success")])
+        add_prom_metric("shellcast_run_duration_seconds", "Time from the start to the end of the run.", [("", run_values['duration_secs'])])
+        add_prom_metric("shellcast_run_deadline_margin_seconds", "Time left before the deadline when the run ended (less than zero is late).", [("", run_values['deadline_margin_secs'])])
+        add_prom_metric("shellcast_forecast_cycle_timestamp_seconds", "Forecast cycle (UTC) used by the run.", [("", forecast_datetime_uct.timestamp())])
+
+        stage_metrics = [("wall_secs", "shellcast_stage_wall_seconds", "Wall time of the stage."),
+                         ("cpu_secs", "shellcast_stage_cpu_seconds", "CPU time of the stage."),
+                         ("peak_rss_mb", "shellcast_stage_peak_rss_bytes", "Peak resident memory of the process at the end of the stage."),
+                         ("bytes_fetched", "shellcast_stage_fetched_bytes", "Bytes of forecast data fetched from the server by the stage."),
+                         ("rows_out", "shellcast_stage_rows_out", "Rows of data made by the stage."),
+                         ("rows_written", "shellcast_stage_rows_written", "Rows written to the database by the stage.")]
+        add_prom_metric("shellcast_stage_ran", "1 if the stage ran, 0 if it was skipped.",
+                        [("{stage=\"" + stage_info['stage'] + "\"}", stage_info['status'] in ("run", "failed")) for stage_info in stage_log])
+        for stage_key, metric_name, metric_help in stage_metrics:
+            metric_scale = 1e6 if (stage_key == "peak_rss_mb") else 1
+            add_prom_metric(metric_name, metric_help,
+                            [("{stage=\"" + stage_info['stage'] + "\"}", (stage_info[stage_key] * metric_scale) if (stage_info.get(stage_key) is not None) else None)
+                             for stage_info in stage_log])
+
+        # write to a temporary file first and then rename it so the collector never reads a partly written file
+        os.makedirs(os.path.dirname(os.path.abspath(prom_output_file)), exist_ok = True)
+        prom_output_file_temp = prom_output_file + ".tmp"
+        with open(prom_output_file_temp, "w") as write_obj:
+            write_obj.write("\n".join(prom_lines) + "\n")
+        os.replace(prom_output_file_temp, prom_output_file)
+
+    return run_record
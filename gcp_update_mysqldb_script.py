@@ -10,6 +10,9 @@ date created: 20200716
 
 # ---- notes ----
 notes:
+all reads and writes go through one pooled sqlalchemy engine (make_shellcast_db_engine.py) and one transaction,
+so if any step fails nothing is changed in the database
+set db_url to test against a local mysql or sqlite database instead of config.py (sqlite tables need to be made first)
 
 help:
 pymysql help: https://github.com/PyMySQL/PyMySQL
@@ -27,10 +30,7 @@ print("starting gcp mysql db update")
 # %% load libraries
 
 import pandas
-# import numpy
-import pymysql
-# from sqlalchemy import create_engine
-import sqlalchemy
+import sys # for importing custom functions
 from config import Config, DevConfig # see config.py file
 
 
@@ -58,12 +58,36 @@ lease_spatial_data_path = data_base_path + "spatial/outputs/ncdmf_data/lease_cen
 # lease data path
 lease_data_path = data_base_path + "tabular/outputs/ndfd_sco_data/lease_calcs/ndfd_lease_calcs.csv"
 
-# path to custom functions needed for this script
-functions_path = analysis_base_path + "functions/"
+
+# %% set database options here
+
+# sqlalchemy database url to use instead of config.py (e.g., "sqlite:///shellcast_test.db"), None uses config.py
+db_url = None
+
+# number of rows in each INSERT statement
+db_batch_size = 1000
+
+# use LOAD DATA LOCAL INFILE to append sga_min_max (and closure_probabilities when appending) (True or False, mysql only)
+db_bulk_load = False
+
+# how to write closure_probabilities ("append" to add every row every run, "upsert" for one row per lease and forecast date)
+# upsert needs a forecast_date column and a unique key on (lease_id, forecast_date) that the production table doesn't have yet,
+# keep "append" until the table is migrated and the web app reads by forecast_date (see upsert_closure_probabilities.py and the README)
+closure_prob_write_mode = "append"
+
+# when upserting, don't write leases with the same probabilities as their latest row (True or False)
+# unchanged leases then don't get a row for the forecast date, readers have to use each lease's latest row on or before the date
+closure_prob_skip_unchanged = False
 
 
 # %% load custom functions
-exec(open((functions_path + "make_lease_sql_query.py")).read())
+
+# custom functions are imported from the functions package in analysis_base_path (they import sqlalchemy and pymysql)
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
+
+from functions.make_shellcast_db_engine import make_shellcast_db_engine
+from functions.update_shellcast_db import update_shellcast_db
 
 
 # %% load in data
@@ -78,54 +102,30 @@ lease_spatial_data = pandas.read_csv(lease_spatial_data_path)
 lease_data = pandas.read_csv(lease_data_path)
 
 
-# %% create engine (for sqlalchemy - to upload whole dataframe to mysql db)
-
-# define engine variables
-# see config.py for these
-db_user = Config.DB_USER
-db_pass = Config.DB_PASS
-db_name = Config.DB_NAME
-cloud_sql_connection_name = Config.CLOUD_SQL_INSTANCE_NAME
-
-# create engine
-engine = sqlalchemy.create_engine(
-    # Equivalent URL:
-    sqlalchemy.engine.url.URL(
-        drivername = "mysql+pymysql",
-        username = db_user,
-        password = db_pass,
-        database = db_name,
-    ),
-)
-
-# engine
-
-
-# %% open connection (for pymysql - to upload row by row data to mysql db)
+# %% create engine and open connection
 
-# define connection
-# see config.py for these
-connection = pymysql.connect(host = DevConfig.HOST,
-                             user = Config.DB_USER,
-                             password = Config.DB_PASS,
-                             db = Config.DB_NAME,
-                             charset = 'utf8mb4',
-                             cursorclass = pymysql.cursors.DictCursor)
-# see rest of connection parameters: https://pymysql.readthedocs.io/en/latest/modules/connections.html?highlight=connect#pymysql.connections.Connection
+# one pooled engine for everything (see config.py for database variables)
+engine = make_shellcast_db_engine(Config, DevConfig, db_url = db_url, local_infile = db_bulk_load)
 
-# connection
+# one connection and one transaction for the whole update
+db_conn = engine.connect()
+db_trans = db_conn.begin()
 
 
-# %% update sga min and max table
+# %% update sga_min_max, ncdmf_leases, and closure_probabilities tables
 
 # sga_data = sga_data[1:5] # for testing
 
-# add df to mysql db
-sga_data.to_sql('sga_min_max', engine, if_exists = 'append', index = False)
+# update all three tables (see update_shellcast_db.py)
+db_update_info = update_shellcast_db(db_conn, sga_data, lease_spatial_data, lease_data,
+                                     batch_size = db_batch_size,
+                                     bulk_load = db_bulk_load,
+                                     closure_prob_write_mode = closure_prob_write_mode,
+                                     closure_prob_skip_unchanged = closure_prob_skip_unchanged)
 
-# print status
-print("added sga min and max data to mysql db")
-# print("did not add sga min and max data to mysql db")
+# to_sql can handle NaN to NULL conversion!
+# in most cases there should not be NULL values
+# but for testing some of the lease id's were made up
 
 # create cursor to print out status of update
 # sga_cursor = connection.cursor()
@@ -139,110 +139,14 @@ print("added sga min and max data to mysql db")
 #    print(i)
 
 
-# %% update ncdmf leases table (i.e., all possible leases from the ncdmf rest api)
-
-# only want to add leases that aren't already in the database
-# create a cursor to get current leases in db
-ncdmf_lease_cursor = connection.cursor()
-
-# define query
-ncdmf_leases_current_sql = "SELECT id, ncdmf_lease_id FROM ncdmf_leases"
-
-# execute query
-ncdmf_lease_cursor.execute(ncdmf_leases_current_sql)
-
-# save result
-ncdmf_leases_current_result = ncdmf_lease_cursor.fetchall()
-
-# if empty then give an error message and don't try to update
-if (len(ncdmf_leases_current_result) > 0):
-    # convert to pandas df
-    ncdmf_leases_current_df = pandas.DataFrame(ncdmf_leases_current_result)
-
-    # get ncdmf lease ids
-    ncdmf_leases_current_ids = ncdmf_leases_current_df['ncdmf_lease_id']
-
-    # anti-join to find new ncdmf leases from the ncdmf rest api
-    # (i.e., NOT in ncdmf_leases_current_ids and NOT in ncdmf_leases shellcast mysql table)
-    lease_spatial_data_sel = lease_spatial_data[~lease_spatial_data['ncdmf_lease_id'].isin(ncdmf_leases_current_ids)].reset_index(drop=True)
-
-    lease_spatial_data_sel = lease_spatial_data_sel[1:6] # add the first five for now
-
-    # if there are no new leases to add (from the ncdmf rest api) then skip inserting rows
-    if (len(lease_spatial_data_sel) > 0):
-
-        # get sql query
-        ncdmf_leases_insert_query = make_lease_sql_query(lease_spatial_data_sel)
-
-        # execute query
-        ncdmf_lease_cursor.execute(ncdmf_leases_insert_query)
-
-        # commit changes to remote db
-        connection.commit()
-
-        # print when finished
-        print("added ncdmf lease data to mysql db")
-
-    else:
-        # print when finished
-        print("there were no new ncdmf leases to add to mysql db")
-
-else:
-    # print that database is empty
-    print("the database is empty so leases cannot be added")
-    
-
-# %% update closure_probabilities table
-
-# create a cursor to get current leases in db
-user_leases_cursor = connection.cursor()
-
-# execute query
-user_leases_current_sql = "SELECT id, ncdmf_lease_id FROM user_leases"
-user_leases_cursor.execute(user_leases_current_sql)
-
-# save current lease result
-user_leases_current_result = user_leases_cursor.fetchall()
-
-# convert to curent lease result to pandas df
-user_leases_current_df = pandas.DataFrame(user_leases_current_result)
-
-# lease calcs df select only needed columns 
-lease_data_sel = lease_data.drop(columns = 'day').reset_index(drop=True)
-
-# rename to match current lease df
-lease_data_sel.columns = ['ncdmf_lease_id', 'prob_1d_perc', 'prob_2d_perc', 'prob_3d_perc']
-
-# set index of lease_data_sel
-lease_data_sel_fix = lease_data_sel.set_index('ncdmf_lease_id')
-
-# join lease_data_sel to user_leases_current_df
-leases_join_df = user_leases_current_df.set_index(
-        'ncdmf_lease_id').join(
-                lease_data_sel_fix, how = 'left', on = 'ncdmf_lease_id').set_index(
-                        'id').reset_index(drop = False)
-
-# finalize data to add to mysql db
-closure_prob_data = pandas.DataFrame({'lease_id' : leases_join_df['id'],
-                                     'prob_1d_perc' : leases_join_df['prob_1d_perc'],
-                                     'prob_2d_perc' : leases_join_df['prob_2d_perc'],
-                                     'prob_3d_perc' : leases_join_df['prob_3d_perc']})
-    
-# add df to mysql db
-closure_prob_data.to_sql('closure_probabilities', engine, if_exists = 'append', index = False)
-
-# print status
-print("added user lease data to mysql db")
-    
-# to_sql can handle NaN to NULL conversion!
-# in most cases there should not be NULL values
-# but for testing some of the lease id's were made up
-
+# %% commit changes, close connection, and dispose engine
 
-# %% dispose engine and close connection
+# commit changes to remote db (everything above at once)
+db_trans.commit()
+print("committed changes to mysql db")
 
+db_conn.close()
 engine.dispose()
-connection.close()
 
 # print status
 print("gcp connection and engine closed")
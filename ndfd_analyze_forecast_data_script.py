@@ -0,0 +1,228 @@
+# -*- coding: utf-8 -*-
+"""
+# ---- script header ----
+script name: ndfd_analyze_forecast_data_script.py
+purpose of script: This script takes the latest tidy National Digital Forecast Dataset (NDFD) data and calculates the probability of closure for each cmu, sga, and lease.
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+
+# ---- notes ----
+notes:
+python port of the area weighted cmu calcs, sga min and max calcs, and lease calcs in ndfd_analyze_forecast_data_script.R (sections 11 to 16)
+the grid cell coverage of each cmu doesn't change between runs so it's calculated once and saved in ndfd_cmu_weights_cache_path,
+each run is then one sparse matrix product per variable (all valid periods at once)
+leases are matched to cmus and grid cells by centroid (lease_centroids_db_wgs84.csv) and saved in ndfd_lease_index_cache_path, the lookup is only
+recalculated when the leases (or cmu bounds) change so lease calcs are a look up of the cmu calcs (the R script intersects lease bounds with cmu bounds every run)
+averaging is done on the native ndfd grid (not the albers rasters from ndfd_convert_df_to_raster_script.R) so values can differ a little from the R script
+the *_nc_albers.tif rasters (same names as ndfd_convert_df_to_raster_script.R) are written straight from the grids, without the csv to points to raster step,
+only set ndfd_export_rasters to True if something downstream (e.g., ndfd_analyze_forecast_data_script.R) still reads them
+
+
+"""
+
+# %% load libraries
+
+import pandas # for data mgmt
+import geopandas # for reading cmu bounds
+import os # for file mgmt
+import time # for timing
+import sys # for importing custom functions
+
+
+# %% set paths here
+
+# base path to analysis
+# analysis_base_path = "opt/analysis/" # set this and uncomment!
+analysis_base_path = "/Users/sheila/Documents/github_ncsu/shellcast/analysis/"
+
+# base path to data
+# data_base_path = "opt/shellcast/analysis/data/" # set this and uncomment!
+data_base_path = "/Users/sheila/Documents/github_ncsu/shellcast/analysis/data/"
+
+
+# %% use set paths
+
+# path to ndfd tabular inputs (outputs of ndfd_get_forecast_data_script.py)
+ndfd_tabular_data_input_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_raw/"
+
+# input format, same as tabular_output_format in ndfd_get_forecast_data_script.py ("csv" or "parquet", use "csv" for "both")
+ndfd_tabular_input_format = "csv"
+
+# path to sga bounds spatial inputs
+sga_spatial_data_input_path = data_base_path + "spatial/inputs/ncdmf_data/sga_bounds/"
+
+# path to cmu bounds spatial inputs
+cmu_spatial_data_input_path = data_base_path + "spatial/inputs/ncdmf_data/cmu_bounds/"
+
+# path to lease centroid inputs (outputs of ncdmf_tidy_lease_data_script.R)
+lease_spatial_data_input_path = data_base_path + "spatial/outputs/ncdmf_data/lease_centroids/"
+
+# path to rainfall threshold tabular inputs
+rainfall_thresh_tabular_data_input_path = data_base_path + "tabular/inputs/ncdmf_rainfall_thresholds/"
+
+# path to ndfd tabular outputs
+ndfd_tabular_data_output_path = data_base_path + "tabular/outputs/ndfd_sco_data/"
+
+# path to nc state bounds spatial inputs
+state_spatial_data_input_path = data_base_path + "spatial/inputs/state_bounds_data/"
+
+# path to ndfd spatial outputs
+ndfd_spatial_data_output_path = data_base_path + "spatial/outputs/ndfd_sco_data/"
+
+# export *_nc_albers.tif rasters (True or False, the python calcs below don't need them)
+ndfd_export_rasters = False
+
+# path to cmu weights cache
+ndfd_cmu_weights_cache_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_cmu_weights_cache/"
+
+# path to lease index cache
+ndfd_lease_index_cache_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_lease_index_cache/"
+
+
+# %% load custom functions
+
+# custom functions are imported from the functions package in analysis_base_path (raster functions are imported when exporting rasters)
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
+
+from functions.make_sco_ndfd_grid import make_sco_ndfd_grid
+from functions.get_sco_ndfd_cmu_weights import get_sco_ndfd_cmu_weights
+from functions.calc_sco_ndfd_cmu_means import calc_sco_ndfd_cmu_means
+from functions.calc_sco_ndfd_cmu_calcs import calc_sco_ndfd_cmu_calcs
+from functions.calc_sco_ndfd_sga_calcs import calc_sco_ndfd_sga_calcs
+from functions.get_sco_ndfd_lease_index import get_sco_ndfd_lease_index
+from functions.calc_sco_ndfd_lease_calcs import calc_sco_ndfd_lease_calcs
+
+
+# %% define projections
+
+# define proj4 string for ndfd data
+ndfd_proj4 = "+proj=lcc +lat_1=25 +lat_2=25 +lat_0=25 +lon_0=-95 +x_0=0 +y_0=0 +a=6371000 +b=6371000 +units=m +no_defs"
+# source: https://spatialreference.org/ref/sr-org/6825/
+
+# define proj4 for N. America Albers projection
+na_albers_proj4 = "+proj=aea +lat_1=20 +lat_2=60 +lat_0=40 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs"
+
+
+# %% load data
+
+# latest pop12 and qpf data
+if (ndfd_tabular_input_format == "parquet"):
+    # latest cycle in the partitioned parquet data
+    ndfd_pop12_partitions = sorted(os.listdir(ndfd_tabular_data_input_path + "parquet/ndfd_var=pop12/"))
+    ndfd_latest_partition = ndfd_pop12_partitions[-1]
+    ndfd_pop12_data = pandas.read_parquet(ndfd_tabular_data_input_path + "parquet/ndfd_var=pop12/" + ndfd_latest_partition)
+    ndfd_qpf_data = pandas.read_parquet(ndfd_tabular_data_input_path + "parquet/ndfd_var=qpf/" + ndfd_latest_partition)
+    ndfd_datetime_uct = ndfd_pop12_data['time_uct'].iloc[0]
+else:
+    ndfd_pop12_data = pandas.read_csv(ndfd_tabular_data_input_path + "pop12.csv")
+    ndfd_qpf_data = pandas.read_csv(ndfd_tabular_data_input_path + "qpf.csv")
+    ndfd_datetime_uct = pandas.to_datetime(ndfd_pop12_data['time_uct'].iloc[0], format = "%Y-%m-%d %H:%M").tz_localize(tz = "UTC")
+
+# cmu bounds
+cmu_bounds_albers = geopandas.read_file(cmu_spatial_data_input_path + "cmu_bounds_albers.shp")
+if (cmu_bounds_albers.crs is None):
+    cmu_bounds_albers = cmu_bounds_albers.set_crs(na_albers_proj4) # crs isn't always saved with the shapefile
+
+# full sga list
+sga_bounds_data = geopandas.read_file(sga_spatial_data_input_path + "sga_bounds_simple_albers.shp", ignore_geometry = True)
+
+# lease centroids
+lease_centroids_data = pandas.read_csv(lease_spatial_data_input_path + "lease_centroids_db_wgs84.csv")
+
+# rainfall thresholds (cmu to sga lookup)
+rainfall_thresh_data = pandas.read_csv(rainfall_thresh_tabular_data_input_path + "rainfall_thresholds.csv")
+
+
+# %% area weighted ndfd cmu calcs
+
+# record start time
+start_time = time.perf_counter()
+
+# make (valid period, y, x) grids
+ndfd_pop12_grid, ndfd_valid_period_hrs, ndfd_grid_coords = make_sco_ndfd_grid(ndfd_pop12_data, "pop12")
+ndfd_qpf_grid, ndfd_qpf_valid_period_hrs, ndfd_qpf_grid_coords = make_sco_ndfd_grid(ndfd_qpf_data, "qpf")
+
+# grid cell coverage of each cmu (calculated once and then read from the cache)
+cmu_weights = get_sco_ndfd_cmu_weights(cmu_bounds_albers, ndfd_grid_coords, ndfd_proj4, cmu_id_col = "HA_CLASS", cache_path = ndfd_cmu_weights_cache_path)
+
+# area weighted means for each cmu and valid period
+cmu_pop12_means = calc_sco_ndfd_cmu_means(cmu_weights, ndfd_pop12_grid)
+cmu_qpf_means = calc_sco_ndfd_cmu_means(cmu_weights, ndfd_qpf_grid) / 25.4 # convert kg/m2 (mm) to inches
+
+# probability of closure for each cmu and valid period
+ndfd_cmu_calcs_data = calc_sco_ndfd_cmu_calcs(cmu_names = cmu_weights['cmu_names'],
+                                              cmu_rain_in = cmu_bounds_albers['rain_in'].to_numpy(), # weights have one row per cmu in cmu_bounds_albers order
+                                              valid_period_hrs = ndfd_valid_period_hrs,
+                                              cmu_pop12_perc = cmu_pop12_means,
+                                              cmu_qpf_in = cmu_qpf_means,
+                                              datetime_uct_str = ndfd_datetime_uct.strftime("%Y-%m-%d"))
+
+# print status
+print("spatial averaging complete (" + str(round(time.perf_counter() - start_time, 3)) + " s)")
+
+
+# %% export ndfd rasters
+
+if ndfd_export_rasters:
+    # rasterio is only needed here
+    from functions.make_sco_ndfd_raster import make_sco_ndfd_raster
+    from functions.write_sco_ndfd_raster import write_sco_ndfd_raster
+
+    # record start time
+    start_time = time.perf_counter()
+
+    # nc bounds with 10 km buffer for cropping
+    nc_buffer_bounds = geopandas.read_file(state_spatial_data_input_path + "nc_bounds_10kmbuf_albers.shp").total_bounds
+
+    # north up rasters (qpf in inches like ndfd_convert_df_to_raster_script.R)
+    ndfd_pop12_raster, ndfd_transform = make_sco_ndfd_raster(ndfd_pop12_grid, ndfd_grid_coords)
+    ndfd_qpf_raster, ndfd_qpf_transform = make_sco_ndfd_raster(ndfd_qpf_grid / 25.4, ndfd_qpf_grid_coords)
+
+    # one raster per variable and valid period (e.g., pop12_24hr_nc_albers.tif)
+    os.makedirs(ndfd_spatial_data_output_path, exist_ok = True)
+    for i, valid_period_hr in enumerate(ndfd_valid_period_hrs):
+        write_sco_ndfd_raster(ndfd_pop12_raster[i], ndfd_transform, ndfd_proj4, ndfd_spatial_data_output_path + "pop12_" + str(valid_period_hr) + "hr_nc_albers.tif",
+                              dst_proj4 = na_albers_proj4, dst_bounds = nc_buffer_bounds)
+    for i, valid_period_hr in enumerate(ndfd_qpf_valid_period_hrs):
+        write_sco_ndfd_raster(ndfd_qpf_raster[i], ndfd_qpf_transform, ndfd_proj4, ndfd_spatial_data_output_path + "qpf_" + str(valid_period_hr) + "hr_nc_albers.tif",
+                              dst_proj4 = na_albers_proj4, dst_bounds = nc_buffer_bounds)
+
+    # print status
+    print("exported ndfd rasters (" + str(round(time.perf_counter() - start_time, 3)) + " s)")
+
+
+# %% export area weighted ndfd cmu calcs
+
+os.makedirs(ndfd_tabular_data_output_path + "cmu_calcs/", exist_ok = True)
+ndfd_cmu_calcs_data.to_csv(ndfd_tabular_data_output_path + "cmu_calcs/ndfd_cmu_calcs.csv", index = False)
+
+
+# %% min and max ndfd sga calcs
+
+ndfd_sga_calcs_data = calc_sco_ndfd_sga_calcs(ndfd_cmu_calcs_data, rainfall_thresh_data[['HA_CLASS', 'grow_area']], sga_bounds_data['grow_area'])
+
+
+# %% export min and max ndfd sga calcs
+
+os.makedirs(ndfd_tabular_data_output_path + "sga_calcs/", exist_ok = True)
+ndfd_sga_calcs_data.to_csv(ndfd_tabular_data_output_path + "sga_calcs/ndfd_sga_calcs.csv", index = False)
+
+
+# %% ndfd lease calcs
+
+# cmu(s) and grid cell of each lease (calculated once for each set of leases and then read from the cache)
+lease_index = get_sco_ndfd_lease_index(lease_centroids_data, cmu_bounds_albers, ndfd_grid_coords, ndfd_proj4, cmu_id_col = "HA_CLASS", cache_path = ndfd_lease_index_cache_path)
+
+# look up cmu probability of closure for each lease
+ndfd_lease_calcs_data = calc_sco_ndfd_lease_calcs(lease_index, ndfd_cmu_calcs_data)
+
+
+# %% export ndfd lease calcs
+
+os.makedirs(ndfd_tabular_data_output_path + "lease_calcs/", exist_ok = True)
+ndfd_lease_calcs_data.to_csv(ndfd_tabular_data_output_path + "lease_calcs/ndfd_lease_calcs.csv", index = False)
+
+print("finished analyzing forecast data")
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+"""
+# ---- script header ----
+script name: ndfd_backfill_forecast_data_script.py
+purpose of script: This script grabs past National Digital Forecast Dataset (NDFD) data from the NC State Climate Office (SCO) TDS server for a range of dates, reformats it, and stores it in a local directory.
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+
+# ---- notes ----
+notes:
+replaces old_scripts/ndfd_get_past_data_script.py, this uses the same functions as ndfd_get_forecast_data_script.py
+each 00Z and 12Z cycle is saved as qpf_YYYYMMDDHH.csv and pop12_YYYYMMDDHH.csv
+if the script is stopped it can be rerun, cycles already in the run ledger (shellcast_ledger.db, stage "backfill") as available or not_available are skipped
+and failed cycles are tried again, an old backfill_log.csv is imported to the ledger the first time
+
+help:
+pydap help: https://pydap.readthedocs.io/en/latest/developer_data_model.html
+to see the nc sco catalog website: https://tds.climate.ncsu.edu/thredds/catalog/nws/ndfd/catalog.html
+
+
+"""
+
+# %% load libraries
+
+import pandas # for data mgmt
+import sys # for importing custom functions
+
+
+# %% set paths here
+
+# base path to analysis
+# analysis_base_path = "opt/analysis/" # set this and uncomment!
+analysis_base_path = "/Users/sheila/Documents/github_ncsu/shellcast/analysis/"
+
+# base path to data
+# data_base_path = "opt/shellcast/analysis/data/" # set this and uncomment!
+data_base_path = "/Users/sheila/Documents/github_ncsu/shellcast/analysis/data/"
+
+# %% use set paths
+
+# path to ndfd tabular backfill outputs
+backfill_output_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_backfill/"
+
+# path to partitioned ndfd tabular outputs (tidied from the cache with all cpus)
+batch_output_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_batch/"
+
+# path to local cache of fetched ndfd data (set to None to always fetch from the server)
+ndfd_cache_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_cache/"
+
+# path to run ledger (status of each cycle, shared with ndfd_get_forecast_data_script.py and shellcast_daily_analysis.py)
+ledger_file = data_base_path + "tabular/outputs/ndfd_sco_data/shellcast_ledger.db"
+
+
+# %% load custom functions
+
+# custom functions are imported from the functions package in analysis_base_path (pydap is only imported if a cycle isn't cached)
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
+
+from functions.backfill_sco_ndfd_data import backfill_sco_ndfd_data
+from functions.tidy_sco_ndfd_data_batch import tidy_sco_ndfd_data_batch
+
+
+# %% set backfill options
+
+# define serve path
+ndfd_sco_server_url = 'https://tds.climate.ncsu.edu/thredds/dodsC/nws/ndfd/'
+
+# sco ndfd variables to request (qpf and pop12)
+ndfd_var_names = ["Total_precipitation_surface_6_Hour_Accumulation", "Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254"]
+
+# bounding box to request in the ndfd grid projection and units [xmin, ymin, xmax, ymax] (lambert conformal conic, km)
+# see ndfd_get_forecast_data_script.py, None requests the full midatlantic grid
+ndfd_bbox_km = None
+
+# first and last cycle to backfill (in uct)
+backfill_start_uct_str = "2019-01-01 00:00"
+backfill_end_uct_str = "2020-12-31 12:00"
+
+# be nice to the sco server, keep these small
+backfill_max_workers = 4
+backfill_max_host_connections = 4
+
+# retidy all cached cycles into batch_output_path (e.g., after changing valid periods), this doesn't use the server
+batch_retidy = False
+batch_max_workers = None # None uses all cpus
+batch_output_format = "parquet" # "csv", "parquet", or "both"
+batch_compact = True # smaller dataframes in each process, parquet files are the same either way
+
+
+# %% backfill data
+
+# the retidy processes import this script again, so only run it from the main process
+if (__name__ == "__main__"):
+    # list every 00Z and 12Z cycle between start and end
+    backfill_datetime_uct_str_list = list(pandas.date_range(start = backfill_start_uct_str, end = backfill_end_uct_str, freq = "12h").strftime("%Y-%m-%d %H:%M"))
+
+    # fetch, tidy, and export
+    backfill_status_pd = backfill_sco_ndfd_data(base_server_url = ndfd_sco_server_url,
+                                                datetime_uct_str_list = backfill_datetime_uct_str_list,
+                                                output_path = backfill_output_path,
+                                                ledger_file = ledger_file,
+                                                csv_log_file = backfill_output_path + "backfill_log.csv",
+                                                ndfd_var_names = ndfd_var_names,
+                                                ndfd_bbox_km = ndfd_bbox_km,
+                                                ndfd_cache_path = ndfd_cache_path,
+                                                max_workers = backfill_max_workers,
+                                                max_host_connections = backfill_max_host_connections)
+
+    # print status
+    print(backfill_status_pd['status'].value_counts())
+    print("finished backfill")
+
+
+# %% retidy cached data
+
+if batch_retidy and (__name__ == "__main__"):
+    batch_status_pd = tidy_sco_ndfd_data_batch(datetime_uct_str_list = backfill_datetime_uct_str_list,
+                                               ndfd_var_list = ["qpf", "pop12"],
+                                               ndfd_cache_path = ndfd_cache_path,
+                                               output_path = batch_output_path,
+                                               max_workers = batch_max_workers,
+                                               output_format = batch_output_format,
+                                               compact = batch_compact)
+
+    # print status
+    print(batch_status_pd['status'].value_counts())
+    print("finished retidy")
@@ -29,11 +29,7 @@ to see the nc sco catalog website: https://tds.climate.ncsu.edu/thredds/catalog/
 # %% load libraries
 
 import pandas # for data mgmt
-import numpy # for data mgmt
-import datetime as dt # for datetime mgmt
-from pydap.client import open_url # to convert bin file
-import requests # to check if website exists
-from csv import writer
+import sys # for importing custom functions
 
 
 # %% set paths here
@@ -53,66 +49,82 @@ data_base_path = "/Users/sheila/Documents/github_ncsu/shellcast/analysis/data/"
 # path to ndfd tabular outputs
 tabular_output_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_raw/"
 
-# path to custom functions needed for this script
-functions_path = analysis_base_path + "functions/"
+# output format for qpf and pop12 tables, "csv" (qpf.csv and pop12.csv, read by the R scripts), "parquet" (typed and partitioned by variable and cycle), or "both"
+tabular_output_format = "csv"
+
+# path to local cache of fetched ndfd data (set to None to always fetch from the server)
+ndfd_cache_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_cache/"
+
+# path to run ledger (status of each cycle, replaces data_log.csv, which is imported the first time)
+ledger_file = data_base_path + "tabular/outputs/ndfd_sco_data/shellcast_ledger.db"
 
 
 # %% load custom functions
 
-exec(open((functions_path + "convert_sco_ndfd_datetime_str.py")).read())
-exec(open((functions_path + "get_sco_ndfd_data.py")).read())
-exec(open((functions_path + "aggregate_sco_ndfd_var_data.py")).read())
-exec(open((functions_path + "tidy_sco_ndfd_data.py")).read())
-exec(open((functions_path + "append_list_as_row.py")).read())
+# custom functions are imported from the functions package in analysis_base_path (pydap is only imported if a cycle isn't cached)
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
+
+from functions.wait_for_sco_ndfd_cycle import wait_for_sco_ndfd_cycle
+from functions.get_sco_ndfd_cycle_data import get_sco_ndfd_cycle_data
+from functions.tidy_sco_ndfd_data import tidy_sco_ndfd_data
+from functions.export_sco_ndfd_data import export_sco_ndfd_data
+from functions.make_shellcast_ledger import make_shellcast_ledger
+from functions.write_shellcast_ledger import write_shellcast_ledger
 
 
 # %% get data and export
 
-# this needs to run every day at 7am!
+# this needs to run every day at 6am ET (it waits for the forecast to be posted)!
 
 # define serve path
 ndfd_sco_server_url = 'https://tds.climate.ncsu.edu/thredds/dodsC/nws/ndfd/'
 # this is the server path for historic ndfd forecasts
 # to see the catalog website: https://tds.climate.ncsu.edu/thredds/catalog/nws/ndfd/catalog.html
 
-# keep track of available dates
-data_available_pd = pandas.DataFrame(columns = ['datetime_uct_str', 'status'])
+# sco ndfd variables to request (qpf and pop12)
+ndfd_var_names = ["Total_precipitation_surface_6_Hour_Accumulation", "Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254"]
+
+# bounding box to request in the ndfd grid projection and units [xmin, ymin, xmax, ymax] (lambert conformal conic, km)
+# set this to the sga buffer extent to only pull the part of the grid that's used downstream, for example in R:
+# st_bbox(st_transform(sga_buffer_albers, ndfd_proj4)) / 1000
+# None requests the full midatlantic grid
+ndfd_bbox_km = None
+
+# maximum size of the local cache in megabytes (least recently used cycles are removed first)
+ndfd_cache_max_mb = 2000
+
+# time of day (America/New_York) to stop waiting for the latest forecast cycle to be posted, then the newest earlier cycle is used (None checks once)
+ndfd_cycle_wait_nyc_str = "06:45"
 
-# hardcode current day at 7am UCT for now
-today = dt.date.today()
-today_str = today.strftime("%Y%m%d") + "07"
-today_uct = pandas.to_datetime(dt.datetime.strptime(today_str, "%Y%m%d%H"))
-datetime_now_uct = today_uct.tz_localize(tz = "UCT")
+# keep track of available dates (the run ledger replaces data_log.csv, which is imported the first time)
+ledger_conn = make_shellcast_ledger(ledger_file, csv_log_files = {'tidy': tabular_output_path + "data_log.csv"})
+
+# current time
+datetime_now_uct = pandas.Timestamp.now(tz = "UTC")
 
 # hardcode exact time
 # datetime_now_nyc = pandas.to_datetime("2020-07-01 07:00", format = "%Y-%m-%d %H:%M").tz_localize(tz = "America/New_York") # force midnight uct grab at 8am et
 # datetime_now_uct = datetime_now_nyc.tz_convert(tz = "UCT") # convert to uct
 
-# to run in real-time
-# datetime_now_nyc = pandas.to_datetime(dt.datetime.now(), format = "%Y-%m-%d %H:%M").tz_localize(tz = "America/New_York") # this is local time (ET) but server is in UCT
-# datetime_now_uct = datetime_now_nyc.tz_convert(tz = "UCT") # convert to uct
-
 # datetime_now_uct_str_full = datetime_now_uct.strftime("%Y-%m-%d %H:%M")
 # datetime_now_uct_str_short = datetime_now_uct.strftime("%Y-%m-%d")
 # datetime_now_uct
 
 #
 
-# round up to nearest hour in uct
-datetime_now_uct_td = dt.timedelta(hours = datetime_now_uct.hour, minutes = datetime_now_uct.minute, seconds=datetime_now_uct.second, microseconds = datetime_now_uct.microsecond)
-to_hour = dt.timedelta(hours=round(datetime_now_uct_td.total_seconds()/3600))
-datetime_now_round_uct = pandas.to_datetime((dt.datetime.combine(datetime_now_uct, dt.time(0)) + to_hour), format = "%Y-%m-%d %H:%M").tz_localize(tz = "UCT")
+# forecast cycle to use, the latest cycle (midnight or noon uct) as soon as it's posted on the server (checks the small .dds file with backoff)
+ndfd_cycle_wait_secs = 0
+if (ndfd_cycle_wait_nyc_str is not None):
+    ndfd_cycle_wait_nyc = pandas.Timestamp(datetime_now_uct.tz_convert(tz = "America/New_York").strftime("%Y-%m-%d") + " " + ndfd_cycle_wait_nyc_str).tz_localize(tz = "America/New_York")
+    ndfd_cycle_wait_secs = max(0, (ndfd_cycle_wait_nyc - datetime_now_uct).total_seconds())
+temp_cycle_info = wait_for_sco_ndfd_cycle(ndfd_sco_server_url, datetime_now_uct = datetime_now_uct, ndfd_var_names = ndfd_var_names, timeout_secs = ndfd_cycle_wait_secs)
 
-# calc other bounds
-datetime_midnighttoday_uct = pandas.to_datetime((datetime_now_round_uct.strftime("%Y-%m-%d") + " 00:00")).tz_localize("UCT")
-datetime_noontoday_uct = pandas.to_datetime((datetime_now_round_uct.strftime("%Y-%m-%d") + " 12:00")).tz_localize("UCT")
-datetime_midnightnextd_uct = datetime_midnighttoday_uct + pandas.DateOffset(days = 1)
+# if no cycle is posted, try the latest cycle anyway (it's saved as not_available)
+temp_datetime_uct_str = temp_cycle_info['datetime_uct_str'] if (temp_cycle_info['datetime_uct_str'] is not None) else temp_cycle_info['latest_datetime_uct_str']
 
-# determine datetime string to use for query using bounds
-if (datetime_now_round_uct >= datetime_midnighttoday_uct) & (datetime_now_round_uct < datetime_noontoday_uct): # between midnight and noon
-    temp_datetime_uct_str = datetime_midnighttoday_uct.strftime("%Y-%m-%d %H:%M")
-elif (datetime_now_round_uct >= datetime_noontoday_uct) & (datetime_now_round_uct < datetime_midnightnextd_uct): # between noon and midnight
-    temp_datetime_uct_str = datetime_noontoday_uct.strftime("%Y-%m-%d %H:%M")
+# print status
+print("using " + temp_datetime_uct_str + " forecast (latest: " + str(temp_cycle_info['latest']) + ", waited " + str(round(temp_cycle_info['wait_secs'], 1)) + " s)")
 
 # temp_datetime_uct_str
 # temp_datetime_uct_str = '2020-08-03 00:00' # use this to test large closure probabilities
@@ -121,68 +133,56 @@ elif (datetime_now_round_uct >= datetime_noontoday_uct) & (datetime_now_round_uc
 
 # get data
 
-temp_data = get_sco_ndfd_data(base_server_url = ndfd_sco_server_url, datetime_uct_str = temp_datetime_uct_str)
+# check local cache first and only open the server dataset if the cycle isn't cached
+temp_cycle_data = get_sco_ndfd_cycle_data(base_server_url = ndfd_sco_server_url, datetime_uct_str = temp_datetime_uct_str, ndfd_var_names = ndfd_var_names,
+                                          ndfd_cache_path = ndfd_cache_path, ndfd_bbox_km = ndfd_bbox_km, ndfd_cache_max_mb = ndfd_cache_max_mb)
+temp_data, temp_coords, temp_subset_index, temp_cached = (temp_cycle_data['ndfd_data'], temp_cycle_data['ndfd_coords'], temp_cycle_data['ndfd_subset_index'], temp_cycle_data['cached'])
 
 # only append data when it exists
-if (len(temp_data) > 0):
+if (temp_cached or (temp_data is not None)):
     # tidy qpf and pop12 data
-    temp_qpf_data_pd, temp_qpf_datetime_ymdh_str = tidy_sco_ndfd_data(ndfd_data = temp_data, datetime_uct_str = temp_datetime_uct_str, ndfd_var = "qpf")
-    temp_pop12_data_pd, temp_pop12_datetime_ymdh_str = tidy_sco_ndfd_data(ndfd_data = temp_data, datetime_uct_str = temp_datetime_uct_str, ndfd_var = "pop12")
+    temp_qpf_data_pd, temp_qpf_datetime_ymdh_str = tidy_sco_ndfd_data(ndfd_data = temp_data, datetime_uct_str = temp_datetime_uct_str, ndfd_var = "qpf", ndfd_coords = temp_coords, ndfd_subset_index = temp_subset_index, ndfd_cache_path = ndfd_cache_path, ndfd_cache_max_mb = ndfd_cache_max_mb)
+    temp_pop12_data_pd, temp_pop12_datetime_ymdh_str = tidy_sco_ndfd_data(ndfd_data = temp_data, datetime_uct_str = temp_datetime_uct_str, ndfd_var = "pop12", ndfd_coords = temp_coords, ndfd_subset_index = temp_subset_index, ndfd_cache_path = ndfd_cache_path, ndfd_cache_max_mb = ndfd_cache_max_mb)
 
     # check if desired times were available, only keep when we have both
     if ((len(temp_qpf_data_pd) > 0) and (len(temp_pop12_data_pd) > 0)):
 
-        # define export path
+        # export results (qpf.csv and pop12.csv and/or parquet/ndfd_var=<var>/datetime_ymdh=<YYYYMMDDHH>/part-0.parquet)
         # temp_qpf_data_path = tabular_output_path + "qpf_" + temp_qpf_datetime_ymdh_str +  ".csv" # includes date in file name
         # temp_pop12_data_path = tabular_output_path + "pop12_" + temp_pop12_datetime_ymdh_str + ".csv" # includes date in file name
-        temp_qpf_data_path = tabular_output_path + "qpf.csv"
-        temp_pop12_data_path = tabular_output_path + "pop12.csv"
-
-
-        # export results
-        temp_qpf_data_pd.to_csv(temp_qpf_data_path, index = False)
-        temp_pop12_data_pd.to_csv(temp_pop12_data_path, index = False)
+        temp_qpf_output_files = export_sco_ndfd_data(temp_qpf_data_pd, tabular_output_path, "qpf", temp_qpf_datetime_ymdh_str, output_format = tabular_output_format)
+        temp_pop12_output_files = export_sco_ndfd_data(temp_pop12_data_pd, tabular_output_path, "pop12", temp_pop12_datetime_ymdh_str, output_format = tabular_output_format)
 
         # keep track of available data
-        # temp_data_available_pd = pandas.DataFrame({'datetime_uct_str':[temp_datetime_uct_str], 'status':["available"]})
-        # data_available_pd = data_available_pd.append(temp_data_available_pd, ignore_index = True)
-        temp_data_log = [temp_datetime_uct_str, "available"]
+        temp_ledger_rows = [{'stage': "tidy", 'datetime_uct_str': temp_datetime_uct_str, 'status': "available", 'output_path': tabular_output_path},
+                            {'stage': "tidy", 'ndfd_var': "qpf", 'datetime_uct_str': temp_datetime_uct_str, 'status': "available", 'output_path': ";".join(temp_qpf_output_files)},
+                            {'stage': "tidy", 'ndfd_var': "pop12", 'datetime_uct_str': temp_datetime_uct_str, 'status': "available", 'output_path': ";".join(temp_pop12_output_files)}]
 
-        # export data availability (i.e., append new row to data_log.csv)
-        # data_availability_path = tabular_output_path + "data_available_" + temp_datetime_ymdh_str +  ".csv"
-        # data_available_pd.to_csv(data_availability_path, index = False)
-        data_log_path = tabular_output_path + "data_log.csv"
-        append_list_as_row(data_log_path, temp_data_log)
+        # export data availability (i.e., add rows to the ledger)
+        write_shellcast_ledger(ledger_conn, temp_ledger_rows)
 
         # print status
         print("exported " + temp_datetime_uct_str + " data")
 
     else:
         # keep track of available data
-        # temp_data_available_pd = pandas.DataFrame({'datetime_uct_str':[temp_datetime_uct_str], 'status':["not_available"]})
-        # data_available_pd = data_available_pd.append(temp_data_available_pd, ignore_index = True)
-        temp_data_log = [temp_datetime_uct_str, "not_available"]
+        temp_ledger_rows = [{'stage': "tidy", 'datetime_uct_str': temp_datetime_uct_str, 'status': "not_available"}]
 
-        # export data availability (i.e., append new row to data_log.csv)
-        # data_availability_path = tabular_output_path + "data_available_" + temp_datetime_ymdh_str +  ".csv"
-        # data_available_pd.to_csv(data_availability_path, index = False)
-        data_log_path = tabular_output_path + "data_log.csv"
-        append_list_as_row(data_log_path, temp_data_log)
+        # export data availability (i.e., add row to the ledger)
+        write_shellcast_ledger(ledger_conn, temp_ledger_rows)
 
         # print status
         print("did not append " + temp_datetime_uct_str + " data")
 
 else:
     # keep track of available data
-    # temp_data_available_pd = pandas.DataFrame({'datetime_uct_str':[temp_datetime_uct_str], 'status':["not_available"]})
-    # data_available_pd = data_available_pd.append(temp_data_available_pd, ignore_index = True)
-    temp_data_log = [temp_datetime_uct_str, "not_available"]
+    temp_ledger_rows = [{'stage': "tidy", 'datetime_uct_str': temp_datetime_uct_str, 'status': "not_available"}]
 
-    # export data availability (i.e., append new row to data_log.csv)
-    # data_availability_path = tabular_output_path + "data_available_" + temp_datetime_ymdh_str +  ".csv"
-    # data_available_pd.to_csv(data_availability_path, index = False)
-    data_log_path = tabular_output_path + "data_log.csv"
-    append_list_as_row(data_log_path, temp_data_log)
+    # export data availability (i.e., add row to the ledger)
+    write_shellcast_ledger(ledger_conn, temp_ledger_rows)
 
     # print status
     print("did not append " + temp_datetime_uct_str + " data")
+
+# close ledger
+ledger_conn.close()
@@ -0,0 +1,434 @@
+# -*- coding: utf-8 -*-
+"""
+# ---- script header ----
+script name: shellcast_daily_analysis.py
+purpose of script: This script runs the daily ShellCast analysis (fetch, tidy, grid, zonal stats, and database update) in one python process.
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+
+# ---- notes ----
+notes:
+this replaces the four scripts in shellcast_daily_analysis.sh (ndfd_get_forecast_data_script.py, ndfd_convert_df_to_raster_script.R,
+ndfd_analyze_forecast_data_script.R, and gcp_update_mysqldb_script.py), data are passed between stages in memory
+and each stage still writes the same outputs as the script it replaces (except the albers rasters, which aren't needed)
+
+stages:
+0. discover - wait for the latest forecast cycle (00 or 12 uct) to be posted on the sco server (until ndfd_cycle_wait_nyc_str, then the newest earlier cycle is used)
+1. fetch - open the latest forecast cycle from the local cache or the sco server
+2. tidy - tidy qpf and pop12 (writes qpf.csv and pop12.csv and/or parquet, see tabular_output_format)
+3. grid - make (valid period, y, x) grids
+4. zonal - cmu, sga, and lease calcs (writes ndfd_cmu_calcs.csv, ndfd_sga_calcs.csv, and ndfd_lease_calcs.csv)
+5. db - start the cloud sql proxy (if db_proxy_cmd is set), wait for it, and update the mysql db in one transaction (writes db_update_log.csv)
+
+stages with outputs that are newer than their inputs are skipped (set skip_fresh_stages to False to rerun everything),
+set resume_stage to start from a later stage (earlier outputs are read from their files)
+
+each stage that runs is measured (wall time, cpu time, peak memory, bytes fetched, rows made, and rows written to the db) and a json record of the run
+is saved to run_metrics_output_path with a prometheus textfile (run_metrics_prom_file) for alerting on failed or late runs (see run_deadline_nyc_str),
+they're also written when a stage fails, forecast data are downloaded in the tidy stage (the fetch stage only opens the dataset) and aggregate is part of tidy
+
+to run:
+python shellcast_daily_analysis.py
+
+"""
+
+# %% load libraries
+
+import pandas # for data mgmt
+import os # for file mgmt
+import subprocess # for the cloud sql proxy
+import signal # for stopping the cloud sql proxy
+import atexit # for writing run metrics when a stage fails
+import sys # for importing custom functions
+
+
+# %% set paths here
+
+# base path to analysis
+# analysis_base_path = "opt/analysis/" # set this and uncomment!
+analysis_base_path = "/Users/sheila/Documents/github_ncsu/shellcast/analysis/"
+
+# base path to data
+# data_base_path = "opt/shellcast/analysis/data/" # set this and uncomment!
+data_base_path = "/Users/sheila/Documents/github_ncsu/shellcast/analysis/data/"
+
+
+# %% use set paths
+
+# path to ndfd tabular outputs
+tabular_output_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_raw/"
+
+# path to local cache of fetched ndfd data (set to None to always fetch from the server)
+ndfd_cache_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_sco_data_cache/"
+
+# path to cmu bounds spatial inputs
+cmu_spatial_data_input_path = data_base_path + "spatial/inputs/ncdmf_data/cmu_bounds/"
+
+# path to sga bounds spatial inputs
+sga_spatial_data_input_path = data_base_path + "spatial/inputs/ncdmf_data/sga_bounds/"
+
+# path to lease centroid inputs (outputs of ncdmf_tidy_lease_data_script.R)
+lease_spatial_data_input_path = data_base_path + "spatial/outputs/ncdmf_data/lease_centroids/"
+
+# path to rainfall threshold tabular inputs
+rainfall_thresh_tabular_data_input_path = data_base_path + "tabular/inputs/ncdmf_rainfall_thresholds/"
+
+# path to ndfd calcs outputs
+ndfd_tabular_data_output_path = data_base_path + "tabular/outputs/ndfd_sco_data/"
+
+# path to cmu weights and lease index caches
+ndfd_cmu_weights_cache_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_cmu_weights_cache/"
+ndfd_lease_index_cache_path = data_base_path + "tabular/outputs/ndfd_sco_data/ndfd_lease_index_cache/"
+
+# path to run metrics (a json record for each run) and the prometheus textfile for the node exporter textfile collector (set to None to not write it)
+run_metrics_output_path = data_base_path + "tabular/outputs/run_metrics/"
+run_metrics_prom_file = run_metrics_output_path + "shellcast_daily_analysis.prom"
+
+# path to run ledger (status of each cycle and stage, replaces data_log.csv, which is imported the first time)
+ledger_file = data_base_path + "tabular/outputs/ndfd_sco_data/shellcast_ledger.db"
+
+
+# %% set run options here
+
+# stage to start from ("fetch", "tidy", "grid", "zonal", or "db"), None starts from the beginning
+resume_stage = None
+
+# skip stages with outputs that are newer than their inputs (True or False)
+skip_fresh_stages = True
+
+# time of day (America/New_York) the run should be done by, None for no deadline (the cron job starts at 6 am)
+run_deadline_nyc_str = "07:00"
+
+# time of day (America/New_York) to stop waiting for the latest forecast cycle to be posted, then the newest earlier cycle is used (None checks once)
+ndfd_cycle_wait_nyc_str = "06:45"
+
+# output format for qpf and pop12 tables ("csv", "parquet", or "both"), see ndfd_get_forecast_data_script.py
+tabular_output_format = "csv"
+
+# sco server and variables (qpf and pop12)
+ndfd_sco_server_url = 'https://tds.climate.ncsu.edu/thredds/dodsC/nws/ndfd/'
+ndfd_var_names = ["Total_precipitation_surface_6_Hour_Accumulation", "Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254"]
+
+# bounding box to request in the ndfd grid projection and units [xmin, ymin, xmax, ymax] (lambert conformal conic, km), None requests the full grid
+ndfd_bbox_km = None
+
+# maximum size of the local cache in megabytes
+ndfd_cache_max_mb = 2000
+
+# cloud sql proxy command (None if it's already running or db_url is set) and port
+db_proxy_cmd = ["/Users/sheila/cloud_sql_proxy", "-instances=ncsu-shellcast:us-east1:ncsu-shellcast-database=tcp:3306"]
+db_proxy_port = 3306
+db_proxy_timeout_secs = 60
+
+# database options, see gcp_update_mysqldb_script.py
+db_url = None
+db_batch_size = 1000
+db_bulk_load = False
+closure_prob_write_mode = "append" # "upsert" needs the closure_probabilities migration first
+closure_prob_skip_unchanged = False
+
+
+# %% load custom functions
+
+# custom functions are imported from the functions package in analysis_base_path, the ones that need pydap, geopandas, or sqlalchemy
+# are imported in the stage that uses them so skipped stages don't pay for those imports
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
+
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+from functions.get_sco_ndfd_cycle_str import get_sco_ndfd_cycle_str
+from functions.check_shellcast_stage import check_shellcast_stage
+from functions.measure_shellcast_stage import measure_shellcast_stage
+from functions.write_shellcast_run_metrics import write_shellcast_run_metrics
+from functions.make_shellcast_ledger import make_shellcast_ledger
+from functions.write_shellcast_ledger import write_shellcast_ledger
+from functions.get_shellcast_ledger_latest import get_shellcast_ledger_latest
+from functions.wait_for_sco_ndfd_cycle import wait_for_sco_ndfd_cycle
+
+
+# %% define projections and stages
+
+# define proj4 string for ndfd data
+ndfd_proj4 = "+proj=lcc +lat_1=25 +lat_2=25 +lat_0=25 +lon_0=-95 +x_0=0 +y_0=0 +a=6371000 +b=6371000 +units=m +no_defs"
+
+# define proj4 for N. America Albers projection
+na_albers_proj4 = "+proj=aea +lat_1=20 +lat_2=60 +lat_0=40 +lon_0=-96 +x_0=0 +y_0=0 +datum=NAD83 +units=m +no_defs"
+
+# stages in run order
+stage_names = ["fetch", "tidy", "grid", "zonal", "db"]
+
+# stage records (status, times, memory, bytes, and rows) from measure_shellcast_stage()
+stage_log = []
+
+# run start (before waiting for the forecast)
+run_start = pandas.Timestamp.now(tz = "UTC")
+
+# run ledger
+ledger_conn = make_shellcast_ledger(ledger_file, csv_log_files = {'tidy': tabular_output_path + "data_log.csv"})
+
+# forecast cycle to use, the latest cycle (midnight or noon uct) as soon as it's posted on the server (checks the small .dds file with backoff),
+# there's no wait when the latest cycle is already tidied or the run resumes after tidy (then the latest tidied cycle is used)
+latest_datetime_uct_str = get_sco_ndfd_cycle_str(run_start, round_hour = False)
+tidy_datetime_uct_str = get_shellcast_ledger_latest(ledger_conn, "tidy")
+if (resume_stage is not None) and (stage_names.index(resume_stage) > stage_names.index("tidy")) and (tidy_datetime_uct_str is not None):
+    ndfd_datetime_uct_str = tidy_datetime_uct_str
+    stage_log.append({'stage': "discover", 'status': "skipped (resume)", 'wall_secs': 0.})
+elif skip_fresh_stages and (tidy_datetime_uct_str == latest_datetime_uct_str):
+    ndfd_datetime_uct_str = latest_datetime_uct_str
+    stage_log.append({'stage': "discover", 'status': "skipped (fresh)", 'wall_secs': 0.})
+else:
+    with measure_shellcast_stage("discover", stage_log) as stage_info:
+        ndfd_cycle_wait_secs = 0
+        if (ndfd_cycle_wait_nyc_str is not None):
+            ndfd_cycle_wait_nyc = pandas.Timestamp(run_start.tz_convert(tz = "America/New_York").strftime("%Y-%m-%d") + " " + ndfd_cycle_wait_nyc_str).tz_localize(tz = "America/New_York")
+            ndfd_cycle_wait_secs = max(0, (ndfd_cycle_wait_nyc - pandas.Timestamp.now(tz = "UTC")).total_seconds())
+        ndfd_cycle_info = wait_for_sco_ndfd_cycle(ndfd_sco_server_url, datetime_now_uct = run_start, ndfd_var_names = ndfd_var_names, timeout_secs = ndfd_cycle_wait_secs)
+
+        # if no cycle is posted, use the latest cycle (fetch stops when it's not available)
+        ndfd_datetime_uct_str = ndfd_cycle_info['datetime_uct_str'] if (ndfd_cycle_info['datetime_uct_str'] is not None) else latest_datetime_uct_str
+ndfd_datetime_uct = pandas.to_datetime(ndfd_datetime_uct_str, format = "%Y-%m-%d %H:%M").tz_localize(tz = "UTC")
+ndfd_datetime_ym_str, ndfd_datetime_ymd_str, ndfd_datetime_ymdh_str = convert_sco_ndfd_datetime_str(ndfd_datetime_uct_str)
+
+# stage inputs and outputs
+if (tabular_output_format == "parquet"):
+    tidy_output_files = [tabular_output_path + "parquet/ndfd_var=" + ndfd_var + "/datetime_ymdh=" + ndfd_datetime_ymdh_str + "/part-0.parquet" for ndfd_var in ("qpf", "pop12")]
+else:
+    tidy_output_files = [tabular_output_path + ndfd_var + ".csv" for ndfd_var in ("qpf", "pop12")]
+zonal_output_files = [ndfd_tabular_data_output_path + "cmu_calcs/ndfd_cmu_calcs.csv",
+                      ndfd_tabular_data_output_path + "sga_calcs/ndfd_sga_calcs.csv",
+                      ndfd_tabular_data_output_path + "lease_calcs/ndfd_lease_calcs.csv"]
+db_output_files = [ndfd_tabular_data_output_path + "db_update_log.csv"]
+
+# zonal stage inputs besides the tidy outputs (e.g., new lease centroids are rerun for the same cycle), cmu weights and lease index cache files are named by their inputs
+zonal_input_files = ([cmu_spatial_data_input_path + "cmu_bounds_albers" + shp_ext for shp_ext in (".shp", ".shx", ".dbf", ".prj")] +
+                     [sga_spatial_data_input_path + "sga_bounds_simple_albers" + shp_ext for shp_ext in (".shp", ".shx", ".dbf", ".prj")] +
+                     [rainfall_thresh_tabular_data_input_path + "rainfall_thresholds.csv", lease_spatial_data_input_path + "lease_centroids_db_wgs84.csv"] +
+                     [os.path.join(cache_path, file_name) for cache_path in (ndfd_cmu_weights_cache_path, ndfd_lease_index_cache_path) if os.path.isdir(cache_path)
+                      for file_name in os.listdir(cache_path)])
+
+# run metrics and ledger records (written at the end of the run or when the script exits after a stage fails)
+run_deadline = None
+if (run_deadline_nyc_str is not None):
+    # the date is taken in new york time (not the machine's local date) so runs near midnight get the right day
+    run_deadline = pandas.Timestamp(run_start.tz_convert(tz = "America/New_York").strftime("%Y-%m-%d") + " " + run_deadline_nyc_str).tz_localize(tz = "America/New_York").tz_convert("UTC")
+run_info = {'run_start': run_start, 'run_deadline': run_deadline, 'forecast_datetime_uct_str': ndfd_datetime_uct_str, 'forecast_latest': (ndfd_datetime_uct_str == latest_datetime_uct_str), 'status': "failed"}
+
+def write_run_records():
+    run_record = write_shellcast_run_metrics(run_info, stage_log, json_output_path = run_metrics_output_path, prom_output_file = run_metrics_prom_file)
+
+    # stages that ran ("done" or "failed"), tidy is saved as available or not_available when it knows (aggregate is part of tidy)
+    write_shellcast_ledger(ledger_conn, [{'stage': stage_info['stage'], 'datetime_uct_str': ndfd_datetime_uct_str, 'status': "done" if (stage_info['status'] == "run") else "failed",
+                                          'wall_secs': stage_info['wall_secs']} for stage_info in stage_log
+                                         if ((stage_info['status'] in ("run", "failed")) and (stage_info['stage'] not in ("tidy", "aggregate")))])
+    ledger_conn.close()
+
+    return run_record
+
+atexit.register(write_run_records)
+
+print("starting shellcast daily analysis for " + ndfd_datetime_uct_str + " forecast (discover: " + stage_log[-1]['status'] + ", " + str(round(stage_log[-1]['wall_secs'], 1)) + " s)")
+
+
+# %% stages 1 and 2: fetch and tidy
+
+tidy_status = check_shellcast_stage("tidy", stage_names, resume_stage = resume_stage, output_files = tidy_output_files, fresh_after = ndfd_datetime_uct, skip_fresh = skip_fresh_stages)
+
+# csv outputs don't include the cycle in the file name so check the ledger that they're for this cycle (the latest tidied cycle)
+if (tidy_status == "skipped (fresh)") and (tabular_output_format != "parquet"):
+    if (get_shellcast_ledger_latest(ledger_conn, "tidy") != ndfd_datetime_uct_str):
+        tidy_status = "run"
+
+if (tidy_status == "run"):
+    from functions.get_sco_ndfd_cycle_data import get_sco_ndfd_cycle_data
+    from functions.tidy_sco_ndfd_data import tidy_sco_ndfd_data
+    from functions.export_sco_ndfd_data import export_sco_ndfd_data
+
+    # fetch
+    with measure_shellcast_stage("fetch", stage_log) as stage_info:
+        ndfd_cycle_data = get_sco_ndfd_cycle_data(base_server_url = ndfd_sco_server_url, datetime_uct_str = ndfd_datetime_uct_str, ndfd_var_names = ndfd_var_names,
+                                                  ndfd_cache_path = ndfd_cache_path, ndfd_bbox_km = ndfd_bbox_km, ndfd_cache_max_mb = ndfd_cache_max_mb)
+
+        # stop if the forecast isn't available
+        if not (ndfd_cycle_data['cached'] or (ndfd_cycle_data['ndfd_data'] is not None)):
+            write_shellcast_ledger(ledger_conn, [{'stage': "tidy", 'datetime_uct_str': ndfd_datetime_uct_str, 'status': "not_available"}])
+            raise RuntimeError("ndfd data for " + ndfd_datetime_uct_str + " are not available")
+
+        # x and y coordinates are downloaded when the dataset is opened
+        stage_info['bytes_fetched'] = 0 if ndfd_cycle_data['cached'] else (ndfd_cycle_data['ndfd_coords'][0].nbytes + ndfd_cycle_data['ndfd_coords'][1].nbytes)
+
+    # tidy (reads the data from the server or cache)
+    tidy_stats = {'bytes_fetched': 0, 'aggregate_secs': 0.}
+    with measure_shellcast_stage("tidy", stage_log) as stage_info:
+        ndfd_tidy_data = {}
+        for ndfd_var in ("qpf", "pop12"):
+            ndfd_tidy_data[ndfd_var], ndfd_var_datetime_ymdh_str = tidy_sco_ndfd_data(ndfd_data = ndfd_cycle_data['ndfd_data'], datetime_uct_str = ndfd_datetime_uct_str, ndfd_var = ndfd_var,
+                                                                                      ndfd_coords = ndfd_cycle_data['ndfd_coords'], ndfd_subset_index = ndfd_cycle_data['ndfd_subset_index'],
+                                                                                      ndfd_cache_path = ndfd_cache_path, ndfd_cache_max_mb = ndfd_cache_max_mb, tidy_stats = tidy_stats)
+
+        # stop if the desired times weren't available
+        if ((len(ndfd_tidy_data['qpf']) == 0) or (len(ndfd_tidy_data['pop12']) == 0)):
+            write_shellcast_ledger(ledger_conn, [{'stage': "tidy", 'datetime_uct_str': ndfd_datetime_uct_str, 'status': "not_available"}])
+            raise RuntimeError("ndfd data for " + ndfd_datetime_uct_str + " are missing valid periods")
+
+        # export results (outputs of ndfd_get_forecast_data_script.py)
+        tidy_ledger_rows = []
+        for ndfd_var in ("qpf", "pop12"):
+            ndfd_var_output_files = export_sco_ndfd_data(ndfd_tidy_data[ndfd_var], tabular_output_path, ndfd_var, ndfd_datetime_ymdh_str, output_format = tabular_output_format)
+            tidy_ledger_rows.append({'stage': "tidy", 'ndfd_var': ndfd_var, 'datetime_uct_str': ndfd_datetime_uct_str, 'status': "available", 'output_path': ";".join(ndfd_var_output_files)})
+        stage_info['bytes_fetched'] = tidy_stats['bytes_fetched']
+        stage_info['rows_out'] = len(ndfd_tidy_data['qpf']) + len(ndfd_tidy_data['pop12'])
+
+    # the cycle is available once tidy is done
+    tidy_ledger_rows.append({'stage': "tidy", 'datetime_uct_str': ndfd_datetime_uct_str, 'status': "available", 'wall_secs': stage_log[-1]['wall_secs'], 'output_path': tabular_output_path})
+    write_shellcast_ledger(ledger_conn, tidy_ledger_rows)
+
+    # aggregate (part of tidy, only the time is measured)
+    stage_log.append({'stage': "aggregate", 'status': "run", 'wall_secs': tidy_stats['aggregate_secs']})
+
+else:
+    stage_log.extend([{'stage': stage_name, 'status': tidy_status, 'wall_secs': 0.} for stage_name in ("fetch", "tidy", "aggregate")])
+    ndfd_tidy_data = None # read below if a later stage needs it
+
+# print status
+print("fetch and tidy: " + stage_log[-1]['status'])
+
+
+# %% stages 3 and 4: grid and zonal stats
+
+zonal_status = check_shellcast_stage("zonal", stage_names, resume_stage = resume_stage, output_files = zonal_output_files, input_files = tidy_output_files + zonal_input_files, skip_fresh = skip_fresh_stages)
+
+if (zonal_status == "run"):
+    import geopandas # for reading cmu bounds
+    from functions.make_sco_ndfd_grid import make_sco_ndfd_grid
+    from functions.get_sco_ndfd_cmu_weights import get_sco_ndfd_cmu_weights
+    from functions.calc_sco_ndfd_cmu_means import calc_sco_ndfd_cmu_means
+    from functions.calc_sco_ndfd_cmu_calcs import calc_sco_ndfd_cmu_calcs
+    from functions.calc_sco_ndfd_sga_calcs import calc_sco_ndfd_sga_calcs
+    from functions.get_sco_ndfd_lease_index import get_sco_ndfd_lease_index
+    from functions.calc_sco_ndfd_lease_calcs import calc_sco_ndfd_lease_calcs
+
+    # read tidy data if the tidy stage was skipped
+    if (ndfd_tidy_data is None):
+        if (tabular_output_format == "parquet"):
+            ndfd_tidy_data = {ndfd_var: pandas.read_parquet(tidy_output_file) for ndfd_var, tidy_output_file in zip(("qpf", "pop12"), tidy_output_files)}
+        else:
+            ndfd_tidy_data = {ndfd_var: pandas.read_csv(tidy_output_file) for ndfd_var, tidy_output_file in zip(("qpf", "pop12"), tidy_output_files)}
+
+    # grid (rows out are grid cells for all valid periods)
+    with measure_shellcast_stage("grid", stage_log) as stage_info:
+        ndfd_pop12_grid, ndfd_valid_period_hrs, ndfd_grid_coords = make_sco_ndfd_grid(ndfd_tidy_data['pop12'], "pop12")
+        ndfd_qpf_grid, ndfd_qpf_valid_period_hrs, ndfd_qpf_grid_coords = make_sco_ndfd_grid(ndfd_tidy_data['qpf'], "qpf")
+        stage_info['rows_out'] = ndfd_pop12_grid.size + ndfd_qpf_grid.size
+
+    # zonal stats (see ndfd_analyze_forecast_data_script.py)
+    with measure_shellcast_stage("zonal", stage_log) as stage_info:
+        cmu_bounds_albers = geopandas.read_file(cmu_spatial_data_input_path + "cmu_bounds_albers.shp")
+        if (cmu_bounds_albers.crs is None):
+            cmu_bounds_albers = cmu_bounds_albers.set_crs(na_albers_proj4) # crs isn't always saved with the shapefile
+        sga_bounds_data = geopandas.read_file(sga_spatial_data_input_path + "sga_bounds_simple_albers.shp", ignore_geometry = True)
+        rainfall_thresh_data = pandas.read_csv(rainfall_thresh_tabular_data_input_path + "rainfall_thresholds.csv")
+        lease_centroids_data = pandas.read_csv(lease_spatial_data_input_path + "lease_centroids_db_wgs84.csv")
+
+        # area weighted cmu calcs
+        cmu_weights = get_sco_ndfd_cmu_weights(cmu_bounds_albers, ndfd_grid_coords, ndfd_proj4, cmu_id_col = "HA_CLASS", cache_path = ndfd_cmu_weights_cache_path)
+        ndfd_cmu_calcs_data = calc_sco_ndfd_cmu_calcs(cmu_names = cmu_weights['cmu_names'],
+                                                      cmu_rain_in = cmu_bounds_albers['rain_in'].to_numpy(),
+                                                      valid_period_hrs = ndfd_valid_period_hrs,
+                                                      cmu_pop12_perc = calc_sco_ndfd_cmu_means(cmu_weights, ndfd_pop12_grid),
+                                                      cmu_qpf_in = calc_sco_ndfd_cmu_means(cmu_weights, ndfd_qpf_grid) / 25.4, # convert kg/m2 (mm) to inches
+                                                      datetime_uct_str = ndfd_datetime_uct.strftime("%Y-%m-%d"))
+
+        # sga min and max calcs
+        ndfd_sga_calcs_data = calc_sco_ndfd_sga_calcs(ndfd_cmu_calcs_data, rainfall_thresh_data[['HA_CLASS', 'grow_area']], sga_bounds_data['grow_area'])
+
+        # lease calcs
+        lease_index = get_sco_ndfd_lease_index(lease_centroids_data, cmu_bounds_albers, ndfd_grid_coords, ndfd_proj4, cmu_id_col = "HA_CLASS", cache_path = ndfd_lease_index_cache_path)
+        ndfd_lease_calcs_data = calc_sco_ndfd_lease_calcs(lease_index, ndfd_cmu_calcs_data)
+
+        # export calcs
+        for calcs_data, zonal_output_file in zip((ndfd_cmu_calcs_data, ndfd_sga_calcs_data, ndfd_lease_calcs_data), zonal_output_files):
+            os.makedirs(os.path.dirname(zonal_output_file), exist_ok = True)
+            calcs_data.to_csv(zonal_output_file, index = False)
+        stage_info['rows_out'] = len(ndfd_cmu_calcs_data) + len(ndfd_sga_calcs_data) + len(ndfd_lease_calcs_data)
+
+else:
+    stage_log.extend([{'stage': stage_name, 'status': zonal_status, 'wall_secs': 0.} for stage_name in ("grid", "zonal")])
+    ndfd_sga_calcs_data, ndfd_lease_calcs_data, lease_centroids_data = (None, None, None) # read below if the db stage needs them
+
+# print status
+print("grid and zonal stats: " + stage_log[-1]['status'])
+
+
+# %% stage 5: db
+
+db_status = check_shellcast_stage("db", stage_names, resume_stage = resume_stage, output_files = db_output_files, input_files = zonal_output_files, skip_fresh = skip_fresh_stages)
+
+if (db_status == "run"):
+    from functions.wait_for_db_port import wait_for_db_port
+    from functions.make_shellcast_db_engine import make_shellcast_db_engine
+    from functions.update_shellcast_db import update_shellcast_db
+
+    with measure_shellcast_stage("db", stage_log) as stage_info:
+        # read calcs if the zonal stage was skipped
+        if (ndfd_sga_calcs_data is None):
+            ndfd_sga_calcs_data = pandas.read_csv(zonal_output_files[1])
+            ndfd_lease_calcs_data = pandas.read_csv(zonal_output_files[2])
+            lease_centroids_data = pandas.read_csv(lease_spatial_data_input_path + "lease_centroids_db_wgs84.csv")
+
+        # start the cloud sql proxy and wait for it to accept connections (instead of a fixed sleep)
+        db_proxy = None
+        if (db_proxy_cmd is not None):
+            db_proxy = subprocess.Popen(db_proxy_cmd)
+            db_proxy_wait_secs = wait_for_db_port("127.0.0.1", db_proxy_port, timeout_secs = db_proxy_timeout_secs)
+            if (db_proxy_wait_secs is None):
+                db_proxy.kill()
+                raise RuntimeError("cloud sql proxy didn't open port " + str(db_proxy_port) + " within " + str(db_proxy_timeout_secs) + " s")
+            print("cloud sql proxy ready (" + str(round(db_proxy_wait_secs, 2)) + " s)")
+
+        try:
+            # see config.py for database variables (only needed for this stage)
+            from config import Config, DevConfig
+
+            # one engine, one connection, and one transaction for the whole update
+            engine = make_shellcast_db_engine(Config, DevConfig, db_url = db_url, local_infile = db_bulk_load)
+            with engine.connect() as db_conn:
+                with db_conn.begin():
+                    db_update_info = update_shellcast_db(db_conn, ndfd_sga_calcs_data, lease_centroids_data, ndfd_lease_calcs_data,
+                                                         batch_size = db_batch_size,
+                                                         bulk_load = db_bulk_load,
+                                                         closure_prob_write_mode = closure_prob_write_mode,
+                                                         closure_prob_skip_unchanged = closure_prob_skip_unchanged,
+                                                         forecast_date = ndfd_datetime_uct.strftime("%Y-%m-%d"))
+            engine.dispose()
+
+        finally:
+            # stop the cloud sql proxy
+            if (db_proxy is not None):
+                db_proxy.send_signal(signal.SIGINT)
+                try:
+                    db_proxy.wait(timeout = 10)
+                except subprocess.TimeoutExpired:
+                    db_proxy.kill()
+
+        # record the update so reruns can skip it
+        pandas.DataFrame([{'datetime_uct_str': ndfd_datetime_uct_str, **db_update_info}]).to_csv(db_output_files[0], index = False)
+        stage_info['rows_written'] = sum(db_update_info.values())
+
+else:
+    stage_log.append({'stage': "db", 'status': db_status, 'wall_secs': 0.})
+
+# print status
+print("db: " + stage_log[-1]['status'])
+
+
+# %% print stage metrics and write run metrics
+
+run_info['status'] = "success"
+atexit.unregister(write_run_records)
+run_record = write_run_records()
+
+stage_log_pd = pandas.DataFrame(stage_log, columns = ['stage', 'status', 'wall_secs', 'cpu_secs', 'peak_rss_mb', 'bytes_fetched', 'rows_out', 'rows_written'])
+print(stage_log_pd.round({'wall_secs': 3, 'cpu_secs': 3, 'peak_rss_mb': 1}).to_string(index = False))
+print("finished shellcast daily analysis (" + str(round(run_record['run']['duration_secs'], 3)) + " s)")
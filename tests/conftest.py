@@ -0,0 +1,19 @@
+"""
+# ---- script header ----
+script name: conftest.py
+purpose of script: pytest setup, imports the functions and benchmarks packages from the analysis directory (the parent of this tests directory)
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+to run:
+python -m pytest tests
+
+"""
+import os
+import sys
+
+# base path to analysis (same as analysis_base_path in the scripts)
+analysis_base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if analysis_base_path not in sys.path:
+    sys.path.insert(0, analysis_base_path)
@@ -0,0 +1,59 @@
+"""
+# ---- script header ----
+script name: test_backfill_sco_ndfd_data.py
+purpose of script: tests which backfill errors are retried against the local stand-in dap server
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pytest, pydap, requests, numpy, pandas
+required functions: backfill_sco_ndfd_data.py, start_sco_ndfd_test_server.py, make_synthetic_sco_ndfd_data.py
+
+"""
+import os
+
+from functions.backfill_sco_ndfd_data import backfill_sco_ndfd_data
+from benchmarks.start_sco_ndfd_test_server import start_sco_ndfd_test_server
+from benchmarks.make_synthetic_sco_ndfd_data import make_synthetic_sco_ndfd_data
+
+ndfd_datetime_uct_str = "2026-10-18 00:00"
+ndfd_var_names = ["Total_precipitation_surface_6_Hour_Accumulation", "Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254"]
+
+def start_server(error_frac = 0.):
+    return start_sco_ndfd_test_server(cycle_datetime_strs = [ndfd_datetime_uct_str], ndfd_data = make_synthetic_sco_ndfd_data(grid_size = (40, 60, -77.5, 35.)),
+                                      error_frac = error_frac)
+
+def run_backfill(ndfd_server, output_path, ledger_file):
+    return backfill_sco_ndfd_data(ndfd_server.base_server_url, [ndfd_datetime_uct_str], output_path, ledger_file, ndfd_var_names = ndfd_var_names,
+                                  max_workers = 1, max_retries = 2, backoff_secs = 0.01)
+
+def test_server_errors_are_retried(tmp_path):
+    ndfd_server = start_server(error_frac = 1.)
+    try:
+        backfill_status_pd = run_backfill(ndfd_server, str(tmp_path), str(tmp_path / "ledger.db"))
+    finally:
+        ndfd_server.shutdown()
+        ndfd_server.server_close()
+
+    assert backfill_status_pd['status'].tolist() == ["failed"]
+    assert len(ndfd_server.request_log) == 3 # first attempt and 2 retries
+
+def test_local_errors_are_not_retried(tmp_path):
+    # the export fails (IsADirectoryError) because there's a directory where the qpf file goes
+    output_path = str(tmp_path / "output") + "/"
+    os.makedirs(output_path + "qpf_2026101800.csv")
+
+    ndfd_server = start_server()
+    try:
+        backfill_status_pd = run_backfill(ndfd_server, output_path, str(tmp_path / "ledger.db"))
+        num_requests = len(ndfd_server.request_log)
+
+        # fetched once, then the same backfill works when the file can be written
+        os.rmdir(output_path + "qpf_2026101800.csv")
+        assert run_backfill(ndfd_server, output_path, str(tmp_path / "ledger.db"))['status'].tolist() == ["available"]
+    finally:
+        ndfd_server.shutdown()
+        ndfd_server.server_close()
+
+    assert backfill_status_pd['status'].tolist() == ["failed"]
+    assert num_requests == (len(ndfd_server.request_log) - num_requests)
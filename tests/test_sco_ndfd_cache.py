@@ -0,0 +1,136 @@
+"""
+# ---- script header ----
+script name: test_sco_ndfd_cache.py
+purpose of script: tests the local nc sco ndfd cache against the local stand-in dap server
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pytest, pydap, requests, numpy, pandas, concurrent.futures
+required functions: get_sco_ndfd_cycle_data.py, tidy_sco_ndfd_data.py, read_sco_ndfd_cache.py, write_sco_ndfd_cache.py, start_sco_ndfd_test_server.py,
+                    make_synthetic_sco_ndfd_data.py
+
+"""
+import os
+import concurrent.futures
+import numpy
+import pandas
+import pytest
+
+from functions.get_sco_ndfd_cycle_data import get_sco_ndfd_cycle_data
+from functions.tidy_sco_ndfd_data import tidy_sco_ndfd_data
+from functions.read_sco_ndfd_cache import read_sco_ndfd_cache
+from functions.write_sco_ndfd_cache import write_sco_ndfd_cache
+from benchmarks.start_sco_ndfd_test_server import start_sco_ndfd_test_server
+from benchmarks.make_synthetic_sco_ndfd_data import make_synthetic_sco_ndfd_data
+
+ndfd_datetime_uct_str = "2026-10-18 00:00"
+ndfd_var_names = ["Total_precipitation_surface_6_Hour_Accumulation", "Total_precipitation_surface_12_Hour_Accumulation_probability_above_0p254"]
+
+@pytest.fixture(scope = "module")
+def ndfd_server():
+    server = start_sco_ndfd_test_server(cycle_datetime_strs = [ndfd_datetime_uct_str], ndfd_data = make_synthetic_sco_ndfd_data(grid_size = (40, 60, -77.5, 35.)))
+    yield server
+    server.shutdown()
+    server.server_close()
+
+def tidy_cycle(ndfd_server, ndfd_cache_path):
+    cycle_data = get_sco_ndfd_cycle_data(ndfd_server.base_server_url, ndfd_datetime_uct_str, ndfd_var_names, ndfd_cache_path = ndfd_cache_path)
+    tidy_data = {ndfd_var: tidy_sco_ndfd_data(cycle_data['ndfd_data'], ndfd_datetime_uct_str, ndfd_var, ndfd_coords = cycle_data['ndfd_coords'],
+                                              ndfd_cache_path = ndfd_cache_path)[0] for ndfd_var in ("qpf", "pop12")}
+    return cycle_data, tidy_data
+
+def test_cached_rerun_skips_server(ndfd_server, tmp_path):
+    ndfd_cache_path = str(tmp_path / "cache")
+
+    # first run fetches from the server and fills the cache
+    cycle_data, server_tidy_data = tidy_cycle(ndfd_server, ndfd_cache_path)
+    assert not cycle_data['cached']
+    assert sorted(file_name.split("_")[1] for file_name in os.listdir(ndfd_cache_path)) == ["coords", "pop12", "qpf"]
+
+    # rerun reads the cache without any server requests and gives the same data
+    num_requests = len(ndfd_server.request_log)
+    cycle_data, cache_tidy_data = tidy_cycle(ndfd_server, ndfd_cache_path)
+    assert cycle_data['cached']
+    assert cycle_data['ndfd_data'] is None
+    assert len(ndfd_server.request_log) == num_requests
+    for ndfd_var in ("qpf", "pop12"):
+        pandas.testing.assert_frame_equal(cache_tidy_data[ndfd_var], server_tidy_data[ndfd_var])
+
+def test_unreadable_cache_file_is_fetched_again(ndfd_server, tmp_path):
+    ndfd_cache_path = str(tmp_path / "cache")
+    tidy_cycle(ndfd_server, ndfd_cache_path)
+
+    # cut off the qpf file (like a run that was killed while writing)
+    qpf_cache_file = [os.path.join(ndfd_cache_path, file_name) for file_name in os.listdir(ndfd_cache_path) if "_qpf_" in file_name][0]
+    with open(qpf_cache_file, "r+b") as cache_obj:
+        cache_obj.truncate(100)
+    assert read_sco_ndfd_cache(ndfd_cache_path, "2026101800", "qpf") is None
+    assert not os.path.exists(qpf_cache_file)
+
+    # qpf isn't cached anymore so the cycle is fetched again
+    cycle_data, tidy_data = tidy_cycle(ndfd_server, ndfd_cache_path)
+    assert not cycle_data['cached']
+    assert len(tidy_data['qpf']) > 0
+    assert os.path.exists(qpf_cache_file)
+
+def test_eviction_keeps_cache_under_max(tmp_path):
+    ndfd_cache_path = str(tmp_path / "cache")
+    cache_data = {'var_data': numpy.random.default_rng(0).random((4, 64, 64))} # about 100 kB compressed
+
+    for cycle_num in range(0, 20):
+        cache_file = write_sco_ndfd_cache(ndfd_cache_path, "20261018" + str(cycle_num).zfill(2), "qpf", cache_data, max_cache_mb = 0.5)
+        assert os.path.exists(cache_file)
+
+    cache_size_bytes = sum(os.path.getsize(os.path.join(ndfd_cache_path, file_name)) for file_name in os.listdir(ndfd_cache_path))
+    assert cache_size_bytes <= 0.5 * 1024 * 1024
+    assert os.path.exists(os.path.join(ndfd_cache_path, os.path.basename(cache_file))) # the last file is kept
+
+def test_concurrent_writers_and_readers(tmp_path):
+    ndfd_cache_path = str(tmp_path / "cache")
+    cache_data = {'var_data': numpy.random.default_rng(0).random((4, 32, 32))}
+
+    # many threads writing and reading with a small cache (files are removed by other threads' eviction while they're listed or read)
+    def write_and_read_cycles(thread_num):
+        for cycle_num in range(0, 60):
+            datetime_ymdh_str = str(2026101800 + thread_num * 100 + cycle_num)
+            write_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, "qpf", cache_data, max_cache_mb = 0.1)
+            read_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, "qpf")
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as executor:
+        for write_future in [executor.submit(write_and_read_cycles, thread_num) for thread_num in range(0, 8)]:
+            write_future.result() # raises if a writer failed
+
+def test_concurrent_writers_of_the_same_cycle(tmp_path):
+    ndfd_cache_path = str(tmp_path / "cache")
+    rng = numpy.random.default_rng(0)
+    thread_cache_data = [{'var_data': numpy.full((4, 64, 64), float(thread_num)), 'noise': rng.random((4, 64, 64))} for thread_num in range(0, 8)]
+
+    # every thread writes the same cycle, readers only ever see one whole file
+    def write_and_read_cycle(thread_num):
+        for write_num in range(0, 30):
+            write_sco_ndfd_cache(ndfd_cache_path, "2026101800", "qpf", thread_cache_data[thread_num])
+            cache_data = read_sco_ndfd_cache(ndfd_cache_path, "2026101800", "qpf")
+            assert (cache_data is not None) and (len(numpy.unique(cache_data['var_data'])) == 1)
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers = 8) as executor:
+        for write_future in [executor.submit(write_and_read_cycle, thread_num) for thread_num in range(0, 8)]:
+            write_future.result()
+
+    assert [file_name for file_name in os.listdir(ndfd_cache_path) if file_name.endswith(".tmp")] == []
+
+def test_stale_temp_files_are_removed(tmp_path):
+    ndfd_cache_path = str(tmp_path / "cache")
+    os.makedirs(ndfd_cache_path)
+
+    # a temporary file left by a writer that crashed and one that's still being written
+    stale_temp_file = os.path.join(ndfd_cache_path, "crashed.tmp")
+    new_temp_file = os.path.join(ndfd_cache_path, "writing.tmp")
+    for temp_file in (stale_temp_file, new_temp_file):
+        with open(temp_file, 'wb') as write_obj:
+            write_obj.write(b"0" * 1000)
+    os.utime(stale_temp_file, (0, 0))
+
+    write_sco_ndfd_cache(ndfd_cache_path, "2026101800", "qpf", {'var_data': numpy.zeros(10)})
+    assert not os.path.exists(stale_temp_file)
+    assert os.path.exists(new_temp_file)
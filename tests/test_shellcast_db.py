@@ -0,0 +1,142 @@
+"""
+# ---- script header ----
+script name: test_shellcast_db.py
+purpose of script: tests the shellcast database update functions against a local sqlite stand-in for the mysql database
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pytest, numpy, pandas, sqlalchemy
+required functions: insert_ncdmf_leases.py, get_new_ncdmf_leases.py, upsert_closure_probabilities.py, write_shellcast_db_table.py, update_shellcast_db.py, make_synthetic_shellcast_db.py
+
+"""
+import numpy
+import pandas
+import pytest
+import sqlalchemy
+
+from functions.insert_ncdmf_leases import insert_ncdmf_leases
+from functions.get_new_ncdmf_leases import get_new_ncdmf_leases
+from functions.upsert_closure_probabilities import upsert_closure_probabilities
+from functions.write_shellcast_db_table import write_shellcast_db_table
+from functions.update_shellcast_db import update_shellcast_db
+from benchmarks.make_synthetic_shellcast_db import make_synthetic_shellcast_db
+
+# leases with a quote in a grow area name and a missing rainfall threshold
+lease_data = pandas.DataFrame({'ncdmf_lease_id': ["L000001", "L000002", "L000003", "L000004", "L000005"],
+                               'grow_area_name': ["A1", "B2", "Bogue's Sound", "A1", None],
+                               'rainfall_thresh_in': [1.5, 2.0, numpy.nan, 1.5, 3.0],
+                               'longitude': [-76.5, -76.6, -76.7, -76.8, -76.9],
+                               'latitude': [34.6, 34.7, 34.8, 34.9, 35.0]})
+
+@pytest.fixture
+def db_conn():
+    # empty tables (in memory database), one transaction that's rolled back after the test
+    engine = make_synthetic_shellcast_db("sqlite://", lease_data, existing_lease_frac = 0., user_lease_frac = 0.)
+    db_conn = engine.connect()
+    db_conn.begin()
+    yield db_conn
+    db_conn.rollback()
+    db_conn.close()
+    engine.dispose()
+
+def read_table(db_conn, table_sql):
+    return pandas.read_sql(sqlalchemy.text(table_sql), db_conn)
+
+def make_closure_prob_data(forecast_date, lease_probs):
+    return pandas.DataFrame([{'lease_id': lease_id, 'forecast_date': forecast_date, 'prob_1d_perc': prob_1d, 'prob_2d_perc': prob_2d, 'prob_3d_perc': prob_3d}
+                             for lease_id, (prob_1d, prob_2d, prob_3d) in lease_probs.items()])
+
+def test_insert_ncdmf_leases(db_conn):
+    num_leases = insert_ncdmf_leases(db_conn, lease_data, batch_size = 2)
+    assert num_leases == 5
+
+    lease_db_data = read_table(db_conn, "SELECT ncdmf_lease_id, grow_area_name, rainfall_thresh_in, geometry FROM ncdmf_leases ORDER BY ncdmf_lease_id")
+    assert lease_db_data['ncdmf_lease_id'].tolist() == lease_data['ncdmf_lease_id'].tolist()
+    assert lease_db_data['grow_area_name'].tolist()[0:4] == ["A1", "B2", "Bogue's Sound", "A1"]
+    assert lease_db_data['grow_area_name'].isna().tolist() == [False, False, False, False, True]
+    assert lease_db_data['rainfall_thresh_in'].isna().tolist() == [False, False, True, False, False]
+    assert lease_db_data['geometry'].iloc[0] == "POINT(-76.5 34.6)"
+
+def test_get_new_ncdmf_leases(db_conn):
+    insert_ncdmf_leases(db_conn, lease_data.iloc[0:3])
+
+    # only leases that aren't in the table come back (in lease_data order, duplicate ids are kept)
+    lease_data_dup = pandas.concat([lease_data, lease_data.iloc[[4]]], ignore_index = True)
+    lease_data_new = get_new_ncdmf_leases(db_conn, lease_data_dup, batch_size = 2)
+    assert lease_data_new['ncdmf_lease_id'].tolist() == ["L000004", "L000005", "L000005"]
+
+    # the temporary table is dropped so it can run again in the same transaction
+    insert_ncdmf_leases(db_conn, lease_data.iloc[[3]])
+    assert get_new_ncdmf_leases(db_conn, lease_data)['ncdmf_lease_id'].tolist() == ["L000005"]
+
+    # nothing new
+    insert_ncdmf_leases(db_conn, lease_data.iloc[[4]])
+    assert len(get_new_ncdmf_leases(db_conn, lease_data)) == 0
+
+def test_upsert_closure_probabilities(db_conn):
+    closure_prob_data = make_closure_prob_data("2026-10-17", {1: (10., 20., 30.), 2: (0., 0., 5.), 3: (numpy.nan, numpy.nan, numpy.nan)})
+    assert upsert_closure_probabilities(db_conn, closure_prob_data, batch_size = 2) == 3
+
+    # same date again updates the rows (no duplicates), a new date adds rows
+    upsert_closure_probabilities(db_conn, make_closure_prob_data("2026-10-17", {1: (11., 21., 31.)}))
+    upsert_closure_probabilities(db_conn, make_closure_prob_data("2026-10-18", {1: (12., 22., 32.)}))
+
+    closure_prob_db_data = read_table(db_conn, "SELECT lease_id, forecast_date, prob_1d_perc, prob_2d_perc, prob_3d_perc FROM closure_probabilities ORDER BY forecast_date, lease_id")
+    assert closure_prob_db_data[['lease_id', 'forecast_date']].values.tolist() == [[1, "2026-10-17"], [2, "2026-10-17"], [3, "2026-10-17"], [1, "2026-10-18"]]
+    assert closure_prob_db_data['prob_1d_perc'].tolist()[0:2] == [11., 0.]
+    assert closure_prob_db_data['prob_3d_perc'].tolist()[3] == 32.
+    assert closure_prob_db_data.iloc[2][['prob_1d_perc', 'prob_2d_perc', 'prob_3d_perc']].isna().all() # missing values are NULL
+
+def test_upsert_closure_probabilities_skip_unchanged(db_conn):
+    upsert_closure_probabilities(db_conn, make_closure_prob_data("2026-10-17", {1: (10., 20., 30.), 2: (0., 0., 5.), 3: (numpy.nan, numpy.nan, numpy.nan)}))
+
+    # lease 1 and 3 (missing values) didn't change, lease 2 changed, and lease 4 is new
+    num_rows = upsert_closure_probabilities(db_conn, make_closure_prob_data("2026-10-18", {1: (10., 20., 30.), 2: (0., 1., 5.), 3: (numpy.nan, numpy.nan, numpy.nan), 4: (1., 2., 3.)}),
+                                            skip_unchanged = True)
+    assert num_rows == 2
+
+    closure_prob_db_data = read_table(db_conn, "SELECT lease_id, forecast_date FROM closure_probabilities WHERE forecast_date = '2026-10-18' ORDER BY lease_id")
+    assert closure_prob_db_data['lease_id'].tolist() == [2, 4]
+
+    # each lease's latest row on or before the date has its probabilities (how readers have to use skip_unchanged)
+    latest_prob_data = read_table(db_conn, "SELECT c.lease_id, c.prob_2d_perc FROM closure_probabilities c "
+                                           "JOIN (SELECT lease_id, MAX(forecast_date) AS forecast_date FROM closure_probabilities WHERE forecast_date <= '2026-10-18' GROUP BY lease_id) m "
+                                           "ON c.lease_id = m.lease_id AND c.forecast_date = m.forecast_date ORDER BY c.lease_id")
+    assert latest_prob_data['lease_id'].tolist() == [1, 2, 3, 4]
+    assert latest_prob_data['prob_2d_perc'].tolist()[0:2] == [20., 1.]
+
+    # a rerun of the same day with the same probabilities writes nothing
+    assert upsert_closure_probabilities(db_conn, make_closure_prob_data("2026-10-18", {2: (0., 1., 5.), 4: (1., 2., 3.)}), skip_unchanged = True) == 0
+
+def test_write_shellcast_db_table(db_conn):
+    sga_data = pandas.DataFrame({'grow_area_name': ["A1", "Bogue's Sound", "C3"],
+                                 'min_1d_prob': [0., 5., numpy.nan], 'max_1d_prob': [10., 15., numpy.nan],
+                                 'min_2d_prob': [1., 6., numpy.nan], 'max_2d_prob': [11., 16., numpy.nan],
+                                 'min_3d_prob': [2., 7., numpy.nan], 'max_3d_prob': [12., 17., numpy.nan]})
+
+    # appends every run
+    assert write_shellcast_db_table(db_conn, "sga_min_max", sga_data, batch_size = 2) == 3
+    assert write_shellcast_db_table(db_conn, "sga_min_max", sga_data, batch_size = 2) == 3
+
+    sga_db_data = read_table(db_conn, "SELECT grow_area_name, min_1d_prob, max_3d_prob FROM sga_min_max ORDER BY id")
+    assert sga_db_data['grow_area_name'].tolist() == ["A1", "Bogue's Sound", "C3"] * 2
+    assert sga_db_data['max_3d_prob'].tolist()[0:2] == [12., 17.]
+    assert sga_db_data['min_1d_prob'].isna().tolist() == [False, False, True] * 2
+
+def test_update_shellcast_db_upsert_without_lease_calcs(db_conn):
+    db_conn.execute(sqlalchemy.text("INSERT INTO user_leases (ncdmf_lease_id) VALUES ('L000001'), ('L000002')"))
+    sga_data = pandas.DataFrame({'grow_area_name': ["A1"], 'min_1d_prob': [0.], 'max_1d_prob': [10.], 'min_2d_prob': [1.], 'max_2d_prob': [11.], 'min_3d_prob': [2.], 'max_3d_prob': [12.]})
+    lease_calcs_data = pandas.DataFrame(columns = ['lease_id', 'day', 'prob_1d_perc', 'prob_2d_perc', 'prob_3d_perc'])
+
+    # no lease calcs and no forecast date skips closure_probabilities (forecast_date can't be NULL) and the rest is still written
+    db_update_info = update_shellcast_db(db_conn, sga_data, lease_data, lease_calcs_data, closure_prob_write_mode = "upsert")
+    assert db_update_info == {'sga_min_max': 1, 'ncdmf_leases': 5, 'closure_probabilities': 0}
+
+    # with the forecast date user leases get NULL probabilities
+    db_update_info = update_shellcast_db(db_conn, sga_data, lease_data, lease_calcs_data, closure_prob_write_mode = "upsert", forecast_date = "2026-10-18")
+    assert db_update_info['closure_probabilities'] == 2
+
+    closure_prob_db_data = read_table(db_conn, "SELECT lease_id, forecast_date, prob_1d_perc FROM closure_probabilities ORDER BY lease_id")
+    assert closure_prob_db_data['forecast_date'].tolist() == ["2026-10-18", "2026-10-18"]
+    assert closure_prob_db_data['prob_1d_perc'].isna().all()
@@ -0,0 +1,45 @@
+"""
+# ---- script header ----
+script name: test_tidy_sco_ndfd_data_batch.py
+purpose of script: tests that tidying cached nc sco ndfd cycles in a pool of processes gives the same data as tidying them one at a time
+author: sheila saia
+email: ssaia@ncsu.edu
+date created: 20261018
+
+required libraries: pytest, numpy, pandas, io
+required functions: tidy_sco_ndfd_data_batch.py, tidy_sco_ndfd_data.py, write_sco_ndfd_cache.py, convert_sco_ndfd_datetime_str.py
+
+"""
+import io
+import numpy
+import pandas
+
+from functions.tidy_sco_ndfd_data_batch import tidy_sco_ndfd_data_batch
+from functions.tidy_sco_ndfd_data import tidy_sco_ndfd_data
+from functions.write_sco_ndfd_cache import write_sco_ndfd_cache
+from functions.convert_sco_ndfd_datetime_str import convert_sco_ndfd_datetime_str
+
+def test_batch_matches_serial_tidy(tmp_path):
+    ndfd_cache_path = str(tmp_path / "cache") + "/"
+    output_path = str(tmp_path / "batch") + "/"
+
+    # cache two cycles with missing grid cells, the third cycle isn't cached
+    rng = numpy.random.default_rng(0)
+    datetime_uct_str_list = ["2026-10-17 00:00", "2026-10-17 12:00", "2026-10-18 00:00"]
+    for datetime_uct_str in datetime_uct_str_list[0:2]:
+        datetime_ymdh_str = convert_sco_ndfd_datetime_str(datetime_uct_str)[2]
+        for ndfd_var, var_subperiod_hrs in (("qpf", 6.), ("pop12", 12.)):
+            var_times = numpy.arange(var_subperiod_hrs, 168 + var_subperiod_hrs, var_subperiod_hrs)
+            var_data = rng.random((len(var_times), 20, 30)).astype("float32")
+            var_data[:, ::7, ::5] = numpy.nan
+            write_sco_ndfd_cache(ndfd_cache_path, datetime_ymdh_str, ndfd_var,
+                                 {'var_data': var_data, 'var_times': var_times, 'x_coords': numpy.arange(30.) * 2.5, 'y_coords': numpy.arange(20.) * 2.5})
+
+    batch_status_pd = tidy_sco_ndfd_data_batch(datetime_uct_str_list, ["qpf", "pop12"], ndfd_cache_path, output_path, max_workers = 2)
+    assert batch_status_pd['status'].value_counts().to_dict() == {'tidied': 4, 'not_cached': 2}
+
+    for datetime_uct_str in datetime_uct_str_list[0:2]:
+        for ndfd_var in ("qpf", "pop12"):
+            tidy_data, datetime_ymdh_str = tidy_sco_ndfd_data(None, datetime_uct_str, ndfd_var, ndfd_cache_path = ndfd_cache_path)
+            batch_data = pandas.read_csv(output_path + "csv/ndfd_var=" + ndfd_var + "/datetime_ymdh=" + datetime_ymdh_str + "/part-0.csv")
+            pandas.testing.assert_frame_equal(pandas.read_csv(io.StringIO(tidy_data.to_csv(index = False))), batch_data)